@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import RecentlyViewed, ViewBucket
+
+
+@admin.register(ViewBucket)
+class ViewBucketAdmin(admin.ModelAdmin):
+    """
+    Административная панель для агрегатов просмотров.
+    """
+    list_display = ('kind', 'object_id', 'bucket', 'views',)
+    list_filter = ('kind',)
+
+
+@admin.register(RecentlyViewed)
+class RecentlyViewedAdmin(admin.ModelAdmin):
+    """
+    Административная панель для списков недавно просмотренных продуктов.
+    """
+    list_display = ('user', 'product_ids', 'updated_at',)
+    list_select_related = ('user',)
@@ -0,0 +1,200 @@
+"""
+Буферизованная запись объектов в базу данных.
+
+Объекты накапливаются в памяти процесса и сохраняются одним bulk_create, когда буфер
+заполнен или с момента добавления первого объекта прошло flush_interval секунд
+(по таймеру в фоновом потоке), а также при завершении процесса. При недоступности базы данных
+(OperationalError, InterfaceError) объекты возвращаются в буфер и записываются при следующей
+попытке; буфер хранит не более max_size объектов, самые старые сверх этого отбрасываются.
+Если пакет отклонен из-за данных (IntegrityError, DataError), объекты записываются по одному,
+а отклоненные отбрасываются с записью в лог, чтобы один плохой объект не блокировал остальные.
+Подходит для данных, потеря небольшой части которых при аварийном завершении процесса допустима.
+
+Если заданы unique_fields, запись выполняется как upsert (bulk_create с update_conflicts):
+из нескольких объектов с одинаковым ключом в буфере записывается последний.
+
+BufferedCounter по тому же принципу накапливает приращения счетчика (например, просмотров)
+по id объектов и записывает их UPDATE ... SET поле = поле + n.
+"""
+import atexit
+import logging
+import threading
+
+from django.db import (
+    DatabaseError, DataError, IntegrityError, InterfaceError, OperationalError, connection, transaction,
+)
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """
+    Накопитель объектов модели с пакетной записью через bulk_create.
+    """
+
+    def __init__(
+        self, model, batch_size=100, flush_interval=5.0, unique_fields=None, update_fields=None, max_size=None,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.max_size = max_size or batch_size * 100
+        self.flush_interval = flush_interval
+        self.unique_fields = unique_fields
+        self.update_fields = update_fields
+        self._items = []
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, obj):
+        """
+        Добавляет объект в буфер и при необходимости записывает накопленные объекты.
+        """
+        with self._lock:
+            self._items.append(obj)
+            due = len(self._items) >= self.batch_size
+            if not due:
+                self._start_timer()
+        if due:
+            self.flush()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            # Соединение с базой данных открыто в потоке таймера и должно быть закрыто в нем же
+            connection.close()
+
+    def flush(self):
+        """
+        Записывает накопленные объекты одним запросом. Возвращает количество записанных объектов.
+        """
+        with self._lock:
+            items, self._items = self._items, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not items:
+            return 0
+        options = {}
+        if self.unique_fields:
+            items = list({self.unique_key(obj): obj for obj in items}.values())
+            options = {
+                'update_conflicts': True, 'unique_fields': self.unique_fields, 'update_fields': self.update_fields,
+            }
+        try:
+            self.model.objects.bulk_create(items, batch_size=self.batch_size, **options)
+        except (OperationalError, InterfaceError):
+            logger.exception('Не удалось записать %d объект(ов) %s', len(items), self.model._meta.label)
+            self._requeue(items)
+            return 0
+        except (IntegrityError, DataError):
+            return self._write_one_by_one(items, options)
+        except DatabaseError:
+            # Повтор той же записи снова завершится ошибкой: объекты отбрасываются
+            logger.exception('Отброшено %d объект(ов) %s', len(items), self.model._meta.label)
+            return 0
+        return len(items)
+
+    def _requeue(self, items):
+        # Объекты возвращаются в начало буфера (более новые объекты с тем же ключом остаются последними)
+        # и будут записаны при следующей попытке
+        with self._lock:
+            self._items = items + self._items
+            dropped = len(self._items) - self.max_size
+            if dropped > 0:
+                del self._items[:dropped]
+                logger.warning(
+                    'Буфер %s переполнен: отброшено %d старых объект(ов)', self.model._meta.label, dropped,
+                )
+            self._start_timer()
+
+    def _write_one_by_one(self, items, options):
+        written = 0
+        for index, obj in enumerate(items):
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create([obj], **options)
+            except (OperationalError, InterfaceError):
+                logger.exception('Не удалось записать %d объект(ов) %s', len(items) - index, self.model._meta.label)
+                self._requeue(items[index:])
+                break
+            except DatabaseError:
+                logger.exception('Отброшен объект %s: %r', self.model._meta.label, obj)
+            else:
+                written += 1
+        return written
+
+    def _start_timer(self):
+        # Таймер гарантирует запись, даже если новых объектов больше не поступит
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def unique_key(self, obj):
+        return tuple(getattr(obj, self.model._meta.get_field(name).attname) for name in self.unique_fields)
+
+
+class BufferedCounter:
+    """
+    Накопитель приращений числового поля модели по id объектов.
+    После записи вызывается on_flush(increments) — словарь {id: приращение}.
+    """
+
+    def __init__(self, model, field, flush_interval=5.0, on_flush=None):
+        self.model = model
+        self.field = field
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._increments = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def add(self, pk, amount=1):
+        with self._lock:
+            self._increments[pk] = self._increments.get(pk, 0) + amount
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """
+        Записывает накопленные приращения. Возвращает количество обновленных объектов.
+        """
+        with self._lock:
+            increments, self._increments = self._increments, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not increments:
+            return 0
+        try:
+            with transaction.atomic():
+                for pk, amount in sorted(increments.items()):
+                    self.model.objects.filter(pk=pk).update(**{self.field: F(self.field) + amount})
+        except DatabaseError:
+            logger.exception(
+                'Не удалось записать приращения %s.%s для %d объект(ов)',
+                self.model._meta.label, self.field, len(increments),
+            )
+            # Приращения возвращаются в буфер и будут записаны со следующей порцией
+            with self._lock:
+                for pk, amount in increments.items():
+                    self._increments[pk] = self._increments.get(pk, 0) + amount
+            return 0
+        if self.on_flush is not None:
+            self.on_flush(increments)
+        return len(increments)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from analytics.tracking import compute_trending, prune_buckets, rollup_views
+
+
+class Command(BaseCommand):
+    help = (
+        'Aggregates raw product view events into hourly/daily buckets per product and category, '
+        'deletes processed events, prunes old buckets and refreshes the trending products list.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help='Events aggregated per transaction.')
+        parser.add_argument('--hourly-days', type=int, default=7, help='Keep hourly buckets for N days.')
+        parser.add_argument('--daily-days', type=int, default=365, help='Keep daily buckets for N days.')
+
+    def handle(self, *args, **options):
+        processed = rollup_views(batch_size=options['batch_size'])
+        pruned = prune_buckets(hourly_days=options['hourly_days'], daily_days=options['daily_days'])
+        trending = compute_trending()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {processed} event(s), pruned {pruned} bucket(s), {len(trending)} trending product(s).'
+        ))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductViewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField(verbose_name='ID продукта')),
+                ('category_id', models.BigIntegerField(verbose_name='ID категории')),
+                ('created_at', models.DateTimeField(verbose_name='Время просмотра')),
+            ],
+            options={
+                'verbose_name': 'Событие просмотра',
+                'verbose_name_plural': 'События просмотров',
+            },
+        ),
+        migrations.CreateModel(
+            name='ViewBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Продукт, час'), (2, 'Продукт, день'), (3, 'Категория, час'), (4, 'Категория, день')], verbose_name='Тип')),
+                ('object_id', models.BigIntegerField(verbose_name='ID объекта')),
+                ('bucket', models.IntegerField(verbose_name='Интервал')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Просмотры')),
+            ],
+            options={
+                'verbose_name': 'Агрегат просмотров',
+                'verbose_name_plural': 'Агрегаты просмотров',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'bucket', 'object_id'), name='analytics_viewbucket_unique')],
+            },
+        ),
+    ]
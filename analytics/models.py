@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db import models
+
+
+class ProductViewEvent(models.Model):
+    """
+    Модель для сырых событий просмотра продукта.
+    Таблица только пополняется пакетными INSERT и не имеет вторичных индексов и внешних ключей,
+    чтобы запись была дешевой. События удаляются после агрегации командой rollup_views.
+    """
+    product_id = models.BigIntegerField(verbose_name='ID продукта')
+    category_id = models.BigIntegerField(verbose_name='ID категории')
+    created_at = models.DateTimeField(verbose_name='Время просмотра')
+
+    def __str__(self):
+        return f'{self.product_id} @ {self.created_at}'
+
+    class Meta:
+        verbose_name = 'Событие просмотра'
+        verbose_name_plural = 'События просмотров'
+
+
+class ViewBucket(models.Model):
+    """
+    Модель для агрегированного количества просмотров за интервал времени.
+    Для компактности интервал хранится целым числом: номер часа или дня от начала эпохи UNIX.
+    """
+    KIND_PRODUCT_HOUR = 1
+    KIND_PRODUCT_DAY = 2
+    KIND_CATEGORY_HOUR = 3
+    KIND_CATEGORY_DAY = 4
+    KIND_CHOICES = [
+        (KIND_PRODUCT_HOUR, 'Продукт, час'),
+        (KIND_PRODUCT_DAY, 'Продукт, день'),
+        (KIND_CATEGORY_HOUR, 'Категория, час'),
+        (KIND_CATEGORY_DAY, 'Категория, день'),
+    ]
+
+    kind = models.PositiveSmallIntegerField(choices=KIND_CHOICES, verbose_name='Тип')
+    object_id = models.BigIntegerField(verbose_name='ID объекта')
+    bucket = models.IntegerField(verbose_name='Интервал')
+    views = models.PositiveIntegerField(default=0, verbose_name='Просмотры')
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.object_id} #{self.bucket}: {self.views}'
+
+    class Meta:
+        verbose_name = 'Агрегат просмотров'
+        verbose_name_plural = 'Агрегаты просмотров'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'bucket', 'object_id'], name='analytics_viewbucket_unique'),
+        ]
+
+
+class RecentlyViewed(models.Model):
+    """
+    Модель для списка недавно просмотренных пользователем продуктов.
+    Основная копия списка хранится в кэше; сюда она записывается лениво (см. analytics.recent).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='Пользователь')
+    # id продуктов через запятую, начиная с последнего просмотренного
+    product_ids = models.CharField(max_length=255, blank=True, default='', verbose_name='Продукты')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата последнего изменения')
+
+    def __str__(self):
+        return f'{self.user}: {self.product_ids}'
+
+    class Meta:
+        verbose_name = 'Недавно просмотренные'
+        verbose_name_plural = 'Недавно просмотренные'
@@ -0,0 +1,64 @@
+"""
+Недавно просмотренные пользователем продукты.
+
+Список хранится в кэше строкой id через запятую и ограничен RECENT_SIZE элементами:
+просмотренный продукт переносится в начало, самый давний вытесняется. Если продукт
+уже первый в списке, ничего не записывается. В базу данных (RecentlyViewed) список
+попадает лениво — через буфер с пакетной записью (upsert по пользователю), поэтому
+просмотр страницы не добавляет запросов на запись. Из базы данных список читается
+только при отсутствии в кэше.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .buffer import BufferedWriter
+from .models import RecentlyViewed
+
+RECENT_SIZE = getattr(settings, 'ANALYTICS_RECENT_SIZE', 8)
+RECENT_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+recent_buffer = BufferedWriter(
+    RecentlyViewed,
+    batch_size=getattr(settings, 'ANALYTICS_BUFFER_SIZE', 100),
+    flush_interval=getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 5.0),
+    unique_fields=['user'],
+    update_fields=['product_ids', 'updated_at'],
+)
+
+
+def encode_ids(ids):
+    return ','.join(str(pk) for pk in ids)
+
+
+def decode_ids(value):
+    return [int(pk) for pk in value.split(',') if pk.isdigit()]
+
+
+def cache_key(user_id):
+    return f'recent:{user_id}'
+
+
+def get_recent_ids(user):
+    """
+    Возвращает id недавно просмотренных продуктов, начиная с последнего.
+    """
+    key = cache_key(user.pk)
+    value = cache.get(key)
+    if value is None:
+        value = RecentlyViewed.objects.filter(user=user).values_list('product_ids', flat=True).first() or ''
+        cache.add(key, value, RECENT_CACHE_TIMEOUT)
+    return decode_ids(value)
+
+
+def push_recent(user, product_id):
+    """
+    Добавляет продукт в начало списка пользователя. Возвращает обновленный список id.
+    """
+    ids = get_recent_ids(user)
+    if ids[:1] == [product_id]:
+        return ids
+    ids = [product_id, *(pk for pk in ids if pk != product_id)][:RECENT_SIZE]
+    value = encode_ids(ids)
+    cache.set(cache_key(user.pk), value, RECENT_CACHE_TIMEOUT)
+    recent_buffer.add(RecentlyViewed(user_id=user.pk, product_ids=value))
+    return ids
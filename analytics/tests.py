@@ -0,0 +1,114 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError, ProgrammingError
+from django.test import TestCase
+
+from .buffer import BufferedWriter
+from .models import ProductViewEvent, ViewBucket
+from .tracking import (
+    ROLLUP_LOCK_KEY, aggregate_events, compute_trending, get_trending_product_ids, hour_number, rollup_views,
+)
+
+MOMENT = datetime(2026, 1, 1, 12, 30, tzinfo=dt_timezone.utc)
+
+
+def add_views(product_id, count, category_id=1, created_at=MOMENT):
+    ProductViewEvent.objects.bulk_create(
+        [ProductViewEvent(product_id=product_id, category_id=category_id, created_at=created_at)] * count
+    )
+
+
+def views_of(kind, object_id, bucket):
+    return ViewBucket.objects.values_list('views', flat=True).get(kind=kind, object_id=object_id, bucket=bucket)
+
+
+class RollupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_aggregates_and_deletes_events(self):
+        add_views(1, 3)
+        add_views(2, 2)
+        self.assertEqual(rollup_views(batch_size=2), 5)
+        self.assertFalse(ProductViewEvent.objects.exists())
+        self.assertEqual(views_of(ViewBucket.KIND_PRODUCT_HOUR, 1, hour_number(MOMENT)), 3)
+        self.assertEqual(views_of(ViewBucket.KIND_CATEGORY_HOUR, 1, hour_number(MOMENT)), 5)
+
+    def test_repeated_rollup_adds_to_existing_buckets(self):
+        add_views(1, 3)
+        rollup_views()
+        add_views(1, 2)
+        rollup_views()
+        self.assertEqual(views_of(ViewBucket.KIND_PRODUCT_HOUR, 1, hour_number(MOMENT)), 5)
+
+    def test_event_committed_after_read_is_not_deleted(self):
+        add_views(1, 2)
+        events = ProductViewEvent.objects.order_by('pk')
+        late_events = []
+
+        def aggregate_then_insert(rows):
+            # Событие с id из читаемого диапазона фиксируется после чтения пакета
+            late_events.append(ProductViewEvent.objects.create(product_id=1, category_id=1, created_at=MOMENT))
+            return aggregate_events(rows)
+
+        bounds = {'lower': events.first().pk, 'upper': events.last().pk + 1}
+        with mock.patch.object(ProductViewEvent.objects, 'aggregate', return_value=bounds), \
+                mock.patch('analytics.tracking.aggregate_events', side_effect=aggregate_then_insert):
+            self.assertEqual(rollup_views(), 2)
+        self.assertEqual(views_of(ViewBucket.KIND_PRODUCT_HOUR, 1, hour_number(MOMENT)), 2)
+        self.assertEqual(list(ProductViewEvent.objects.values_list('pk', flat=True)), [late_events[0].pk])
+
+    def test_concurrent_run_is_skipped(self):
+        add_views(1, 1)
+        cache.add(ROLLUP_LOCK_KEY, 1)
+        self.assertEqual(rollup_views(), 0)
+        self.assertEqual(ProductViewEvent.objects.count(), 1)
+        cache.delete(ROLLUP_LOCK_KEY)
+        self.assertEqual(rollup_views(), 1)
+
+    def test_trending_is_ordered_by_views(self):
+        now = datetime.now(dt_timezone.utc)
+        add_views(1, 1, created_at=now)
+        add_views(2, 3, created_at=now)
+        rollup_views()
+        compute_trending()
+        self.assertEqual(get_trending_product_ids(), [2, 1])
+
+
+class BufferedWriterTests(TestCase):
+
+    def make_writer(self, **kwargs):
+        writer = BufferedWriter(ViewBucket, flush_interval=60, **kwargs)
+        self.addCleanup(writer.flush)
+        return writer
+
+    def test_rejected_object_is_dropped_and_others_written(self):
+        writer = self.make_writer()
+        for object_id in (1, 2, 1, 3):
+            writer.add(ViewBucket(kind=ViewBucket.KIND_PRODUCT_HOUR, object_id=object_id, bucket=1, views=1))
+        with self.assertLogs('analytics.buffer', 'ERROR'):
+            self.assertEqual(writer.flush(), 3)
+        self.assertEqual(len(writer), 0)
+        self.assertEqual(sorted(ViewBucket.objects.values_list('object_id', flat=True)), [1, 2, 3])
+
+    def test_unavailable_database_requeues_up_to_max_size(self):
+        writer = self.make_writer(max_size=3)
+        for object_id in range(5):
+            writer.add(ViewBucket(kind=ViewBucket.KIND_PRODUCT_HOUR, object_id=object_id, bucket=1, views=1))
+        with mock.patch.object(ViewBucket.objects, 'bulk_create', side_effect=OperationalError), \
+                self.assertLogs('analytics.buffer', 'WARNING'):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(len(writer), 3)
+        self.assertEqual(writer.flush(), 3)
+        self.assertEqual(sorted(ViewBucket.objects.values_list('object_id', flat=True)), [2, 3, 4])
+
+    def test_other_database_errors_are_not_requeued(self):
+        writer = self.make_writer()
+        writer.add(ViewBucket(kind=ViewBucket.KIND_PRODUCT_HOUR, object_id=1, bucket=1, views=1))
+        with mock.patch.object(ViewBucket.objects, 'bulk_create', side_effect=ProgrammingError), \
+                self.assertLogs('analytics.buffer', 'ERROR'):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(len(writer), 0)
@@ -0,0 +1,181 @@
+"""
+Учет просмотров продуктов и расчет популярных ("трендовых") товаров.
+
+Просмотр записывается в буфер процесса и попадает в таблицу ProductViewEvent пакетами.
+Команда rollup_views агрегирует события в почасовые и посуточные интервалы по продуктам
+и категориям, удаляет обработанные события и пересчитывает список популярных товаров,
+который хранится в кэше и читается за одно обращение. Одновременно выполняется только
+один запуск агрегации (блокировка через cache.add); строки интервалов, кроме того,
+блокируются select_for_update, поэтому прибавление просмотров не теряется.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from .buffer import BufferedWriter
+from .models import ProductViewEvent, ViewBucket
+
+TRENDING_CACHE_KEY = 'analytics:trending'
+TRENDING_SIZE = getattr(settings, 'ANALYTICS_TRENDING_SIZE', 10)
+TRENDING_WINDOW_HOURS = getattr(settings, 'ANALYTICS_TRENDING_WINDOW_HOURS', 24)
+# Список популярных товаров живет два интервала запуска rollup_views: если команда перестала
+# запускаться, устаревший список исчезает, а не показывается бессрочно
+TRENDING_CACHE_TIMEOUT = 2 * getattr(settings, 'ANALYTICS_ROLLUP_INTERVAL', 10 * 60)
+ROLLUP_LOCK_KEY = 'analytics:rollup:lock'
+ROLLUP_LOCK_TIMEOUT = getattr(settings, 'ANALYTICS_ROLLUP_INTERVAL', 10 * 60)
+
+view_buffer = BufferedWriter(
+    ProductViewEvent,
+    batch_size=getattr(settings, 'ANALYTICS_BUFFER_SIZE', 100),
+    flush_interval=getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 5.0),
+)
+
+
+def hour_number(moment):
+    return int(moment.timestamp() // 3600)
+
+
+def day_number(moment):
+    return int(moment.timestamp() // 86400)
+
+
+def record_product_view(product):
+    """
+    Регистрирует просмотр продукта. Запись в базу данных выполняется пакетами.
+    """
+    view_buffer.add(ProductViewEvent(
+        product_id=product.pk, category_id=product.category_id, created_at=timezone.now()
+    ))
+
+
+def aggregate_events(events):
+    """
+    Подсчитывает просмотры по ключам (тип интервала, id объекта, номер интервала).
+    """
+    counts = Counter()
+    for product_id, category_id, created_at in events:
+        hour, day = hour_number(created_at), day_number(created_at)
+        counts[(ViewBucket.KIND_PRODUCT_HOUR, product_id, hour)] += 1
+        counts[(ViewBucket.KIND_PRODUCT_DAY, product_id, day)] += 1
+        counts[(ViewBucket.KIND_CATEGORY_HOUR, category_id, hour)] += 1
+        counts[(ViewBucket.KIND_CATEGORY_DAY, category_id, day)] += 1
+    return counts
+
+
+def merge_counts(counts):
+    """
+    Прибавляет посчитанные просмотры к существующим интервалам и создает недостающие.
+    Вызывается в транзакции: существующие интервалы блокируются до ее завершения.
+    """
+    existing = {}
+    for kind in {key[0] for key in counts}:
+        keys = [key for key in counts if key[0] == kind]
+        buckets = ViewBucket.objects.select_for_update().filter(
+            kind=kind,
+            bucket__in={key[2] for key in keys},
+            object_id__in={key[1] for key in keys},
+        )
+        for bucket in buckets:
+            existing[(bucket.kind, bucket.object_id, bucket.bucket)] = bucket
+
+    to_update, to_create = [], []
+    for (kind, object_id, bucket_number), views in counts.items():
+        bucket = existing.get((kind, object_id, bucket_number))
+        if bucket is not None:
+            bucket.views += views
+            to_update.append(bucket)
+        else:
+            to_create.append(ViewBucket(kind=kind, object_id=object_id, bucket=bucket_number, views=views))
+    ViewBucket.objects.bulk_update(to_update, ['views'], batch_size=1000)
+    ViewBucket.objects.bulk_create(to_create, batch_size=1000)
+
+
+def rollup_views(batch_size=10000):
+    """
+    Агрегирует сырые события пакетами по id и удаляет прочитанные события в той же транзакции.
+    Возвращает количество обработанных событий; если агрегация уже выполняется другим
+    процессом, ничего не делает и возвращает 0.
+    """
+    if not cache.add(ROLLUP_LOCK_KEY, 1, ROLLUP_LOCK_TIMEOUT):
+        return 0
+    try:
+        return rollup_events(batch_size)
+    finally:
+        cache.delete(ROLLUP_LOCK_KEY)
+
+
+def rollup_events(batch_size):
+    """
+    Выполняет агрегацию для rollup_views; вызывается под блокировкой ROLLUP_LOCK_KEY.
+    """
+    bounds = ProductViewEvent.objects.aggregate(lower=Min('pk'), upper=Max('pk'))
+    if bounds['upper'] is None:
+        return 0
+    upper = bounds['upper']
+    processed = 0
+    # Обход начинается с наименьшего оставшегося id: обработанные события уже удалены
+    start = bounds['lower'] - 1
+    while start < upper:
+        end = min(start + batch_size, upper)
+        with transaction.atomic():
+            rows = list(
+                ProductViewEvent.objects
+                .filter(pk__gt=start, pk__lte=end)
+                .values_list('pk', 'product_id', 'category_id', 'created_at')
+            )
+            if rows:
+                merge_counts(aggregate_events(row[1:] for row in rows))
+                # Удаляются только прочитанные события: событие, которое зафиксировано в этом
+                # диапазоне id после чтения, будет учтено следующим запуском
+                ProductViewEvent.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        processed += len(rows)
+        start = end
+    return processed
+
+
+def prune_buckets(hourly_days=7, daily_days=365):
+    """
+    Удаляет почасовые интервалы старше hourly_days дней и посуточные старше daily_days дней.
+    """
+    now = timezone.now()
+    deleted_hours, _ = ViewBucket.objects.filter(
+        kind__in=[ViewBucket.KIND_PRODUCT_HOUR, ViewBucket.KIND_CATEGORY_HOUR],
+        bucket__lt=hour_number(now - timedelta(days=hourly_days)),
+    ).delete()
+    deleted_days, _ = ViewBucket.objects.filter(
+        kind__in=[ViewBucket.KIND_PRODUCT_DAY, ViewBucket.KIND_CATEGORY_DAY],
+        bucket__lt=day_number(now - timedelta(days=daily_days)),
+    ).delete()
+    return deleted_hours + deleted_days
+
+
+def compute_trending(size=TRENDING_SIZE):
+    """
+    Рассчитывает самые просматриваемые продукты за последние TRENDING_WINDOW_HOURS часов
+    и сохраняет список [(id продукта, просмотры)] в кэше.
+    """
+    since = hour_number(timezone.now()) - TRENDING_WINDOW_HOURS + 1
+    trending = list(
+        ViewBucket.objects
+        .filter(kind=ViewBucket.KIND_PRODUCT_HOUR, bucket__gte=since)
+        .values('object_id')
+        .annotate(total=Sum('views'))
+        .order_by('-total', 'object_id')
+        .values_list('object_id', 'total')[:size]
+    )
+    cache.set(TRENDING_CACHE_KEY, trending, TRENDING_CACHE_TIMEOUT)
+    return trending
+
+
+def get_trending_product_ids(limit=TRENDING_SIZE):
+    """
+    Возвращает id самых популярных продуктов из кэша. Если списка в кэше нет, возвращает
+    пустой список: список рассчитывает только команда rollup_views, а не запрос посетителя.
+    """
+    trending = cache.get(TRENDING_CACHE_KEY) or []
+    return [product_id for product_id, _views in trending[:limit]]
@@ -11,4 +11,11 @@ class BlogAdmin(admin.ModelAdmin):
     list_filter = ('is_published', 'created_at')
     search_fields = ('title', 'content')
     # Автоматически заполняет поле 'slug' на основе 'title' при создании/редактировании
-    prepopulated_fields = {'slug': ('title',)}
\ No newline at end of file
+    prepopulated_fields = {'slug': ('title',)}
+
+    def save_model(self, request, obj, form, change):
+        """
+        Рендерит содержимое статьи перед сохранением из админ-панели.
+        """
+        obj.render_content()
+        super().save_model(request, obj, form, change)
@@ -1,10 +1,14 @@
 from django import forms
+from uploads.forms import ChunkedUploadFormMixin
 from .models import Blog
 
-class BlogForm(forms.ModelForm):
+class BlogForm(ChunkedUploadFormMixin, forms.ModelForm):
     """
     Форма для создания и редактирования объектов модели Blog.
+    Превью загружается поблочно и проверяется по ограничениям назначения blog_preview.
     """
     class Meta:
         model = Blog
-        fields = ['title', 'content', 'preview', 'is_published', 'slug']
\ No newline at end of file
+        fields = ['title', 'content', 'preview', 'is_published', 'slug']
+
+    chunked_upload_fields = {'preview': 'blog_preview'}
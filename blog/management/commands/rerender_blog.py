@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Blog
+from blog.rendering import RENDERER_VERSION
+from changefeed.tracking import record_updates
+
+RENDERED_FIELDS = ['content_html', 'excerpt', 'reading_time', 'renderer_version']
+
+
+class Command(BaseCommand):
+    help = 'Re-renders blog content (HTML, excerpt, reading time) for posts rendered by an older renderer version.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render every post, not only outdated ones.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Number of posts updated per query.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Blog.objects.only('pk', 'content', *RENDERED_FIELDS).order_by('pk')
+        if not options['all']:
+            queryset = queryset.exclude(renderer_version=RENDERER_VERSION)
+
+        batch = []
+        total = 0
+        for post in queryset.iterator(chunk_size=batch_size):
+            post.render_content()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                total += self.save_batch(batch)
+                batch = []
+        if batch:
+            total += self.save_batch(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-rendered {total} blog post(s) with renderer version {RENDERER_VERSION}.'
+        ))
+
+    @staticmethod
+    def save_batch(batch):
+        """
+        Сохраняет пакет статей одним запросом; bulk_update не отправляет сигналов,
+        поэтому события журнала изменений записываются явно в той же транзакции.
+        """
+        with transaction.atomic():
+            updated = Blog.objects.bulk_update(batch, RENDERED_FIELDS)
+            record_updates(Blog, [post.pk for post in batch])
+        return updated
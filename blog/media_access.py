@@ -0,0 +1,19 @@
+"""
+Проверка доступа к превью статей для uploads.serving (настройка MEDIA_ACCESS_HOOKS).
+"""
+from uploads.serving import DENIED, PRIVATE, PUBLIC
+
+from .models import Blog
+
+
+def blog_preview_access(request, name):
+    """
+    Превью, которое используется только неопубликованными статьями,
+    доступно лишь пользователям с правом изменения статей.
+    """
+    published = set(Blog.objects.filter(preview=name).values_list('is_published', flat=True))
+    if not published or True in published:
+        return PUBLIC
+    if request.user.has_perm('blog.change_blog'):
+        return PRIVATE
+    return DENIED
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='content_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Содержимое (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='excerpt',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Выдержка'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Время чтения, мин'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='renderer_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия рендерера'),
+        ),
+    ]
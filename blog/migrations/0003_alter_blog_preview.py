@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_blog_content_html_blog_excerpt_blog_reading_time_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blog',
+            name='preview',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='blog/', verbose_name='Изображение'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
 
-class Blog(models.Model):
+from changefeed.tracking import ChangeTrackedMixin
+
+from .rendering import RENDERER_VERSION, estimate_reading_time, make_excerpt, render_markdown
+
+class Blog(ChangeTrackedMixin, models.Model):
     """
     Модель для представления записи в блоге.
     Содержит информацию о статье, такую как заголовок, содержимое, изображение,
@@ -10,14 +14,30 @@ class Blog(models.Model):
     # Slug для формирования ЧПУ (человекопонятного URL). Генерируется автоматически из заголовка.
     slug = models.CharField(max_length=150, verbose_name='slug', null=True, blank=True)
     content = models.TextField(verbose_name='Содержимое')
-    preview = models.ImageField(upload_to='blog/', verbose_name='Изображение', null=True, blank=True)
+    # Индекс используется проверкой доступа к превью при их отдаче (blog.media_access)
+    preview = models.ImageField(upload_to='blog/', verbose_name='Изображение', null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     is_published = models.BooleanField(default=True, verbose_name='Опубликовано')
     views_count = models.IntegerField(default=0, verbose_name='Количество просмотров')
+    # Результаты рендеринга содержимого. Заполняются при сохранении статьи методом render_content().
+    content_html = models.TextField(blank=True, default='', editable=False, verbose_name='Содержимое (HTML)')
+    excerpt = models.TextField(blank=True, default='', editable=False, verbose_name='Выдержка')
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Время чтения, мин')
+    renderer_version = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия рендерера')
 
     def __str__(self):
         return self.title
 
+    def render_content(self):
+        """
+        Преобразует содержимое в HTML и заполняет выдержку и время чтения.
+        Вызывается перед сохранением статьи, чтобы не выполнять эту работу при каждом просмотре.
+        """
+        self.content_html = render_markdown(self.content)
+        self.excerpt = make_excerpt(self.content_html)
+        self.reading_time = estimate_reading_time(self.content)
+        self.renderer_version = RENDERER_VERSION
+
     class Meta:
         verbose_name = 'Запись блога'
         verbose_name_plural = 'Записи блога'
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Преобразование содержимого статей блога в HTML.
+
+Поддерживается простой текст и подмножество Markdown: заголовки (#), списки (-, *, 1.),
+цитаты (>), блоки кода (```), а также **жирный**, *курсив*, `код` и [ссылки](https://...).
+Исходный текст экранируется до разметки, поэтому пользовательский HTML в результат не попадает,
+а ссылки допускаются только со схемами http, https и mailto или относительные.
+
+Результат рендеринга сохраняется в модели Blog при сохранении статьи.
+При изменении правил рендеринга увеличьте RENDERER_VERSION и выполните команду rerender_blog.
+"""
+import html
+import math
+import re
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+RENDERER_VERSION = 1
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*)$')
+UNORDERED_ITEM_RE = re.compile(r'^[-*]\s+(.*)$')
+ORDERED_ITEM_RE = re.compile(r'^\d+[.)]\s+(.*)$')
+QUOTE_RE = re.compile(r'^>\s?(.*)$')
+FENCE_RE = re.compile(r'^```')
+
+CODE_SPAN_RE = re.compile(r'`([^`]+)`')
+BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+ITALIC_RE = re.compile(r'(?<![*\w])[*_](?![*_\s])(.+?)(?<![*_\s])[*_](?![*\w])')
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+SAFE_URL_RE = re.compile(r'^(https?://|mailto:|/|#)', re.IGNORECASE)
+WORD_RE = re.compile(r'\w+')
+
+
+def render_inline(text):
+    """
+    Экранирует строку и применяет строчную разметку.
+    """
+    code_spans = []
+
+    def keep_code(match):
+        code_spans.append(f'<code>{match.group(1)}</code>')
+        return f'\x00{len(code_spans) - 1}\x00'
+
+    def link(match):
+        label, url = match.groups()
+        if not SAFE_URL_RE.match(html.unescape(url)):
+            return label
+        return f'<a href="{url}" rel="nofollow noopener">{label}</a>'
+
+    text = html.escape(text, quote=True)
+    text = CODE_SPAN_RE.sub(keep_code, text)
+    text = LINK_RE.sub(link, text)
+    text = BOLD_RE.sub(r'<strong>\1</strong>', text)
+    text = ITALIC_RE.sub(r'<em>\1</em>', text)
+    return re.sub('\x00(\\d+)\x00', lambda match: code_spans[int(match.group(1))], text)
+
+
+def iter_blocks(lines):
+    """
+    Разбивает строки на блоки (тип, строки). Блоки разделяются пустыми строками,
+    блок кода ограничивается строками ```.
+    """
+    block_type, block = None, []
+    in_code = False
+    for line in lines:
+        if in_code:
+            if FENCE_RE.match(line):
+                yield 'code', block
+                block_type, block, in_code = None, [], False
+            else:
+                block.append(line)
+            continue
+        if FENCE_RE.match(line):
+            if block:
+                yield block_type, block
+            block_type, block, in_code = 'code', [], True
+            continue
+        if not line.strip():
+            if block:
+                yield block_type, block
+            block_type, block = None, []
+            continue
+        if HEADING_RE.match(line):
+            if block:
+                yield block_type, block
+            yield 'heading', [line]
+            block_type, block = None, []
+            continue
+        if UNORDERED_ITEM_RE.match(line):
+            line_type = 'ul'
+        elif ORDERED_ITEM_RE.match(line):
+            line_type = 'ol'
+        elif QUOTE_RE.match(line):
+            line_type = 'quote'
+        else:
+            line_type = 'paragraph'
+        if block and line_type != block_type and not (line_type == 'paragraph' and block_type in ('ul', 'ol')):
+            yield block_type, block
+            block = []
+        if not block:
+            block_type = line_type
+        block.append(line)
+    if block:
+        yield block_type, block
+
+
+def render_list_items(block, item_re):
+    items = []
+    for line in block:
+        match = item_re.match(line)
+        if match:
+            items.append(match.group(1))
+        elif items:
+            # Строка-продолжение предыдущего пункта списка
+            items[-1] = f'{items[-1]} {line.strip()}'
+    return ''.join(f'<li>{render_inline(item)}</li>' for item in items)
+
+
+def render_markdown(text):
+    """
+    Преобразует текст статьи в безопасный HTML.
+    """
+    lines = (text or '').replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    parts = []
+    for block_type, block in iter_blocks(lines):
+        if block_type == 'code':
+            parts.append(f'<pre><code>{html.escape(chr(10).join(block))}</code></pre>')
+        elif block_type == 'heading':
+            hashes, title = HEADING_RE.match(block[0]).groups()
+            level = len(hashes)
+            parts.append(f'<h{level}>{render_inline(title)}</h{level}>')
+        elif block_type == 'ul':
+            parts.append(f'<ul>{render_list_items(block, UNORDERED_ITEM_RE)}</ul>')
+        elif block_type == 'ol':
+            parts.append(f'<ol>{render_list_items(block, ORDERED_ITEM_RE)}</ol>')
+        elif block_type == 'quote':
+            quote = '<br>'.join(render_inline(QUOTE_RE.match(line).group(1)) for line in block)
+            parts.append(f'<blockquote>{quote}</blockquote>')
+        else:
+            parts.append(f'<p>{"<br>".join(render_inline(line.strip()) for line in block)}</p>')
+    return '\n'.join(parts)
+
+
+def make_excerpt(content_html, length=EXCERPT_LENGTH):
+    """
+    Возвращает текстовую выдержку из отрендеренного HTML.
+    """
+    # Пробел перед каждым тегом не дает склеиться словам из соседних блоков и строк
+    text = html.unescape(strip_tags(content_html.replace('<', ' <')))
+    return Truncator(' '.join(text.split())).chars(length)
+
+
+def estimate_reading_time(text):
+    """
+    Возвращает оценку времени чтения в минутах (не менее одной минуты).
+    """
+    words = len(WORD_RE.findall(text or ''))
+    return max(1, math.ceil(words / WORDS_PER_MINUTE))
@@ -1,12 +1,58 @@
+from django.conf import settings
 from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.core.mail import send_mail
 from slugify import slugify as slugify_lib # Используем slugify из python-slugify
 
+from analytics.buffer import BufferedCounter
+from pagecache.swr import StaleWhileRevalidateMixin
+from uploads.views import ChunkedUploadViewMixin
+
 from .models import Blog
 from .forms import BlogForm
 
-class BlogListView(ListView):
+def notify_views_milestone(blog):
+    """
+    Дополнительное задание: отправка email при достижении статьей 100 просмотров.
+    """
+    subject = f"Поздравляем! Статья '{blog.title}' достигла 100 просмотров!"
+    message = f"Ваша статья '{blog.title}' только что достигла 100 просмотров на сайте."
+    from_email = 'your_email@example.com'  # Замените на свой email
+    recipient_list = ['your_email@example.com']  # Замените на свой email
+    try:
+        send_mail(subject, message, from_email, recipient_list, fail_silently=False)
+        print(f"Email отправлен: '{blog.title}' достигла 100 просмотров.")
+    except Exception as e:
+        print(f"Ошибка при отправке email: {e}")
+    # Для корректной работы отправки email необходимо настроить параметры EMAIL_BACKEND, EMAIL_HOST,
+    # EMAIL_PORT, EMAIL_HOST_USER, EMAIL_HOST_PASSWORD в файле settings.py.
+    # Пример настройки для Gmail:
+    # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    # EMAIL_HOST = 'smtp.gmail.com'
+    # EMAIL_PORT = 587
+    # EMAIL_USE_TLS = True
+    # EMAIL_HOST_USER = 'your_email@gmail.com'
+    # EMAIL_HOST_PASSWORD = 'your_app_password' # Используйте пароль приложения, не пароль от аккаунта Google
+
+
+def check_views_milestone(increments):
+    """
+    После записи накопленных просмотров уведомляет о статьях, счетчик которых перешел отметку 100.
+    """
+    for blog in Blog.objects.filter(pk__in=increments).only('pk', 'title', 'views_count'):
+        if blog.views_count - increments[blog.pk] < 100 <= blog.views_count:
+            notify_views_milestone(blog)
+
+
+# Просмотры статей накапливаются в памяти и записываются в базу данных одним UPDATE на статью
+views_counter = BufferedCounter(
+    Blog, 'views_count',
+    flush_interval=getattr(settings, 'BLOG_VIEWS_FLUSH_INTERVAL', 5.0),
+    on_flush=check_views_milestone,
+)
+
+
+class BlogListView(StaleWhileRevalidateMixin, ListView):
     """
     Представление для отображения списка статей блога.
     Использует ListView для автоматической обработки списка объектов.
@@ -21,9 +67,10 @@ class BlogListView(ListView):
         """
         queryset = super().get_queryset(*args, **kwargs)
         queryset = queryset.filter(is_published=True)  # Фильтрация по опубликованным статьям
-        return queryset
+        # Полный текст статьи в списке не нужен: используется сохраненная выдержка
+        return queryset.defer('content', 'content_html')
 
-class BlogDetailView(DetailView):
+class BlogDetailView(StaleWhileRevalidateMixin, DetailView):
     """
     Представление для отображения детальной информации об одной статье блога.
     Использует DetailView для автоматического извлечения объекта по его slug.
@@ -34,35 +81,23 @@ class BlogDetailView(DetailView):
 
     def get_object(self, queryset=None):
         """
-        Переопределяет получение объекта для увеличения счетчика просмотров
-        и отправки уведомления по email при достижении 100 просмотров.
+        Переопределяет получение объекта для учета просмотра.
         """
         self.object = super().get_object(queryset)
-        self.object.views_count += 1
-        self.object.save()
-        # Дополнительное задание: отправка email при достижении 100 просмотров
-        if self.object.views_count == 100:
-            subject = f"Поздравляем! Статья '{self.object.title}' достигла 100 просмотров!"
-            message = f"Ваша статья '{self.object.title}' только что достигла 100 просмотров на сайте."
-            from_email = 'your_email@example.com'  # Замените на свой email
-            recipient_list = ['your_email@example.com']  # Замените на свой email
-            try:
-                send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-                print(f"Email отправлен: '{self.object.title}' достигла 100 просмотров.")
-            except Exception as e:
-                print(f"Ошибка при отправке email: {e}")
-            # Для корректной работы отправки email необходимо настроить параметры EMAIL_BACKEND, EMAIL_HOST,
-            # EMAIL_PORT, EMAIL_HOST_USER, EMAIL_HOST_PASSWORD в файле settings.py.
-            # Пример настройки для Gmail:
-            # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-            # EMAIL_HOST = 'smtp.gmail.com'
-            # EMAIL_PORT = 587
-            # EMAIL_USE_TLS = True
-            # EMAIL_HOST_USER = 'your_email@gmail.com'
-            # EMAIL_HOST_PASSWORD = 'your_app_password' # Используйте пароль приложения, не пароль от аккаунта Google
+        # Рендеринг статической копии страницы (render_static_site, кэш страниц) не считается просмотром
+        if getattr(self.request, 'static_render', False):
+            return self.object
+        views_counter.add(self.object.pk)
         return self.object
 
-class BlogCreateView(CreateView):
+    def page_cache_hit(self, request, object_pk):
+        """
+        Учитывает просмотр страницы, отданной из кэша.
+        """
+        if object_pk is not None:
+            views_counter.add(object_pk)
+
+class BlogCreateView(ChunkedUploadViewMixin, CreateView):
     """
     Представление для создания новой статьи блога.
     Автоматически генерирует slug из заголовка или транслитерирует введенный пользователем slug.
@@ -83,9 +118,10 @@ class BlogCreateView(CreateView):
             # Если пользователь предоставил slug, транслитерируем его для обеспечения ASCII-совместимости
             form.instance.slug = slugify_lib(form.instance.slug)
         print(f"DEBUG: Slug before saving: '{form.instance.slug}' (type: {type(form.instance.slug)})") # Отладочный вывод
+        form.instance.render_content()  # HTML, выдержка и время чтения вычисляются один раз при сохранении
         return super().form_valid(form)
 
-class BlogUpdateView(UpdateView):
+class BlogUpdateView(ChunkedUploadViewMixin, UpdateView):
     """
     Представление для редактирования существующей статьи блога.
     Автоматически транслитерирует введенный пользователем slug, если он изменен.
@@ -105,6 +141,7 @@ class BlogUpdateView(UpdateView):
             # Если пользователь предоставил slug, транслитерируем его для обеспечения ASCII-совместимости
             form.instance.slug = slugify_lib(form.instance.slug)
         print(f"DEBUG: Slug before saving: '{form.instance.slug}' (type: {type(form.instance.slug)})") # Отладочный вывод
+        form.instance.render_content()  # HTML, выдержка и время чтения вычисляются один раз при сохранении
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import Order, OrderItem, SavedCart
+
+
+class OrderItemInline(admin.TabularInline):
+    """
+    Позиции заказа на странице заказа.
+    """
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ('product',)
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    """
+    Административная панель для модели Order.
+    """
+    list_display = ('id', 'user', 'total', 'created_at',)
+    list_select_related = ('user',)
+    inlines = (OrderItemInline,)
+
+
+@admin.register(SavedCart)
+class SavedCartAdmin(admin.ModelAdmin):
+    """
+    Административная панель для модели SavedCart.
+    """
+    list_display = ('user', 'data', 'updated_at',)
+    list_select_related = ('user',)
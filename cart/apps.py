@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class CartConfig(AppConfig):
+    """
+    Конфигурация приложения "Корзина".
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'cart'
+    verbose_name = "Корзина"
+
+    def ready(self):
+        # Подключение обработчика слияния корзины при входе пользователя
+        from . import signals  # noqa: F401
@@ -0,0 +1,225 @@
+"""
+Корзина покупателя, хранящаяся в кэше.
+
+Корзина идентифицируется случайным токеном из cookie и не использует сессию:
+добавление товара — это чтение и запись в кэш под короткой блокировкой (cache.add),
+чтобы одновременные запросы не теряли изменений друг друга. Цены и наличие товаров
+проверяются одним пакетным запросом при отображении корзины.
+
+В базу данных корзина анонимного посетителя записывается только при оформлении заказа.
+Корзина вошедшего пользователя (Cart.from_request(request, bind_user=True)) при каждом
+изменении сохраняется в SavedCart, поэтому удаленный товар не возвращается при следующем входе.
+"""
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from catalog.models import Product
+
+from .models import SavedCart
+
+CART_COOKIE_NAME = getattr(settings, 'CART_COOKIE_NAME', 'cart_id')
+CART_TIMEOUT = getattr(settings, 'CART_TIMEOUT', 60 * 60 * 24 * 14)
+CART_MAX_LINES = getattr(settings, 'CART_MAX_LINES', 100)
+CART_MAX_QUANTITY = getattr(settings, 'CART_MAX_QUANTITY', 99)
+# Блокировка корзины на время изменения: срок жизни и максимальное ожидание (в секундах)
+CART_LOCK_TIMEOUT = 5
+CART_LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.01
+
+TOKEN_RE = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+
+def encode_lines(lines):
+    """
+    Кодирует позиции корзины {id продукта: количество} в компактную строку вида "12:1,15:3".
+    """
+    return ','.join(f'{product_id}:{quantity}' for product_id, quantity in lines.items())
+
+
+def decode_lines(data):
+    """
+    Декодирует строку, полученную от encode_lines(). Некорректные фрагменты пропускаются.
+    """
+    lines = {}
+    for chunk in (data or '').split(','):
+        product_id, _, quantity = chunk.partition(':')
+        if product_id.isdigit() and quantity.isdigit() and int(quantity) > 0:
+            lines[int(product_id)] = min(int(quantity), CART_MAX_QUANTITY)
+    return lines
+
+
+def merge_lines(*carts):
+    """
+    Объединяет несколько наборов позиций, беря для одинаковых товаров наибольшее количество.
+    Объединение идемпотентно: cookie корзины переживает выход, а сохраненная корзина хранит
+    результат прошлого слияния, поэтому повторный вход не должен увеличивать количество.
+    """
+    merged = {}
+    for lines in carts:
+        for product_id, quantity in lines.items():
+            if product_id in merged or len(merged) < CART_MAX_LINES:
+                merged[product_id] = min(max(merged.get(product_id, 0), quantity), CART_MAX_QUANTITY)
+    return merged
+
+
+@contextmanager
+def cart_lock(key):
+    """
+    Короткая блокировка корзины через cache.add. Если блокировка не получена за CART_LOCK_WAIT
+    секунд (например, процесс-владелец завершился), изменение выполняется без нее.
+    """
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + CART_LOCK_WAIT
+    acquired = cache.add(lock_key, 1, CART_LOCK_TIMEOUT)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        acquired = cache.add(lock_key, 1, CART_LOCK_TIMEOUT)
+    try:
+        yield
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+
+
+@dataclass
+class CartLine:
+    """
+    Позиция корзины с актуальными данными продукта.
+    """
+    product: Product
+    quantity: int
+
+    @property
+    def total(self):
+        return self.product.price * self.quantity
+
+
+class Cart:
+    """
+    Корзина, привязанная к токену из cookie и хранящаяся в кэше.
+    """
+
+    def __init__(self, token=None, user=None):
+        self.is_new = token is None or not TOKEN_RE.match(token)
+        self.token = secrets.token_urlsafe(16) if self.is_new else token
+        # Пользователь, в SavedCart которого сохраняются изменения корзины
+        self.user = user
+        self.lines = {} if self.is_new else self.load()
+
+    @classmethod
+    def from_request(cls, request, bind_user=False):
+        """
+        Возвращает корзину по токену из cookie запроса.
+        bind_user — сохранять изменения корзины вошедшего пользователя в SavedCart.
+        """
+        user = request.user if bind_user and request.user.is_authenticated else None
+        return cls(request.COOKIES.get(CART_COOKIE_NAME), user=user)
+
+    @property
+    def cache_key(self):
+        return f'cart:{self.token}'
+
+    def __len__(self):
+        """
+        Возвращает общее количество единиц товара в корзине.
+        """
+        return sum(self.lines.values())
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def load(self):
+        return decode_lines(cache.get(self.cache_key))
+
+    def add(self, product_id, quantity=1, override=False):
+        """
+        Добавляет товар в корзину или изменяет его количество.
+        Существование товара не проверяется: это делается при отображении корзины.
+        """
+        with cart_lock(self.cache_key):
+            # Корзину могли изменить после ее загрузки в этом запросе
+            self.lines = self.load()
+            if product_id not in self.lines and len(self.lines) >= CART_MAX_LINES:
+                return
+            current = 0 if override else self.lines.get(product_id, 0)
+            quantity = min(current + quantity, CART_MAX_QUANTITY)
+            if quantity > 0:
+                self.lines[product_id] = quantity
+            else:
+                self.lines.pop(product_id, None)
+            self.save()
+
+    def remove(self, product_id):
+        """
+        Удаляет товар из корзины.
+        """
+        with cart_lock(self.cache_key):
+            self.lines = self.load()
+            if self.lines.pop(product_id, None) is not None:
+                self.save()
+
+    def replace(self, lines):
+        """
+        Заменяет содержимое корзины, например после слияния при входе пользователя.
+        """
+        with cart_lock(self.cache_key):
+            self.lines = dict(lines)
+            self.save()
+
+    def clear(self):
+        """
+        Очищает корзину (и сохраненную корзину пользователя, если она привязана).
+        """
+        self.lines = {}
+        cache.delete(self.cache_key)
+        self.save_for_user()
+
+    def save(self):
+        cache.set(self.cache_key, encode_lines(self.lines), CART_TIMEOUT)
+        self.save_for_user()
+
+    def save_for_user(self):
+        """
+        Сохраняет содержимое корзины в SavedCart привязанного пользователя.
+        """
+        if self.user is None:
+            return
+        if self.lines:
+            SavedCart.objects.update_or_create(user=self.user, defaults={'data': encode_lines(self.lines)})
+        else:
+            SavedCart.objects.filter(user=self.user).delete()
+
+    def get_lines(self):
+        """
+        Возвращает позиции корзины с продуктами, загруженными одним запросом.
+        Снятые с публикации и удаленные товары в результат не попадают.
+        """
+        if not self.lines:
+            return []
+        products = Product.objects.published().in_bulk(list(self.lines))
+        return [
+            CartLine(product=products[product_id], quantity=quantity)
+            for product_id, quantity in self.lines.items()
+            if product_id in products
+        ]
+
+    @staticmethod
+    def get_total(lines):
+        return sum((line.total for line in lines), Decimal('0'))
+
+    def set_cookie(self, response):
+        """
+        Устанавливает cookie с токеном корзины, если корзина была создана в этом запросе.
+        """
+        if self.is_new:
+            response.set_cookie(
+                CART_COOKIE_NAME, self.token, max_age=CART_TIMEOUT, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,12 @@
+from .cart import Cart
+
+
+def cart(request):
+    """
+    Добавляет в контекст количество товаров в корзине.
+    Значение вычисляется лениво: кэш читается только если шаблон его использует.
+    В статических копиях страниц значение пустое и заполняется скриптом через cart:count.
+    """
+    if getattr(request, 'static_render', False):
+        return {'cart_count': ''}
+    return {'cart_count': lambda: len(Cart.from_request(request))}
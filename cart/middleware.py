@@ -0,0 +1,15 @@
+class CartCookieMiddleware:
+    """
+    Устанавливает cookie с токеном корзины, созданной во время обработки запроса
+    вне представлений корзины (например, при восстановлении сохраненной корзины при входе).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        cart = getattr(request, 'new_cart', None)
+        if cart is not None:
+            cart.set_cookie(response)
+        return response
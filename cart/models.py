@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.db import models
+
+from catalog.models import Product
+
+
+class SavedCart(models.Model):
+    """
+    Модель для долговременного хранения корзины пользователя.
+    Записывается при слиянии корзин во время входа и при каждом изменении корзины
+    вошедшим пользователем; удаляется, когда корзина становится пустой или оформляется заказ.
+    Содержимое хранится в компактной строковой кодировке (см. cart.cart.encode_lines).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='Пользователь')
+    data = models.TextField(blank=True, default='', verbose_name='Содержимое')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата последнего изменения')
+
+    def __str__(self):
+        return f'Корзина {self.user}'
+
+    class Meta:
+        verbose_name = 'Сохраненная корзина'
+        verbose_name_plural = 'Сохраненные корзины'
+
+
+class Order(models.Model):
+    """
+    Модель для представления оформленного заказа.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='Пользователь')
+    total = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Сумма заказа')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+
+    def __str__(self):
+        return f'Заказ №{self.pk} ({self.user})'
+
+    class Meta:
+        verbose_name = 'Заказ'
+        verbose_name_plural = 'Заказы'
+
+
+class OrderItem(models.Model):
+    """
+    Модель для представления позиции заказа. Цена фиксируется на момент оформления.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items', verbose_name='Заказ')
+    # Заказ сохраняется и после удаления товара из каталога (например, командой fill):
+    # название товара фиксируется на момент оформления вместе с ценой
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, verbose_name='Продукт')
+    product_name = models.CharField(max_length=100, verbose_name='Название товара')
+    quantity = models.PositiveIntegerField(verbose_name='Количество')
+    price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Цена товара')
+
+    def __str__(self):
+        return f'{self.product_name} x {self.quantity}'
+
+    class Meta:
+        verbose_name = 'Позиция заказа'
+        verbose_name_plural = 'Позиции заказа'
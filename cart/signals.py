@@ -0,0 +1,41 @@
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.dispatch import receiver
+
+from .cart import Cart, decode_lines, encode_lines, merge_lines
+from .models import SavedCart
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    """
+    При входе объединяет текущую корзину из кэша с сохраненной корзиной пользователя
+    и записывает результат в базу данных. Дальнейшие изменения корзины вошедшего пользователя
+    сохраняются в SavedCart представлениями корзины (Cart.from_request(..., bind_user=True)).
+    """
+    if request is None:
+        return
+    cart = Cart.from_request(request)
+    saved_cart = SavedCart.objects.filter(user=user).first()
+    saved_lines = decode_lines(saved_cart.data) if saved_cart else {}
+    merged = merge_lines(saved_lines, cart.lines)
+    if not merged:
+        return
+    if merged != cart.lines:
+        cart.replace(merged)
+    if merged != saved_lines:
+        SavedCart.objects.update_or_create(user=user, defaults={'data': encode_lines(merged)})
+    # Cookie для новой корзины устанавливает CartCookieMiddleware в ответе на вход
+    if cart.is_new:
+        request.new_cart = cart
+
+
+@receiver(user_logged_out)
+def clear_cart_on_logout(sender, request, user, **kwargs):
+    """
+    При выходе очищает корзину в кэше (сохраненная корзина пользователя остается).
+    Иначе копия корзины в cookie этого браузера при следующем входе вернула бы товары,
+    удаленные пользователем на другом устройстве.
+    """
+    if request is None:
+        return
+    Cart.from_request(request).clear()
@@ -0,0 +1,100 @@
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import Category, Product
+from users.models import User
+
+from .cart import CART_COOKIE_NAME, Cart, decode_lines, merge_lines
+from .models import SavedCart
+
+
+class MergeLinesTests(TestCase):
+
+    def test_takes_largest_quantity(self):
+        self.assertEqual(merge_lines({1: 2, 2: 1}, {1: 1, 3: 4}), {1: 2, 2: 1, 3: 4})
+
+    def test_is_idempotent(self):
+        saved, cookie = {1: 2, 2: 1}, {1: 3, 4: 1}
+        merged = merge_lines(saved, cookie)
+        self.assertEqual(merge_lines(merged, cookie), merged)
+        self.assertEqual(merge_lines(merged, merged), merged)
+
+
+class CartConcurrencyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_adds_are_not_lost(self):
+        token = Cart().token
+        Cart(token).replace({})
+
+        def add_many():
+            for _ in range(10):
+                Cart(token).add(1)
+
+        threads = [threading.Thread(target=add_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(Cart(token).lines, {1: 80})
+
+
+class SavedCartLifecycleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Категория', description='')
+        self.first = Product.objects.create(name='Первый', description='', category=category, price=100)
+        self.second = Product.objects.create(name='Второй', description='', category=category, price=200)
+        self.user = User.objects.create_user(email='buyer@example.com', password='secret-password')
+
+    def login(self):
+        response = self.client.post(
+            reverse('users:login'), {'username': 'buyer@example.com', 'password': 'secret-password'},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def add(self, product, quantity=1):
+        self.client.post(reverse('cart:add', args=[product.pk]), {'quantity': quantity})
+
+    def saved_lines(self):
+        saved_cart = SavedCart.objects.filter(user=self.user).first()
+        return decode_lines(saved_cart.data) if saved_cart else {}
+
+    def test_repeated_login_does_not_double_quantities(self):
+        self.add(self.first, 2)
+        self.login()
+        self.client.post(reverse('users:logout'))
+        self.add(self.first, 2)
+        self.login()
+        self.assertEqual(self.saved_lines(), {self.first.pk: 2})
+
+    def test_changes_after_login_are_saved(self):
+        self.add(self.first)
+        self.login()
+        self.add(self.second, 3)
+        self.assertEqual(self.saved_lines(), {self.first.pk: 1, self.second.pk: 3})
+        self.client.post(reverse('cart:remove', args=[self.first.pk]))
+        self.assertEqual(self.saved_lines(), {self.second.pk: 3})
+
+    def test_removed_item_does_not_come_back_on_next_login(self):
+        self.add(self.first)
+        self.add(self.second)
+        self.login()
+        self.client.post(reverse('cart:remove', args=[self.first.pk]))
+        self.client.post(reverse('users:logout'))
+        self.login()
+        token = self.client.cookies[CART_COOKIE_NAME].value
+        self.assertEqual(Cart(token).lines, {self.second.pk: 1})
+        self.assertEqual(self.saved_lines(), {self.second.pk: 1})
+
+    def test_emptied_cart_deletes_saved_cart(self):
+        self.login()
+        self.add(self.first)
+        self.client.post(reverse('cart:remove', args=[self.first.pk]))
+        self.assertFalse(SavedCart.objects.filter(user=self.user).exists())
@@ -0,0 +1,12 @@
+from django.urls import path
+from .views import CartDetailView, CartAddView, CartCountView, CartRemoveView, CheckoutView
+
+app_name = 'cart'
+
+urlpatterns = [
+    path('', CartDetailView.as_view(), name='detail'),
+    path('count/', CartCountView.as_view(), name='count'),
+    path('add/<int:product_id>/', CartAddView.as_view(), name='add'),
+    path('remove/<int:product_id>/', CartRemoveView.as_view(), name='remove'),
+    path('checkout/', CheckoutView.as_view(), name='checkout'),
+]
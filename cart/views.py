@@ -0,0 +1,155 @@
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.http import JsonResponse
+from django.shortcuts import redirect, render
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.generic import TemplateView
+
+from catalog.inventory import OutOfStock, commit_items, release_token_reservations, reserve_items
+
+from .cart import Cart, CART_MAX_QUANTITY
+from .models import Order, OrderItem, SavedCart
+
+
+def is_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
+class CartDetailView(TemplateView):
+    """
+    Представление для отображения содержимого корзины.
+    Цены и наличие товаров проверяются одним пакетным запросом к Product.
+    """
+    template_name = 'cart/cart_detail.html'
+
+    def get_context_data(self, **kwargs):
+        """
+        Добавляет в контекст позиции корзины, итоговую сумму и заголовок страницы.
+        """
+        context = super().get_context_data(**kwargs)
+        lines = Cart.from_request(self.request).get_lines()
+        context['lines'] = lines
+        context['total'] = Cart.get_total(lines)
+        context['title'] = 'Корзина'
+        return context
+
+
+@method_decorator(ensure_csrf_cookie, name='dispatch')
+class CartCountView(View):
+    """
+    Возвращает количество товаров в корзине (для статических копий страниц)
+    и устанавливает cookie с CSRF-токеном для кнопки "В корзину".
+    """
+
+    def get(self, request):
+        return JsonResponse({'count': len(Cart.from_request(request))})
+
+
+class CartAddView(View):
+    """
+    AJAX-обработчик кнопки "В корзину".
+    Корзина анонимного посетителя изменяется только в кэше; корзина вошедшего пользователя
+    дополнительно сохраняется в SavedCart.
+    Статические и кэшированные копии страниц не содержат CSRF-токена: скрипт берет его
+    из cookie csrftoken, которую устанавливает cart:count.
+    """
+
+    def post(self, request, product_id):
+        try:
+            quantity = int(request.POST.get('quantity', 1))
+        except ValueError:
+            quantity = 1
+        quantity = max(min(quantity, CART_MAX_QUANTITY), -CART_MAX_QUANTITY)
+        override = request.POST.get('override') == '1'
+
+        cart = Cart.from_request(request, bind_user=True)
+        cart.add(product_id, quantity, override=override)
+
+        if is_ajax(request):
+            response = JsonResponse({'count': len(cart)})
+        else:
+            response = redirect('cart:detail')
+        return cart.set_cookie(response)
+
+
+class CartRemoveView(View):
+    """
+    Представление для удаления товара из корзины.
+    """
+
+    def post(self, request, product_id):
+        cart = Cart.from_request(request, bind_user=True)
+        cart.remove(product_id)
+        if is_ajax(request):
+            return JsonResponse({'count': len(cart)})
+        return redirect('cart:detail')
+
+
+class CheckoutView(LoginRequiredMixin, View):
+    """
+    Представление для оформления заказа. Единственное место, где корзина
+    переносится в базу данных. Страница подтверждения ничего не резервирует;
+    при отправке заказа товары резервируются короткой транзакцией (строки товаров
+    блокируются только на время условных UPDATE), затем заказ создается и резервы
+    подтверждаются во второй транзакции. Если заказ не создан, резервы освобождаются сразу,
+    а после сбоя процесса — командой release_reservations через STOCK_RESERVATION_TTL секунд.
+    """
+    template_name = 'cart/checkout.html'
+
+    @staticmethod
+    def reservation_token(cart):
+        return f'cart:{cart.token}'
+
+    @staticmethod
+    def out_of_stock(request, lines, exc):
+        product = next(line.product for line in lines if line.product.pk == exc.product_id)
+        messages.error(request, f'Товара "{product.name}" недостаточно на складе.')
+        return redirect('cart:detail')
+
+    def get(self, request):
+        lines = Cart.from_request(request).get_lines()
+        if not lines:
+            messages.warning(request, 'Корзина пуста.')
+            return redirect('cart:detail')
+        return render(request, self.template_name, {
+            'lines': lines,
+            'total': Cart.get_total(lines),
+            'title': 'Оформление заказа',
+        })
+
+    def post(self, request):
+        cart = Cart.from_request(request)
+        lines = cart.get_lines()
+        if not lines:
+            messages.warning(request, 'Корзина пуста.')
+            return redirect('cart:detail')
+
+        token = self.reservation_token(cart)
+        items = [(line.product.pk, line.quantity) for line in lines]
+        try:
+            reserve_items(token, items)
+            with transaction.atomic():
+                order = Order.objects.create(user=request.user, total=Cart.get_total(lines))
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order, product=line.product, product_name=line.product.name,
+                        quantity=line.quantity, price=line.product.price,
+                    )
+                    for line in lines
+                ])
+                # Резервы подтверждаются; истекший резерв списывается заново или откатывает заказ
+                commit_items(token, items)
+                SavedCart.objects.filter(user=request.user).delete()
+        except OutOfStock as exc:
+            release_token_reservations(token)
+            return self.out_of_stock(request, lines, exc)
+        except Exception:
+            release_token_reservations(token)
+            raise
+
+        cart.clear()
+        messages.success(request, f'Заказ №{order.pk} оформлен.')
+        return redirect('catalog:home')
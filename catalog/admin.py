@@ -1,5 +1,35 @@
+from django import forms
 from django.contrib import admin
-from .models import Product, Category, Contact, Feedback
+from django.contrib.admin.helpers import ActionForm
+
+from .archive import archive_products, restore_products
+from .inventory import adjust_stock
+from .models import Product, ProductArchive, Category, Contact, Feedback, FeedbackArchive, StockReservation
+from .paginators import EstimatedCountPaginator
+
+
+class CategoryListFilter(admin.SimpleListFilter):
+    """
+    Фильтр по категории, который не загружает все категории:
+    в списке отображаются первые LOOKUP_LIMIT категорий по алфавиту и выбранная категория.
+    Любую другую категорию можно выбрать параметром ?category=<id>.
+    """
+    title = 'Категория'
+    parameter_name = 'category'
+    LOOKUP_LIMIT = 20
+
+    def lookups(self, request, model_admin):
+        categories = list(Category.objects.order_by('name').values_list('pk', 'name')[:self.LOOKUP_LIMIT])
+        selected = self.value()
+        if selected and selected.isdigit() and int(selected) not in {pk for pk, _name in categories}:
+            categories += list(Category.objects.filter(pk=selected).values_list('pk', 'name'))
+        return [(str(pk), name) for pk, name in categories]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(category_id=value)
+        return queryset
 
 
 @admin.register(Category)
@@ -8,6 +38,15 @@ class CategoryAdmin(admin.ModelAdmin):
     Административная панель для модели Category.
     """
     list_display = ('id', 'name',)
+    search_fields = ('name',)  # Необходимо для autocomplete_fields в ProductAdmin
+    ordering = ('name',)
+
+
+class ProductActionForm(ActionForm):
+    """
+    Форма действий списка продуктов с полем изменения остатка.
+    """
+    stock_delta = forms.IntegerField(required=False, label='Изменить остаток на')
 
 
 @admin.register(Product)
@@ -15,9 +54,73 @@ class ProductAdmin(admin.ModelAdmin):
     """
     Административная панель для модели Product.
     """
-    list_display = ('id', 'name', 'price', 'category',)
-    list_filter = ('category',)
+    list_display = ('id', 'name', 'price', 'stock', 'category',)
+    list_filter = (CategoryListFilter,)
+    list_select_related = ('category',)
     search_fields = ('name', 'description',)
+    # Для больших таблиц: оценка количества строк вместо COUNT(*), без второго подсчета
+    # по всей таблице для отфильтрованного списка и поиск категории вместо полного списка
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ('category',)
+    # Остаток изменяется только действием adjust_stock_selected (UPDATE ... SET stock = stock + n):
+    # сохранение формы со значением, прочитанным при открытии страницы, отменило бы параллельные продажи
+    readonly_fields = ('stock',)
+    action_form = ProductActionForm
+    actions = ('archive_selected', 'adjust_stock_selected')
+
+    @admin.action(description='Изменить остаток на указанное количество')
+    def adjust_stock_selected(self, request, queryset):
+        delta = request.POST.get('stock_delta', '')
+        try:
+            delta = int(delta)
+        except ValueError:
+            self.message_user(request, 'Укажите целое число, на которое нужно изменить остаток.', level='error')
+            return
+        selected = list(queryset.values_list('pk', flat=True))
+        adjusted = adjust_stock(selected, delta)
+        self.message_user(request, f'Остаток изменен у продуктов: {adjusted}.')
+        if adjusted < len(selected):
+            self.message_user(
+                request, f'Не изменен у {len(selected) - adjusted}: остаток не может стать отрицательным.',
+                level='warning',
+            )
+
+    @admin.action(description='Перенести в архив')
+    def archive_selected(self, request, queryset):
+        archived = archive_products(queryset.exclude(stockreservation__isnull=False))
+        self.message_user(request, f'Перенесено в архив продуктов: {archived}.')
+
+
+@admin.register(ProductArchive)
+class ProductArchiveAdmin(admin.ModelAdmin):
+    """
+    Административная панель для архива продуктов с действием восстановления.
+    """
+    list_display = ('original_id', 'name', 'price', 'category', 'is_published', 'updated_at', 'archived_at',)
+    list_select_related = ('category',)
+    search_fields = ('name',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('restore_selected',)
+
+    @admin.action(description='Восстановить в каталог')
+    def restore_selected(self, request, queryset):
+        restored = restore_products(queryset)
+        self.message_user(request, f'Восстановлено продуктов: {restored}.')
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    """
+    Административная панель для модели StockReservation.
+    """
+    list_display = ('product', 'quantity', 'token', 'expires_at',)
+    list_select_related = ('product',)
+    raw_id_fields = ('product',)
 
 
 @admin.register(Contact)
@@ -34,3 +137,11 @@ class FeedbackAdmin(admin.ModelAdmin):
     Административная панель для модели Feedback.
     """
     list_display = ('name', 'phone', 'created_at',)
+
+
+@admin.register(FeedbackArchive)
+class FeedbackArchiveAdmin(admin.ModelAdmin):
+    """
+    Административная панель для модели FeedbackArchive.
+    """
+    list_display = ('name', 'phone', 'created_at', 'archived_at',)
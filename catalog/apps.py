@@ -8,3 +8,7 @@ class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalog'
     verbose_name = "Каталог"
+
+    def ready(self):
+        # Подключение обработчиков сигналов (сброс кэша списка категорий)
+        from . import signals  # noqa: F401
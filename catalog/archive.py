@@ -0,0 +1,98 @@
+"""
+Перенос продуктов в архив и восстановление из архива.
+
+Продукты, снятые с публикации (или давно не изменявшиеся), переносятся в ProductArchive
+пакетами, каждый в своей короткой транзакции, чтобы таблица продуктов и ее индексы
+содержали только действующий ассортимент. Удаление из Product выполняется обычным
+QuerySet.delete(), поэтому журнал изменений получает событие удаления, а при
+восстановлении — событие создания.
+
+Продукты с действующими резервами не архивируются: резерв удалился бы вместе с продуктом,
+и списанный остаток не вернулся бы. Ссылки позиций заказов на архивный продукт
+запоминаются и восстанавливаются вместе с ним.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from cart.models import OrderItem
+from changefeed.tracking import record_updates
+
+from .models import Product, ProductArchive
+
+ARCHIVED_FIELDS = (
+    'name', 'description', 'image', 'category_id', 'price', 'is_published', 'stock', 'created_at', 'updated_at',
+)
+
+
+def archive_candidates(unpublished_before=None, untouched_before=None):
+    """
+    Возвращает продукты для архивации: снятые с публикации и не изменявшиеся с unpublished_before,
+    а также любые продукты, не изменявшиеся с untouched_before.
+    """
+    condition = Q()
+    if unpublished_before is not None:
+        condition |= Q(is_published=False, updated_at__lt=unpublished_before)
+    if untouched_before is not None:
+        condition |= Q(updated_at__lt=untouched_before)
+    if not condition:
+        return Product.objects.none()
+    return Product.objects.filter(condition).exclude(stockreservation__isnull=False)
+
+
+def archive_batch(queryset, batch_size=1000):
+    """
+    Переносит в архив до batch_size продуктов из queryset в одной транзакции.
+    Возвращает число перенесенных продуктов.
+    """
+    with transaction.atomic():
+        products = list(
+            queryset.select_for_update().order_by('pk').only('pk', *ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not products:
+            return 0
+        order_items = {}
+        for item_id, product_id in OrderItem.objects.filter(product__in=products).values_list('pk', 'product_id'):
+            order_items.setdefault(product_id, []).append(item_id)
+        ProductArchive.objects.bulk_create([
+            ProductArchive(
+                original_id=product.pk,
+                order_item_ids=order_items.get(product.pk, []),
+                **{field: getattr(product, field) for field in ARCHIVED_FIELDS},
+            )
+            for product in products
+        ])
+        Product.objects.filter(pk__in=[product.pk for product in products]).delete()
+    return len(products)
+
+
+def archive_products(queryset, batch_size=1000):
+    """
+    Переносит в архив все продукты из queryset пакетами по batch_size.
+    Возвращает общее число перенесенных продуктов.
+    """
+    total = 0
+    while True:
+        archived = archive_batch(queryset, batch_size)
+        if not archived:
+            return total
+        total += archived
+
+
+@transaction.atomic
+def restore_products(archived):
+    """
+    Возвращает архивные продукты в каталог с прежними id и датой создания
+    и восстанавливает ссылки позиций заказов. Возвращает число восстановленных продуктов.
+    """
+    archived = list(archived.select_for_update())
+    for entry in archived:
+        product = Product(pk=entry.original_id, **{field: getattr(entry, field) for field in ARCHIVED_FIELDS})
+        product.save(force_insert=True)
+        # auto_now_add при вставке заменяет дату создания текущей; UPDATE не отправляет сигналов,
+        # поэтому событие журнала изменений с исправленной датой записывается явно
+        Product.objects.filter(pk=product.pk).update(created_at=entry.created_at)
+        record_updates(Product, [product.pk])
+        if entry.order_item_ids:
+            OrderItem.objects.filter(pk__in=entry.order_item_ids, product__isnull=True).update(product=product)
+    ProductArchive.objects.filter(pk__in=[entry.pk for entry in archived]).delete()
+    return len(archived)
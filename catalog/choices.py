@@ -0,0 +1,37 @@
+"""
+Кэшированный список категорий для полей выбора.
+
+Список (id, наименование) хранится в кэше и сбрасывается при любом изменении Category,
+поэтому формы товара не запрашивают категории из базы данных при каждом отображении.
+Если категорий больше CATEGORY_CHOICES_LIMIT, список не кэшируется, а поле выбора
+переключается на поиск через autocomplete.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category
+
+CATEGORY_CHOICES_CACHE_KEY = 'catalog:category_choices'
+CATEGORY_CHOICES_LIMIT = getattr(settings, 'CATEGORY_CHOICES_LIMIT', 500)
+CATEGORY_CHOICES_TIMEOUT = 60 * 60 * 24
+# Маркер в кэше: категорий слишком много для полного списка
+TOO_MANY = 'too_many'
+
+
+def get_category_choices():
+    """
+    Возвращает список (id, наименование) всех категорий или None, если их больше лимита.
+    """
+    choices = cache.get(CATEGORY_CHOICES_CACHE_KEY)
+    if choices is None:
+        rows = list(Category.objects.order_by('name').values_list('pk', 'name')[:CATEGORY_CHOICES_LIMIT + 1])
+        choices = TOO_MANY if len(rows) > CATEGORY_CHOICES_LIMIT else rows
+        cache.set(CATEGORY_CHOICES_CACHE_KEY, choices, CATEGORY_CHOICES_TIMEOUT)
+    return None if choices == TOO_MANY else choices
+
+
+def invalidate_category_choices(**kwargs):
+    """
+    Сбрасывает кэш списка категорий. Подключается к сигналам сохранения и удаления Category.
+    """
+    cache.delete(CATEGORY_CHOICES_CACHE_KEY)
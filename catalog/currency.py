@@ -0,0 +1,155 @@
+"""
+Отображение цен в нескольких валютах.
+
+Курсы хранятся в локальном файле CURRENCY_RATES_FILE (без обращения к сети):
+для каждой валюты задан курс относительно базовой валюты цен (Product.price),
+символ и правило округления (шаг quantum и режим округления decimal).
+Файл перечитывается при изменении; поле version файла входит в ключи кэша.
+
+Цены страницы пересчитываются одним проходом по списку продуктов, результаты
+кэшируются по ключу (версия курсов, валюта, продукт, цена). Фильтрация по цене
+в выбранной валюте переводится в фильтр по базовой цене с учетом округления
+отображаемых цен, поэтому использует индексируемую колонку price; сортировка по пересчитанной цене совпадает с
+сортировкой по базовой, так как курс положителен.
+"""
+import decimal
+import json
+import os
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+CURRENCY_RATES_FILE = getattr(
+    settings, 'CURRENCY_RATES_FILE', os.path.join(os.path.dirname(__file__), 'data', 'currency_rates.json')
+)
+PRICE_CACHE_TIMEOUT = 60 * 60 * 24
+# Шаг и наибольшее значение базовой цены (Product.price: max_digits=10, decimal_places=2)
+BASE_PRICE_STEP = Decimal('0.01')
+MAX_BASE_PRICE_UNITS = 10 ** 10 - 1
+
+
+@dataclass(frozen=True)
+class Currency:
+    """
+    Валюта: курс относительно базовой валюты и правило округления.
+    """
+    code: str
+    symbol: str
+    rate: Decimal
+    quantum: Decimal
+    rounding: str
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """
+    Таблица курсов, загруженная из файла.
+    """
+    version: str
+    base: str
+    currencies: dict
+
+    def get(self, code):
+        """
+        Возвращает валюту по коду или базовую валюту, если код неизвестен.
+        """
+        return self.currencies.get((code or '').upper(), self.currencies[self.base])
+
+
+_lock = threading.Lock()
+_loaded = {'mtime': None, 'table': None}
+
+
+def load_rate_table(path):
+    with open(path, encoding='utf-8') as rates_file:
+        data = json.load(rates_file)
+    currencies = {}
+    for code, options in data['currencies'].items():
+        rounding = options.get('rounding', decimal.ROUND_HALF_UP)
+        if not hasattr(decimal, rounding):
+            raise ValueError(f'Неизвестный режим округления {rounding} для валюты {code}.')
+        currencies[code] = Currency(
+            code=code,
+            symbol=options.get('symbol', code),
+            rate=Decimal(options['rate']),
+            quantum=Decimal(options.get('quantum', '0.01')),
+            rounding=rounding,
+        )
+    if data['base'] not in currencies:
+        raise ValueError(f'Базовая валюта {data["base"]} отсутствует в таблице курсов.')
+    return RateTable(version=str(data['version']), base=data['base'], currencies=currencies)
+
+
+def get_rate_table():
+    """
+    Возвращает таблицу курсов, перечитывая файл только после его изменения.
+    """
+    mtime = os.path.getmtime(CURRENCY_RATES_FILE)
+    if _loaded['mtime'] != mtime:
+        with _lock:
+            if _loaded['mtime'] != mtime:
+                _loaded['table'] = load_rate_table(CURRENCY_RATES_FILE)
+                _loaded['mtime'] = mtime
+    return _loaded['table']
+
+
+def convert_amounts(amounts, currency):
+    """
+    Пересчитывает список сумм в базовой валюте в валюту currency с ее правилом округления.
+    """
+    rate, quantum, rounding = currency.rate, currency.quantum, currency.rounding
+    return [(amount * rate).quantize(quantum, rounding=rounding) for amount in amounts]
+
+
+def to_base_bound(amount, currency, upper):
+    """
+    Переводит границу фильтра по цене в валюте currency в границу по базовой цене
+    с тем же правилом округления, что и при отображении цен: нижняя граница — наименьшая
+    базовая цена, отображаемая не меньше amount, верхняя (upper) — наибольшая базовая цена,
+    отображаемая не больше amount. Отображаемая цена не убывает с ростом базовой,
+    поэтому граница ищется двоичным поиском по шагу базовой цены.
+    Возвращает None, если подходящей базовой цены нет.
+    """
+    def shown(units):
+        return (units * BASE_PRICE_STEP * currency.rate).quantize(currency.quantum, rounding=currency.rounding)
+
+    # Ищется наименьшее число шагов, цена которого отображается больше amount (для верхней
+    # границы) или не меньше amount (для нижней)
+    low, high = 0, MAX_BASE_PRICE_UNITS + 1
+    while low < high:
+        middle = (low + high) // 2
+        value = shown(middle)
+        if value > amount or (value == amount and not upper):
+            high = middle
+        else:
+            low = middle + 1
+    units = low - 1 if upper else low
+    if units < 0 or units > MAX_BASE_PRICE_UNITS:
+        return None
+    return units * BASE_PRICE_STEP
+
+
+def apply_prices(products, currency, version):
+    """
+    Устанавливает каждому продукту атрибут converted_price — цену в валюте currency.
+    Уже посчитанные цены берутся из кэша одним запросом get_many, остальные
+    пересчитываются одним проходом и сохраняются одним set_many.
+    """
+    products = list(products)
+    keys = {
+        product.pk: f'price:{version}:{currency.code}:{product.pk}:{product.price}'
+        for product in products
+    }
+    cached = cache.get_many(keys.values())
+    missing = [product for product in products if keys[product.pk] not in cached]
+    converted = convert_amounts([product.price for product in missing], currency)
+    fresh = {keys[product.pk]: price for product, price in zip(missing, converted)}
+    if fresh:
+        cache.set_many(fresh, PRICE_CACHE_TIMEOUT)
+    cached.update(fresh)
+    for product in products:
+        product.converted_price = cached[keys[product.pk]]
+    return products
@@ -1,15 +1,73 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from django.core.files.uploadedfile import UploadedFile
+from django.forms.models import ModelChoiceIterator, ModelChoiceIteratorValue
+from django.urls import reverse_lazy
+from uploads.forms import ChunkedUploadFormMixin
+from .choices import get_category_choices
 from .models import Product, Feedback
 
 
 from django.forms.widgets import CheckboxInput
 
 
-class ProductForm(forms.ModelForm):
+class CachedCategoryChoiceIterator(ModelChoiceIterator):
+    """
+    Итератор вариантов выбора категории из кэшированного списка (без запроса к базе данных).
+    """
+
+    def __iter__(self):
+        choices = get_category_choices()
+        if choices is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for pk, name in choices:
+            yield (ModelChoiceIteratorValue(pk, None), name)
+
+    def __len__(self):
+        choices = get_category_choices()
+        if choices is None:
+            return super().__len__()
+        return len(choices) + (1 if self.field.empty_label is not None else 0)
+
+
+class CategoryChoiceField(forms.ModelChoiceField):
+    """
+    Поле выбора категории, варианты которого берутся из кэша.
+    """
+    iterator = CachedCategoryChoiceIterator
+
+
+class CategoryAutocompleteWidget(forms.Select):
+    """
+    Выпадающий список для большого числа категорий: отображает только выбранную категорию,
+    остальные подгружаются поиском через catalog:category_autocomplete.
+    """
+
+    class Media:
+        js = ('catalog/js/category_autocomplete.js',)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = str(reverse_lazy('catalog:category_autocomplete'))
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        # Значение приходит из POST: нечисловые id отбрасываются, иначе filter(pk__in=...) вызовет ValueError
+        selected = [str(v) for v in value if str(v).isdigit()]
+        queryset = self.choices.queryset.filter(pk__in=selected) if selected else self.choices.queryset.none()
+        groups = [(None, [self.create_option(name, '', self.choices.field.empty_label or '', False, 0)], 0)]
+        for index, category in enumerate(queryset, start=1):
+            option = self.create_option(name, str(category.pk), str(category), True, index)
+            groups.append((None, [option], index))
+        return groups
+
+
+class ProductForm(ChunkedUploadFormMixin, forms.ModelForm):
     """
     Форма для создания и редактирования объектов модели Product с валидацией.
+    Изображение загружается поблочно и проверяется по ограничениям назначения product_image.
     """
     FORBIDDEN_WORDS = [
         'казино', 'криптовалюта', 'крипта', 'биржа', 'дешево',
@@ -19,12 +77,20 @@ class ProductForm(forms.ModelForm):
     class Meta:
         model = Product
         fields = ['name', 'description', 'image', 'category', 'price', 'is_published']
+        field_classes = {'category': CategoryChoiceField}
+
+    chunked_upload_fields = {'image': 'product_image'}
 
     def __init__(self, *args, **kwargs):
         """
         Добавляет CSS-классы для стилизации полей формы.
+        При большом числе категорий заменяет выпадающий список на поиск.
         """
         super().__init__(*args, **kwargs)
+        if get_category_choices() is None:
+            category_field = self.fields['category']
+            category_field.widget = CategoryAutocompleteWidget()
+            category_field.widget.choices = category_field.choices
         for field_name, field in self.fields.items():
             if isinstance(field.widget, CheckboxInput):
                 field.widget.attrs['class'] = 'form-check-input'
@@ -54,25 +120,6 @@ class ProductForm(forms.ModelForm):
             raise ValidationError('Цена не может быть отрицательной.')
         return price
 
-    def clean_image(self):
-        """
-        Валидация изображения: формат JPEG/PNG и размер не более 5 МБ.
-        Только для новых загруженных файлов.
-        """
-        image = self.cleaned_data.get('image')
-
-        # Проверяем, является ли 'image' новым загруженным файлом.
-        # Если это существующий файл (ImageFieldFile) или None, пропускаем валидацию.
-        if isinstance(image, UploadedFile):
-            # Проверка формата файла
-            if not image.name.lower().endswith(('.jpg', '.jpeg', '.png')):
-                raise ValidationError('Неверный формат файла. Допустимы только JPEG и PNG.')
-
-            # Проверка размера файла (5 МБ)
-            if image.size > 5 * 1024 * 1024:
-                raise ValidationError('Размер файла не должен превышать 5 МБ.')
-        return image
-
 
 class FeedbackForm(forms.ModelForm):
     """
@@ -89,3 +136,26 @@ class FeedbackForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         for field_name, field in self.fields.items():
             field.widget.attrs['class'] = 'form-control'
+
+
+class PriceFilterForm(forms.Form):
+    """
+    Форма фильтрации и сортировки списка продуктов по цене в выбранной валюте.
+    """
+    SORT_CHOICES = [
+        ('new', 'Сначала новые'),
+        ('price', 'Сначала дешевые'),
+        ('-price', 'Сначала дорогие'),
+    ]
+
+    min_price = forms.DecimalField(required=False, min_value=0, label='Цена от')
+    max_price = forms.DecimalField(required=False, min_value=0, label='Цена до')
+    sort = forms.ChoiceField(required=False, choices=SORT_CHOICES, label='Сортировка')
+
+    def __init__(self, *args, **kwargs):
+        """
+        Добавляет CSS-классы для стилизации полей формы.
+        """
+        super().__init__(*args, **kwargs)
+        for field_name, field in self.fields.items():
+            field.widget.attrs['class'] = 'form-select' if field_name == 'sort' else 'form-control'
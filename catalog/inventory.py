@@ -0,0 +1,183 @@
+"""
+Учет остатков товаров.
+
+Все изменения остатка выполняются одним условным UPDATE вида
+``UPDATE ... SET stock = stock - n WHERE id = ... AND stock >= n``.
+База данных сама сериализует такие обновления одной строки, поэтому
+продажа сверх остатка невозможна без явных блокировок (select_for_update)
+и без схемы "прочитать — изменить — сохранить". UPDATE не отправляет сигналов,
+поэтому событие журнала изменений записывается явно в той же транзакции.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from changefeed.tracking import record_updates
+
+from .models import Product, StockReservation
+
+RESERVATION_TTL = getattr(settings, 'STOCK_RESERVATION_TTL', 15 * 60)
+
+
+class OutOfStock(Exception):
+    """
+    Недостаточно товара на складе.
+    """
+
+    def __init__(self, product_id, quantity):
+        self.product_id = product_id
+        self.quantity = quantity
+        super().__init__(f'Недостаточно товара (id={product_id}) для списания {quantity} шт.')
+
+
+class ReservationExpired(Exception):
+    """
+    Резерв уже истек и был освобожден.
+    """
+
+
+def decrement_stock(product_id, quantity):
+    """
+    Атомарно списывает quantity единиц товара.
+    Для товаров без учета остатка (stock IS NULL) списание всегда успешно.
+    Вызывает OutOfStock, если остатка недостаточно.
+    """
+    with transaction.atomic():
+        updated = (
+            Product.objects
+            .filter(pk=product_id)
+            .filter(Q(stock__isnull=True) | Q(stock__gte=quantity))
+            .update(stock=F('stock') - quantity)
+        )
+        if not updated:
+            raise OutOfStock(product_id, quantity)
+        record_updates(Product, [product_id])
+
+
+def increment_stock(product_id, quantity):
+    """
+    Атомарно возвращает quantity единиц товара на склад.
+    """
+    with transaction.atomic():
+        if Product.objects.filter(pk=product_id, stock__isnull=False).update(stock=F('stock') + quantity):
+            record_updates(Product, [product_id])
+
+
+def adjust_stock(product_ids, delta):
+    """
+    Атомарно изменяет остаток товаров на delta единиц (поступление или списание).
+    Для товаров без учета остатка учет начинается с нуля. Товары, остаток которых
+    стал бы отрицательным, не изменяются. Возвращает количество измененных товаров.
+    """
+    queryset = Product.objects.all()
+    if delta < 0:
+        queryset = queryset.filter(stock__gte=-delta)
+    # Товары обновляются по одному, чтобы события журнала изменений записывались только для измененных
+    with transaction.atomic():
+        updated = [
+            product_id for product_id in sorted(set(product_ids))
+            if queryset.filter(pk=product_id).update(stock=Coalesce(F('stock'), 0) + delta)
+        ]
+        record_updates(Product, updated)
+    return len(updated)
+
+
+def reserve_stock(product_id, quantity, token, ttl=None):
+    """
+    Списывает остаток и создает резерв, который действует ttl секунд.
+    """
+    ttl = RESERVATION_TTL if ttl is None else ttl
+    with transaction.atomic():
+        decrement_stock(product_id, quantity)
+        return StockReservation.objects.create(
+            product_id=product_id,
+            quantity=quantity,
+            token=token,
+            expires_at=timezone.now() + timedelta(seconds=ttl),
+        )
+
+
+def commit_reservation(reservation):
+    """
+    Подтверждает резерв: списанный остаток больше не возвращается на склад.
+    Вызывает ReservationExpired, если резерв уже был освобожден.
+    """
+    deleted, _ = StockReservation.objects.filter(pk=reservation.pk).delete()
+    if not deleted:
+        raise ReservationExpired(f'Резерв {reservation.pk} истек.')
+
+
+def release_reservation(reservation):
+    """
+    Освобождает резерв и возвращает товар на склад.
+    Удаление строки резерва гарантирует, что остаток вернется ровно один раз.
+    """
+    with transaction.atomic():
+        deleted, _ = StockReservation.objects.filter(pk=reservation.pk).delete()
+        if deleted:
+            increment_stock(reservation.product_id, reservation.quantity)
+    return bool(deleted)
+
+
+def release_token_reservations(token):
+    """
+    Освобождает все резервы владельца token. Возвращает количество освобожденных резервов.
+    """
+    return sum(release_reservation(reservation) for reservation in StockReservation.objects.filter(token=token))
+
+
+def reserve_items(token, items, ttl=None):
+    """
+    Резервирует товары items — список пар (id продукта, количество) — для владельца token
+    (например, корзины на время подтверждения заказа). Прежние резервы владельца освобождаются,
+    поэтому повторный вызов не резервирует товар дважды. Резервирование выполняется целиком
+    или не выполняется: при нехватке любого товара вызывается OutOfStock.
+    """
+    with transaction.atomic():
+        release_token_reservations(token)
+        # Строки обновляются в порядке id, чтобы параллельные заказы не блокировали друг друга взаимно
+        return [reserve_stock(product_id, quantity, token, ttl) for product_id, quantity in sorted(items)]
+
+
+def commit_items(token, items):
+    """
+    Окончательно списывает товары items для владельца token. Действующий резерв на то же
+    количество подтверждается; для товаров без резерва (резерв истек или количество изменилось)
+    остаток списывается условным UPDATE. Лишние резервы владельца освобождаются.
+    Вызывает OutOfStock, если остатка недостаточно; в этом случае ничего не списывается.
+    """
+    with transaction.atomic():
+        reservations = {
+            reservation.product_id: reservation
+            for reservation in StockReservation.objects.filter(token=token, expires_at__gt=timezone.now())
+        }
+        for product_id, quantity in sorted(items):
+            reservation = reservations.pop(product_id, None)
+            if reservation is not None and reservation.quantity == quantity:
+                try:
+                    commit_reservation(reservation)
+                    continue
+                except ReservationExpired:
+                    pass
+            elif reservation is not None:
+                release_reservation(reservation)
+            decrement_stock(product_id, quantity)
+        release_token_reservations(token)
+
+
+def release_expired_reservations(now=None, batch_size=500):
+    """
+    Освобождает истекшие резервы пакетами. Возвращает количество освобожденных резервов.
+    """
+    now = now or timezone.now()
+    released = 0
+    while True:
+        batch = list(StockReservation.objects.filter(expires_at__lte=now).order_by('pk')[:batch_size])
+        if not batch:
+            return released
+        for reservation in batch:
+            released += release_reservation(reservation)
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from catalog.models import Feedback, FeedbackArchive
+
+ARCHIVED_FIELDS = ('name', 'phone', 'message', 'created_at')
+
+
+class Command(BaseCommand):
+    help = 'Moves feedback messages older than the retention period to the archive table in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=180, help='Archive messages older than N days.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Messages moved per transaction.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        batch_size = options['batch_size']
+        total = 0
+        while True:
+            # Каждый пакет переносится в отдельной короткой транзакции
+            with transaction.atomic():
+                rows = list(
+                    Feedback.objects.filter(created_at__lt=cutoff)
+                    .order_by('created_at', 'pk')
+                    .values('pk', *ARCHIVED_FIELDS)[:batch_size]
+                )
+                if not rows:
+                    break
+                FeedbackArchive.objects.bulk_create(
+                    [FeedbackArchive(**{field: row[field] for field in ARCHIVED_FIELDS}) for row in rows]
+                )
+                Feedback.objects.filter(pk__in=[row['pk'] for row in rows]).delete()
+            total += len(rows)
+            self.stdout.write(f'Archived {total} message(s)...')
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} feedback message(s) older than {cutoff:%Y-%m-%d}.'))
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from catalog.archive import archive_candidates, archive_products
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves unpublished products (and optionally any long-untouched products) to the archive table '
+        'in batches. Archived products can be restored from the admin.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--unpublished-days', type=int, default=30,
+            help='Archive unpublished products not modified for N days.',
+        )
+        parser.add_argument(
+            '--untouched-days', type=int, default=None,
+            help='Also archive products of any status not modified for N days (disabled by default).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Products moved per transaction.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        queryset = archive_candidates(
+            unpublished_before=now - timedelta(days=options['unpublished_days']),
+            untouched_before=(
+                now - timedelta(days=options['untouched_days']) if options['untouched_days'] is not None else None
+            ),
+        )
+        total = archive_products(queryset, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} product(s).'))
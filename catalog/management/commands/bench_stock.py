@@ -0,0 +1,102 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from catalog.inventory import OutOfStock, decrement_stock
+from catalog.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammers one product with concurrent stock decrements from many threads and verifies that '
+        'nothing is oversold. Requires a database with concurrent writers (PostgreSQL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=32, help='Number of concurrent buyers.')
+        parser.add_argument('--attempts', type=int, default=50, help='Purchase attempts per thread.')
+        parser.add_argument('--stock', type=int, default=500, help='Initial stock of the benchmark product.')
+        parser.add_argument('--quantity', type=int, default=1, help='Units bought per attempt.')
+        parser.add_argument(
+            '--naive', action='store_true',
+            help='Use read-modify-write (stock -= n; save()) instead of a conditional UPDATE for comparison.',
+        )
+
+    def handle(self, *args, **options):
+        initial_stock = options['stock']
+        quantity = options['quantity']
+        category = Category.objects.create(name='bench_stock', description='Временная категория бенчмарка')
+        product = Product.objects.create(
+            name='bench_stock', description='Временный товар бенчмарка', category=category,
+            price=Decimal('1.00'), stock=initial_stock, is_published=False,
+        )
+        buy = self.buy_naive if options['naive'] else self.buy_atomic
+
+        sold = []
+        rejected = []
+        errors = []
+        barrier = threading.Barrier(options['threads'])
+
+        def worker():
+            success = failure = 0
+            try:
+                barrier.wait()
+                for _ in range(options['attempts']):
+                    if buy(product.pk, quantity):
+                        success += 1
+                    else:
+                        failure += 1
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                sold.append(success)
+                rejected.append(failure)
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            product.refresh_from_db(fields=['stock'])
+            units_sold = sum(sold) * quantity
+            attempts = options['threads'] * options['attempts']
+            self.stdout.write(f'Attempts: {attempts} in {elapsed:.2f} s ({attempts / elapsed:.0f}/s)')
+            self.stdout.write(f'Sold: {units_sold} units, rejected: {sum(rejected)}, errors: {len(errors)}')
+            self.stdout.write(f'Stock: initial {initial_stock}, final {product.stock}')
+            for exc in errors[:5]:
+                self.stderr.write(f'  {type(exc).__name__}: {exc}')
+
+            oversold = units_sold - initial_stock
+            if oversold > 0 or product.stock != initial_stock - units_sold:
+                raise CommandError(
+                    f'Inconsistent stock: sold {units_sold} of {initial_stock}, final stock {product.stock}.'
+                )
+            self.stdout.write(self.style.SUCCESS('No oversells: sold units match the stock decrease.'))
+        finally:
+            product.delete()
+            category.delete()
+
+    @staticmethod
+    def buy_atomic(product_id, quantity):
+        try:
+            decrement_stock(product_id, quantity)
+        except OutOfStock:
+            return False
+        return True
+
+    @staticmethod
+    def buy_naive(product_id, quantity):
+        product = Product.objects.get(pk=product_id)
+        if product.stock < quantity:
+            return False
+        product.stock -= quantity
+        product.save(update_fields=['stock'])
+        return True
@@ -0,0 +1,110 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog.models import Blog
+from catalog.currency import convert_amounts, get_rate_table
+from catalog.forms import PriceFilterForm
+from catalog.models import Category, Product
+
+
+def build_products(count):
+    """
+    Создает несохраненные объекты Product для рендеринга без обращения к базе данных.
+    """
+    category = Category(pk=1, name='Категория', description='Описание категории')
+    return [
+        Product(
+            pk=index,
+            name=f'Продукт {index}',
+            description='Описание продукта ' * 10,
+            category=category,
+            price=Decimal('1000.00') + index,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def build_blog_posts(count):
+    """
+    Создает несохраненные объекты Blog для рендеринга без обращения к базе данных.
+    """
+    now = timezone.now()
+    return [
+        Blog(pk=index, title=f'Статья {index}', slug=f'statya-{index}', content='Текст ' * 50, created_at=now)
+        for index in range(1, count + 1)
+    ]
+
+
+def home_context(count):
+    rate_table = get_rate_table()
+    currency = rate_table.get(None)
+    products = build_products(count)
+    for product, price in zip(products, convert_amounts([product.price for product in products], currency)):
+        product.converted_price = price
+    return {
+        'page_obj': Paginator(products, max(count, 1)).get_page(1),
+        'currency': currency,
+        'currencies': rate_table.currencies.values(),
+        'filter_form': PriceFilterForm(),
+        'title': 'Skystore',
+    }
+
+
+def blog_list_context(count):
+    return {'blog_posts': build_blog_posts(count)}
+
+
+# Шаблоны страниц-списков и функции построения их контекста по количеству карточек.
+LISTING_TEMPLATES = [
+    ('catalog/home.html', home_context),
+    ('blog/blog_list.html', blog_list_context),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measures compile and render cost of listing templates, including the per-card cost of the item loop.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=5, help='Number of cards rendered per page.')
+        parser.add_argument('--iterations', type=int, default=200, help='Number of renders per measurement.')
+
+    def handle(self, *args, **options):
+        items = options['items']
+        iterations = options['iterations']
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+
+        self.stdout.write(
+            f'{"template":32} {"compile ms":>11} {"empty ms":>9} {"page ms":>9} {"per card ms":>12} {"bytes":>8}'
+        )
+        for name, build_context in LISTING_TEMPLATES:
+            started = time.perf_counter()
+            template = get_template(name)
+            compile_ms = (time.perf_counter() - started) * 1000
+
+            empty_ms, _size = self.measure(template, build_context(0), request, iterations)
+            page_ms, size = self.measure(template, build_context(items), request, iterations)
+            per_card_ms = (page_ms - empty_ms) / items if items else 0.0
+
+            self.stdout.write(
+                f'{name:32} {compile_ms:11.3f} {empty_ms:9.3f} {page_ms:9.3f} {per_card_ms:12.3f} {size:8}'
+            )
+
+    @staticmethod
+    def measure(template, context, request, iterations):
+        """
+        Возвращает среднее время рендеринга в миллисекундах и размер результата в байтах.
+        """
+        content = template.render(context, request)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            template.render(context, request)
+        elapsed = (time.perf_counter() - started) / iterations
+        return elapsed * 1000, len(content.encode())
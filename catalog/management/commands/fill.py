@@ -1,11 +1,14 @@
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from catalog.models import Product, Category
 
 class Command(BaseCommand):
     help = 'Deletes all data from Product and Category tables and loads new data from fixtures.'
 
+    @transaction.atomic
     def handle(self, *args, **options):
+        # Удаление и загрузка выполняются в одной транзакции вместе с записью событий в журнал изменений
         # Удаление всех продуктов и категорий
         self.stdout.write(self.style.WARNING('Deleting all products and categories...'))
         Product.objects.all().delete()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.inventory import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Releases expired stock reservations and returns reserved quantity to stock.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of reservations per batch.')
+
+    def handle(self, *args, **options):
+        released = release_expired_reservations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired reservation(s).'))
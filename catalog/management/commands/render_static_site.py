@@ -0,0 +1,73 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from catalog.static_site import (
+    collect_pages, init_worker, load_manifest, remove_file, render_page, save_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-renders public catalog and blog pages (listings, product and blog detail pages) to a directory '
+        'served directly by nginx. Renders in a process pool; incremental by default.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=getattr(settings, 'STATIC_SITE_ROOT', os.path.join(settings.BASE_DIR, 'static_site')),
+            help='Output directory.',
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes.')
+        parser.add_argument('--full', action='store_true', help='Re-render every page, ignoring the manifest.')
+
+    def handle(self, *args, **options):
+        output_dir = options['output']
+        os.makedirs(output_dir, exist_ok=True)
+        started = time.perf_counter()
+
+        pages = collect_pages()
+        previous = {} if options['full'] else load_manifest(output_dir)
+        changed = [page for page in pages if previous.get(page.path, {}).get('fingerprint') != page.fingerprint]
+
+        # Файлы страниц, которых больше нет (снятые с публикации статьи, лишние страницы списка)
+        current_paths = {page.path for page in pages}
+        stale = [path for path in previous if path not in current_paths]
+        for path in stale:
+            remove_file(output_dir, path)
+
+        manifest = {path: entry for path, entry in previous.items() if path in current_paths}
+        # Соединения с базой данных не должны наследоваться процессами пула
+        connections.close_all()
+        rendered = skipped = total_bytes = 0
+        if changed:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as executor:
+                results = executor.map(
+                    render_page,
+                    [page.url for page in changed],
+                    [page.path for page in changed],
+                    [output_dir] * len(changed),
+                    chunksize=max(1, len(changed) // (options['workers'] * 4)),
+                )
+                by_path = {page.path: page for page in changed}
+                for path, status, size in results:
+                    page = by_path[path]
+                    manifest[path] = {'url': page.url, 'fingerprint': page.fingerprint, 'status': status}
+                    if status == 200:
+                        rendered += 1
+                        total_bytes += size
+                    else:
+                        skipped += 1
+                        self.stdout.write(self.style.WARNING(f'Skipped {page.url}: HTTP {status}'))
+        save_manifest(output_dir, manifest)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(pages)} page(s): rendered {rendered} ({total_bytes / 1024:.0f} KiB), '
+            f'skipped {skipped}, unchanged {len(pages) - len(changed)}, removed {len(stale)} '
+            f'in {elapsed:.2f} s -> {output_dir}'
+        ))
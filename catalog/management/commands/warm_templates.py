@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.template_cache import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Compiles every project template and reports compile time and syntax errors.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-list', action='store_true', help='Print compile time for every template.')
+
+    def handle(self, *args, **options):
+        results = warm_templates()
+        total = sum(elapsed for _name, elapsed, _error in results)
+        errors = [(name, error) for name, _elapsed, error in results if error]
+
+        if options['verbose_list']:
+            for name, elapsed, error in results:
+                status = 'ERROR' if error else 'ok'
+                self.stdout.write(f'{elapsed * 1000:8.2f} ms  {status:5}  {name}')
+
+        for name, error in errors:
+            self.stderr.write(self.style.ERROR(f'{name}: {error}'))
+        if errors:
+            raise CommandError(f'{len(errors)} template(s) failed to compile.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Compiled {len(results)} templates in {total * 1000:.1f} ms.'
+        ))
@@ -0,0 +1,22 @@
+"""
+Проверка доступа к изображениям продуктов для uploads.serving (настройка MEDIA_ACCESS_HOOKS).
+"""
+from uploads.serving import DENIED, PRIVATE, PUBLIC
+
+from .models import Product, ProductArchive
+
+
+def product_image_access(request, name):
+    """
+    Изображение, которое используется только неопубликованными или архивными продуктами,
+    доступно лишь пользователям с правом изменения продуктов. Файлы, не привязанные
+    к продуктам (например, заглушка), доступны всем.
+    """
+    published = set(Product.objects.filter(image=name).values_list('is_published', flat=True))
+    if True in published:
+        return PUBLIC
+    if not published and not ProductArchive.objects.filter(image=name).exists():
+        return PUBLIC
+    if request.user.has_perm('catalog.change_product'):
+        return PRIVATE
+    return DENIED
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_product_stock_stockreservation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Наименование'),
+        ),
+    ]
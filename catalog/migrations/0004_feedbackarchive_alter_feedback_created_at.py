@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_alter_category_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Имя')),
+                ('phone', models.CharField(max_length=20, verbose_name='Телефон')),
+                ('message', models.TextField(verbose_name='Сообщение')),
+                ('created_at', models.DateTimeField(verbose_name='Дата получения')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+            ],
+            options={
+                'verbose_name': 'Архив обратной связи',
+                'verbose_name_plural': 'Архив обратной связи',
+            },
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата получения'),
+        ),
+    ]
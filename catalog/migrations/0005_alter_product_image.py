@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_feedbackarchive_alter_feedback_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, default='products/placeholder.svg', null=True, upload_to='products/', verbose_name='Изображение'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_alter_product_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True, verbose_name='ID продукта')),
+                ('name', models.CharField(max_length=100, verbose_name='Наименование')),
+                ('description', models.TextField(verbose_name='Описание')),
+                ('image', models.ImageField(blank=True, db_index=True, null=True, upload_to='products/', verbose_name='Изображение')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Цена товара')),
+                ('is_published', models.BooleanField(verbose_name='Опубликовано')),
+                ('stock', models.PositiveIntegerField(blank=True, null=True, verbose_name='Остаток на складе')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата последнего изменения')),
+                ('order_item_ids', models.JSONField(blank=True, default=list, verbose_name='Позиции заказов')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+            ],
+            options={
+                'verbose_name': 'Архивный продукт',
+                'verbose_name_plural': 'Архив продуктов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at'], name='product_published_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='productarchive',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.category', verbose_name='Категория'),
+        ),
+    ]
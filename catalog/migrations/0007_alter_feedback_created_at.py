@@ -0,0 +1,19 @@
+# Generated by Django 6.0.9 on 2026-10-19 13:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_productarchive_product_product_published_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='feedback',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False, verbose_name='Дата получения'),
+        ),
+    ]
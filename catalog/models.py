@@ -1,11 +1,17 @@
 from django.db import models
+from django.utils import timezone
 
+from changefeed.tracking import ChangeTrackedMixin
 
-class Category(models.Model):
+
+class Category(ChangeTrackedMixin, models.Model):
     """
     Модель для представления категорий продуктов.
     """
-    name = models.CharField(max_length=100, verbose_name='Наименование')
+    # Индекс используется для сортировки по наименованию. Фильтр autocomplete (istartswith, то есть
+    # UPPER(name) LIKE ...) обычным B-tree индексом не ускоряется, но запрос с ORDER BY name LIMIT
+    # читает индекс по порядку и останавливается, найдя AUTOCOMPLETE_LIMIT подходящих строк.
+    name = models.CharField(max_length=100, db_index=True, verbose_name='Наименование')
     description = models.TextField(verbose_name='Описание')
 
     def __str__(self):
@@ -16,25 +22,119 @@ class Category(models.Model):
         verbose_name_plural = 'Категории'
 
 
-class Product(models.Model):
+class ProductQuerySet(models.QuerySet):
+
+    def published(self):
+        """
+        Опубликованные продукты — то, что видят покупатели на витрине.
+        """
+        return self.filter(is_published=True)
+
+
+class Product(ChangeTrackedMixin, models.Model):
     """
     Модель для представления продуктов.
+    Давно снятые с публикации продукты переносятся в ProductArchive (см. catalog.archive).
     """
     name = models.CharField(max_length=100, verbose_name='Наименование')
     description = models.TextField(verbose_name='Описание')
-    image = models.ImageField(upload_to='products/', verbose_name='Изображение', null=True, blank=True, default='products/placeholder.svg')
+    # Индекс используется проверкой доступа к изображениям при их отдаче (catalog.media_access)
+    image = models.ImageField(
+        upload_to='products/', verbose_name='Изображение', null=True, blank=True,
+        default='products/placeholder.svg', db_index=True,
+    )
     category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name='Категория')
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Цена товара')
     is_published = models.BooleanField(default=True, verbose_name='Опубликовано')
+    # Остаток изменяется только атомарными условными UPDATE (см. catalog.inventory).
+    # Пустое значение означает, что остаток товара не учитывается.
+    stock = models.PositiveIntegerField(null=True, blank=True, verbose_name='Остаток на складе',
+                                        help_text='Оставьте пустым, если остаток не учитывается')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата последнего изменения')
 
+    objects = ProductQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.name} ({self.category})'
 
+    def save(self, *args, **kwargs):
+        """
+        При сохранении существующего продукта поле stock не записывается: остаток изменяется
+        только атомарными UPDATE (catalog.inventory), а значение, прочитанное в начале запроса
+        (форма, админка), затерло бы резервы и продажи, выполненные до сохранения.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'stock'
+            ]
+            # Событие журнала изменений (changefeed) должно содержать текущий остаток
+            self.stock = type(self)._base_manager.filter(pk=self.pk).values_list('stock', flat=True).first()
+        super().save(*args, **kwargs)
+
+    @property
+    def in_stock(self):
+        return self.stock is None or self.stock > 0
+
     class Meta:
         verbose_name = 'Продукт'
         verbose_name_plural = 'Продукты'
+        indexes = [
+            # Частичный индекс для списка на витрине: только опубликованные продукты, сначала новые
+            models.Index(
+                fields=['-created_at'], condition=models.Q(is_published=True), name='product_published_created_idx',
+            ),
+        ]
+
+
+class ProductArchive(models.Model):
+    """
+    Модель для архива продуктов, снятых с публикации или давно не изменявшихся.
+    Продукты переносятся сюда пакетами командой archive_products и возвращаются
+    действием "Восстановить" в административной панели с прежним id.
+    """
+    original_id = models.BigIntegerField(unique=True, verbose_name='ID продукта')
+    name = models.CharField(max_length=100, verbose_name='Наименование')
+    description = models.TextField(verbose_name='Описание')
+    # Индекс используется проверкой доступа к изображениям архивных продуктов (catalog.media_access)
+    image = models.ImageField(upload_to='products/', verbose_name='Изображение', null=True, blank=True, db_index=True)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name='Категория')
+    price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Цена товара')
+    is_published = models.BooleanField(verbose_name='Опубликовано')
+    stock = models.PositiveIntegerField(null=True, blank=True, verbose_name='Остаток на складе')
+    created_at = models.DateTimeField(verbose_name='Дата создания')
+    updated_at = models.DateTimeField(verbose_name='Дата последнего изменения')
+    # Позиции заказов, ссылавшиеся на продукт: при архивации ссылка обнуляется, при восстановлении возвращается
+    order_item_ids = models.JSONField(default=list, blank=True, verbose_name='Позиции заказов')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')
+
+    def __str__(self):
+        return f'{self.name} ({self.category})'
+
+    class Meta:
+        verbose_name = 'Архивный продукт'
+        verbose_name_plural = 'Архив продуктов'
+
+
+class StockReservation(models.Model):
+    """
+    Модель для временного резервирования остатка товара.
+    Зарезервированное количество уже списано с Product.stock и возвращается,
+    если резерв не подтвержден до истечения expires_at.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name='Продукт')
+    quantity = models.PositiveIntegerField(verbose_name='Количество')
+    token = models.CharField(max_length=64, db_index=True, verbose_name='Идентификатор владельца')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    expires_at = models.DateTimeField(db_index=True, verbose_name='Действует до')
+
+    def __str__(self):
+        return f'{self.product} x {self.quantity}'
+
+    class Meta:
+        verbose_name = 'Резерв товара'
+        verbose_name_plural = 'Резервы товаров'
 
 
 class Contact(models.Model):
@@ -60,11 +160,34 @@ class Feedback(models.Model):
     name = models.CharField(max_length=100, verbose_name='Имя')
     phone = models.CharField(max_length=20, verbose_name='Телефон')
     message = models.TextField(verbose_name='Сообщение')
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата получения')
+    # Индекс используется командой archive_feedback для выборки старых сообщений. Время задается при получении
+    # сообщения, а не при пакетной записи в базу данных (auto_now_add заменил бы его временем записи)
+    created_at = models.DateTimeField(
+        default=timezone.now, editable=False, db_index=True, verbose_name='Дата получения'
+    )
 
     def __str__(self):
         return f'{self.name} ({self.phone})'
 
     class Meta:
         verbose_name = 'Обратная связь'
-        verbose_name_plural = 'Обратная связь'
\ No newline at end of file
+        verbose_name_plural = 'Обратная связь'
+
+
+class FeedbackArchive(models.Model):
+    """
+    Модель для архива старых сообщений обратной связи.
+    Сообщения переносятся сюда пакетами командой archive_feedback.
+    """
+    name = models.CharField(max_length=100, verbose_name='Имя')
+    phone = models.CharField(max_length=20, verbose_name='Телефон')
+    message = models.TextField(verbose_name='Сообщение')
+    created_at = models.DateTimeField(verbose_name='Дата получения')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')
+
+    def __str__(self):
+        return f'{self.name} ({self.phone})'
+
+    class Meta:
+        verbose_name = 'Архив обратной связи'
+        verbose_name_plural = 'Архив обратной связи'
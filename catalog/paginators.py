@@ -0,0 +1,55 @@
+"""
+Пагинатор с оценочным подсчетом количества строк для больших таблиц.
+
+Точный COUNT(*) в PostgreSQL читает всю таблицу (или индекс). Для больших таблиц
+достаточно оценки планировщика: для запроса без условий — pg_class.reltuples,
+для запроса с фильтрами — оценка строк из EXPLAIN. Если оценка меньше порога,
+выполняется точный подсчет. На других СУБД всегда используется точный подсчет.
+"""
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATED_COUNT_THRESHOLD = getattr(settings, 'ESTIMATED_COUNT_THRESHOLD', 10000)
+
+
+def estimate_count(queryset):
+    """
+    Возвращает оценку количества строк queryset по статистике планировщика
+    или None, если оценка недоступна.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples = -1, если таблица еще не анализировалась
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, использующий оценку количества строк вместо COUNT(*) для больших таблиц.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .choices import invalidate_category_choices
+from .models import Category
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, **kwargs):
+    """
+    Сбрасывает кэшированный список категорий после фиксации изменения любой категории.
+    """
+    transaction.on_commit(invalidate_category_choices)
@@ -0,0 +1,37 @@
+// Поиск категорий для выпадающих списков с атрибутом data-autocomplete-url.
+// Над списком добавляется поле поиска; найденные категории заменяют варианты списка,
+// выбранная категория при этом сохраняется.
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+        var input = document.createElement('input');
+        var timer = null;
+        input.type = 'search';
+        input.className = 'form-control mb-1';
+        input.placeholder = 'Поиск категории';
+        select.parentNode.insertBefore(input, select);
+
+        function load(term) {
+            var url = select.dataset.autocompleteUrl + '?term=' + encodeURIComponent(term);
+            fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    var selected = select.value;
+                    Array.from(select.options).forEach(function (option) {
+                        if (option.value && option.value !== selected) {
+                            option.remove();
+                        }
+                    });
+                    data.results.forEach(function (item) {
+                        if (String(item.id) !== selected) {
+                            select.add(new Option(item.text, item.id));
+                        }
+                    });
+                });
+        }
+
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () { load(input.value); }, 250);
+        });
+    });
+});
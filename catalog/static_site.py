@@ -0,0 +1,184 @@
+"""
+Статический экспорт публичных страниц каталога и блога.
+
+Страницы рендерятся через обычные представления от имени анонимного посетителя
+и записываются в каталог, который nginx может отдавать напрямую. Страницы, которые
+анонимный посетитель не видит (ответ не 200, например из-за LoginRequiredMixin),
+не экспортируются.
+
+Для каждой страницы вычисляется отпечаток данных, из которых она строится.
+Отпечатки сохраняются в манифесте; в инкрементальном режиме перерисовываются
+только страницы с изменившимся отпечатком, а файлы исчезнувших страниц удаляются.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.handlers.base import BaseHandler
+from django.test import RequestFactory
+from django.urls import reverse
+
+from analytics.tracking import get_trending_product_ids
+from blog.models import Blog
+
+from .models import Product
+from .views import ProductDetailView, ProductListView
+
+MANIFEST_NAME = '.manifest.json'
+
+
+@dataclass
+class Page:
+    """
+    Экспортируемая страница: URL, путь файла относительно каталога экспорта и отпечаток данных.
+    """
+    url: str
+    path: str
+    fingerprint: str
+
+
+def fingerprint(*values):
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(repr(value).encode())
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def iter_home_pages():
+    """
+    Страницы списка продуктов. Отпечаток страницы зависит от продуктов на ней
+    (id и дата изменения), от общего числа страниц, которое выводится в пагинации,
+    и от блока популярных товаров, который выводится на каждой странице.
+    """
+    per_page = ProductListView.products_per_page
+    rows = list(ProductListView().get_queryset().values_list('pk', 'updated_at'))
+    trending_ids = get_trending_product_ids(ProductListView.trending_size)
+    trending = Product.objects.published().in_bulk(trending_ids)
+    trending_rows = [(pk, trending[pk].updated_at) for pk in trending_ids if pk in trending]
+    page_count = max(1, -(-len(rows) // per_page))
+    home_url = reverse('catalog:home')
+    for number in range(1, page_count + 1):
+        page_rows = rows[(number - 1) * per_page:number * per_page]
+        if number == 1:
+            url, path = home_url, 'index.html'
+        else:
+            url, path = f'{home_url}?page={number}', f'page-{number}.html'
+        yield Page(url, path, fingerprint('home', page_count, page_rows, trending_rows))
+
+
+def iter_product_pages():
+    """
+    Страницы опубликованных продуктов. Пока страница продукта доступна только после входа,
+    анонимный посетитель получает перенаправление на вход, и такие страницы не рендерятся вовсе.
+    """
+    if issubclass(ProductDetailView, LoginRequiredMixin):
+        return
+    products = Product.objects.published().values_list('pk', 'updated_at', 'category__name')
+    for pk, updated_at, category_name in products.iterator():
+        url = reverse('catalog:product_detail', args=[pk])
+        yield Page(url, f'{url.strip("/")}/index.html', fingerprint('product', updated_at, category_name))
+
+
+def iter_blog_pages():
+    """
+    Список статей и страницы опубликованных статей. Счетчик просмотров в отпечаток не входит,
+    иначе страница перерисовывалась бы после каждого просмотра.
+    """
+    posts = list(
+        Blog.objects.filter(is_published=True)
+        .exclude(slug__isnull=True).exclude(slug='')
+        .values_list('pk', 'slug', 'title', 'preview', 'excerpt', 'reading_time', 'created_at', 'renderer_version')
+    )
+    list_url = reverse('blog:list')
+    yield Page(list_url, f'{list_url.strip("/")}/index.html', fingerprint('blog_list', posts))
+
+    details = Blog.objects.filter(pk__in=[post[0] for post in posts]).values_list(
+        'slug', 'title', 'preview', 'content_html', 'content', 'created_at', 'renderer_version'
+    )
+    for row in details.iterator():
+        url = reverse('blog:detail', kwargs={'slug': row[0]})
+        yield Page(url, f'{url.strip("/")}/index.html', fingerprint('blog_detail', row))
+
+
+def collect_pages():
+    """
+    Возвращает список всех экспортируемых страниц.
+    """
+    return [*iter_home_pages(), *iter_product_pages(), *iter_blog_pages()]
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    write_file(output_dir, MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=1).encode())
+
+
+def write_file(output_dir, path, content):
+    """
+    Записывает файл атомарно: nginx никогда не отдаст частично записанную страницу.
+    """
+    full_path = os.path.join(output_dir, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    tmp_path = f'{full_path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as tmp_file:
+        tmp_file.write(content)
+    os.replace(tmp_path, full_path)
+
+
+def remove_file(output_dir, path):
+    try:
+        os.remove(os.path.join(output_dir, path))
+    except FileNotFoundError:
+        pass
+
+
+_handler = None
+
+
+def get_handler():
+    """
+    Обработчик запросов с полным набором промежуточных слоев; создается один раз на процесс.
+    """
+    global _handler
+    if _handler is None:
+        _handler = BaseHandler()
+        _handler.load_middleware()
+    return _handler
+
+
+def render_page(url, path, output_dir):
+    """
+    Рендерит страницу от имени анонимного посетителя и записывает ее в файл.
+    Выполняется в процессе пула. Возвращает (путь, код ответа, размер).
+    Признак статического рендеринга передается атрибутом запроса static_render,
+    а не заголовком: посетитель не может его подделать.
+    """
+    host = settings.ALLOWED_HOSTS[0].lstrip('.') if settings.ALLOWED_HOSTS else 'localhost'
+    if host == '*':
+        host = 'localhost'
+    request = RequestFactory(HTTP_HOST=host).get(url)
+    request.static_render = True
+    response = get_handler().get_response(request)
+    if response.status_code != 200:
+        remove_file(output_dir, path)
+        return path, response.status_code, 0
+    write_file(output_dir, path, response.content)
+    return path, response.status_code, len(response.content)
+
+
+def init_worker():
+    """
+    Инициализация процесса пула: настройка Django при запуске методами spawn/forkserver.
+    """
+    import django
+    django.setup()
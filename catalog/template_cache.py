@@ -0,0 +1,57 @@
+"""
+Предварительная компиляция шаблонов проекта.
+
+Кэширующий загрузчик Django (используется по умолчанию) компилирует каждый шаблон
+один раз на процесс. Функция warm_templates() выполняет эту работу при старте
+процесса, чтобы первые запросы не платили за поиск и разбор файлов.
+"""
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def iter_template_names(engine):
+    """
+    Возвращает имена всех шаблонов, доступных загрузчикам движка.
+    Имена отдаются относительно каталогов шаблонов, как их принимает get_template().
+    """
+    seen = set()
+    for loader in engine.template_loaders:
+        if not hasattr(loader, 'get_dirs'):
+            continue
+        for template_dir in loader.get_dirs():
+            template_dir = str(template_dir)
+            for root, _dirs, files in os.walk(template_dir):
+                for filename in files:
+                    if not filename.endswith(TEMPLATE_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, filename)
+                    name = os.path.relpath(path, template_dir).replace(os.sep, '/')
+                    if name not in seen:
+                        seen.add(name)
+                        yield name
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны проекта во всех движках DjangoTemplates.
+    Возвращает список кортежей (имя шаблона, время компиляции в секундах, ошибка или None).
+    """
+    results = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        for name in sorted(iter_template_names(engine)):
+            started = time.perf_counter()
+            try:
+                engine.get_template(name)
+                error = None
+            except TemplateSyntaxError as exc:
+                error = str(exc)
+            results.append((name, time.perf_counter() - started, error))
+    return results
@@ -1,3 +1,325 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from analytics.tracking import TRENDING_CACHE_KEY
+from cart.cart import Cart, CART_COOKIE_NAME
+from cart.models import Order, OrderItem
+from users.models import User
+
+from .archive import archive_candidates, archive_products, restore_products
+from .currency import BASE_PRICE_STEP, Currency, convert_amounts, get_rate_table, to_base_bound
+from .forms import ProductForm
+from .inventory import (
+    OutOfStock, adjust_stock, commit_items, release_expired_reservations, release_reservation, reserve_items,
+    reserve_stock,
+)
+from .models import Category, Feedback, Product, ProductArchive, StockReservation
+from .static_site import collect_pages, iter_home_pages
+from .throttling import TokenBucket, get_client_ip, is_duplicate_feedback
+from .views import feedback_writer
+
+
+def create_product(name='Товар', price=100, stock=None, category=None, **kwargs):
+    category = category or Category.objects.get_or_create(name='Категория', defaults={'description': ''})[0]
+    return Product.objects.create(name=name, description='', category=category, price=price, stock=stock, **kwargs)
+
+
+def stock_of(product):
+    return Product.objects.values_list('stock', flat=True).get(pk=product.pk)
+
+
+class StockTests(TestCase):
+
+    def setUp(self):
+        self.product = create_product(stock=5)
+
+    def test_save_does_not_overwrite_stock_changed_after_load(self):
+        product = Product.objects.get(pk=self.product.pk)
+        reserve_stock(product.pk, 2, token='other')
+        product.name = 'Новое название'
+        product.save()
+        self.assertEqual(stock_of(product), 3)
+        self.assertEqual(Product.objects.get(pk=product.pk).name, 'Новое название')
+
+    def test_update_view_does_not_overwrite_stock_reserved_during_request(self):
+        user = User.objects.create_user(email='staff@example.com', password='secret-password')
+        self.client.force_login(user)
+        original_clean_price = ProductForm.clean_price
+
+        def clean_price_with_reservation(form):
+            # Резерв выполняется после загрузки продукта формой, но до его сохранения
+            reserve_stock(self.product.pk, 2, token='other')
+            return original_clean_price(form)
+
+        with mock.patch.object(ProductForm, 'clean_price', clean_price_with_reservation):
+            response = self.client.post(reverse('catalog:update_product', args=[self.product.pk]), {
+                'name': 'новое название', 'description': 'описание', 'category': self.product.category_id,
+                'price': '150', 'is_published': 'on',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(stock_of(self.product), 3)
+
+    def test_new_product_keeps_initial_stock(self):
+        self.assertEqual(stock_of(self.product), 5)
+
+    def test_reserve_and_release_return_stock_once(self):
+        reservation = reserve_stock(self.product.pk, 2, token='cart:a')
+        self.assertEqual(stock_of(self.product), 3)
+        self.assertTrue(release_reservation(reservation))
+        self.assertFalse(release_reservation(reservation))
+        self.assertEqual(stock_of(self.product), 5)
+
+    def test_reserve_items_is_all_or_nothing(self):
+        other = create_product(name='Другой', stock=1)
+        with self.assertRaises(OutOfStock):
+            reserve_items('cart:a', [(self.product.pk, 2), (other.pk, 2)])
+        self.assertEqual(stock_of(self.product), 5)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_repeated_reserve_items_does_not_reserve_twice(self):
+        reserve_items('cart:a', [(self.product.pk, 2)])
+        reserve_items('cart:a', [(self.product.pk, 2)])
+        self.assertEqual(stock_of(self.product), 3)
+
+    def test_commit_items_takes_expired_reservation_again(self):
+        reserve_items('cart:a', [(self.product.pk, 2)], ttl=-1)
+        self.assertEqual(release_expired_reservations(), 1)
+        commit_items('cart:a', [(self.product.pk, 2)])
+        self.assertEqual(stock_of(self.product), 3)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_stock_never_goes_negative(self):
+        with self.assertRaises(OutOfStock):
+            reserve_stock(self.product.pk, 6, token='cart:a')
+        self.assertEqual(adjust_stock([self.product.pk], -6), 0)
+        self.assertEqual(adjust_stock([self.product.pk], -5), 1)
+        self.assertEqual(stock_of(self.product), 0)
+
+    def test_untracked_stock_is_not_limited(self):
+        untracked = create_product(name='Без учета')
+        reserve_stock(untracked.pk, 100, token='cart:a')
+        self.assertIsNone(stock_of(untracked))
+
+
+class CheckoutTests(TestCase):
+
+    def setUp(self):
+        self.product = create_product(stock=3)
+        self.user = User.objects.create_user(email='buyer@example.com', password='secret-password')
+        self.client.force_login(self.user)
+        cart = Cart()
+        cart.replace({self.product.pk: 2})
+        self.client.cookies[CART_COOKIE_NAME] = cart.token
+
+    def test_confirmation_page_does_not_reserve(self):
+        response = self.client.get(reverse('cart:checkout'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(stock_of(self.product), 3)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_order_takes_stock(self):
+        response = self.client.post(reverse('cart:checkout'))
+        self.assertRedirects(response, reverse('catalog:home'), fetch_redirect_response=False)
+        self.assertEqual(stock_of(self.product), 1)
+        self.assertEqual(Order.objects.get(user=self.user).items.get().quantity, 2)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_order_out_of_stock_changes_nothing(self):
+        Product.objects.filter(pk=self.product.pk).update(stock=1)
+        response = self.client.post(reverse('cart:checkout'))
+        self.assertRedirects(response, reverse('cart:detail'), fetch_redirect_response=False)
+        self.assertEqual(stock_of(self.product), 1)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_failed_order_releases_reservation(self):
+        with mock.patch('cart.views.Order.objects.create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('cart:checkout'))
+        self.assertEqual(stock_of(self.product), 3)
+        self.assertFalse(StockReservation.objects.exists())
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.bucket = TokenBucket('test', capacity=2, rate=1)
+
+    def test_limits_and_refills(self):
+        with mock.patch('catalog.throttling.time.time', return_value=1000.0):
+            self.assertTrue(self.bucket.allow('key'))
+            self.assertTrue(self.bucket.allow('key'))
+            self.assertFalse(self.bucket.allow('key'))
+            self.assertTrue(self.bucket.allow('other'))
+        with mock.patch('catalog.throttling.time.time', return_value=1001.0):
+            self.assertTrue(self.bucket.allow('key'))
+            self.assertFalse(self.bucket.allow('key'))
+
+
+class FeedbackThrottlingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(feedback_writer.flush)
+
+    def send(self, phone='+7 (900) 123-45-67', message='Здравствуйте', **extra):
+        return self.client.post(
+            reverse('catalog:contacts'), {'name': 'Иван', 'phone': phone, 'message': message}, **extra
+        )
+
+    def test_duplicate_is_recognized_after_normalization(self):
+        self.assertFalse(is_duplicate_feedback('+7 (900) 123-45-67', 'Привет,  мир'))
+        self.assertTrue(is_duplicate_feedback('8 900 123 45 67', 'привет, мир'))
+        self.assertFalse(is_duplicate_feedback('8 900 123 45 67', 'другое сообщение'))
+
+    def test_duplicate_is_saved_once(self):
+        self.send()
+        self.send(phone='89001234567', message='  здравствуйте ')
+        feedback_writer.flush()
+        self.assertEqual(Feedback.objects.count(), 1)
+
+    def test_created_at_is_time_of_sending(self):
+        self.send()
+        sent_at = feedback_writer._items[-1].created_at
+        feedback_writer.flush()
+        self.assertEqual(Feedback.objects.get().created_at, sent_at)
+
+    def test_rate_limit_by_ip(self):
+        for number in range(5):
+            self.assertEqual(self.send(phone=f'+7 900 000 00 0{number}').status_code, 302)
+        self.assertEqual(self.send(phone='+7 900 000 00 09').status_code, 429)
+
+
+@override_settings(USE_X_FORWARDED_FOR=True, TRUSTED_PROXY_COUNT=1)
+class ClientIpTests(SimpleTestCase):
+
+    def ip(self, forwarded=None, remote='10.0.0.1'):
+        request = RequestFactory().get('/', REMOTE_ADDR=remote)
+        if forwarded is not None:
+            request.META['HTTP_X_FORWARDED_FOR'] = forwarded
+        return get_client_ip(request)
+
+    def test_uses_address_added_by_trusted_proxy(self):
+        self.assertEqual(self.ip('1.1.1.1, 203.0.113.5'), '203.0.113.5')
+
+    @override_settings(TRUSTED_PROXY_COUNT=2)
+    def test_skips_trusted_proxies(self):
+        self.assertEqual(self.ip('1.1.1.1, 203.0.113.5, 10.0.0.2'), '203.0.113.5')
+        self.assertEqual(self.ip('10.0.0.2'), '10.0.0.1')
+
+    def test_without_header_uses_remote_addr(self):
+        self.assertEqual(self.ip(), '10.0.0.1')
+
+    @override_settings(USE_X_FORWARDED_FOR=False)
+    def test_header_ignored_when_disabled(self):
+        self.assertEqual(self.ip('203.0.113.5'), '10.0.0.1')
+
+
+class StaticSiteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.product = create_product()
+
+    def test_login_only_product_pages_are_not_collected(self):
+        urls = [page.url for page in collect_pages()]
+        self.assertIn(reverse('catalog:home'), urls)
+        self.assertNotIn(reverse('catalog:product_detail', args=[self.product.pk]), urls)
+
+    def test_home_fingerprint_depends_on_trending(self):
+        before = next(iter_home_pages()).fingerprint
+        cache.set(TRENDING_CACHE_KEY, [(self.product.pk, 10)])
+        self.assertNotEqual(next(iter_home_pages()).fingerprint, before)
+
+
+class CurrencyBoundTests(SimpleTestCase):
+
+    def shown(self, price, currency):
+        return convert_amounts([price], currency)[0]
+
+    def test_bounds_match_displayed_prices(self):
+        for currency in get_rate_table().currencies.values():
+            for amount in ('0', '0.05', '1', '1.23', '12.3', '99.99', '100', '1005', '123456'):
+                amount = Decimal(amount)
+                lower = to_base_bound(amount, currency, upper=False)
+                self.assertGreaterEqual(self.shown(lower, currency), amount, (currency.code, amount))
+                if lower > 0:
+                    self.assertLess(self.shown(lower - BASE_PRICE_STEP, currency), amount, (currency.code, amount))
+                upper = to_base_bound(amount, currency, upper=True)
+                if upper is None:
+                    self.assertGreater(self.shown(Decimal(0), currency), amount, (currency.code, amount))
+                    continue
+                self.assertLessEqual(self.shown(upper, currency), amount, (currency.code, amount))
+                self.assertGreater(self.shown(upper + BASE_PRICE_STEP, currency), amount, (currency.code, amount))
+
+    def test_out_of_range_bounds(self):
+        currency = Currency('X', 'x', Decimal('1'), Decimal('0.01'), 'ROUND_HALF_UP')
+        self.assertIsNone(to_base_bound(Decimal('-1'), currency, upper=True))
+        self.assertIsNone(to_base_bound(Decimal('10') ** 9, currency, upper=False))
+
+
+class PriceFilterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.product = create_product(price=100)
+
+    def filtered(self, **params):
+        response = self.client.get(reverse('catalog:home'), {'currency': 'USD', **params})
+        return [product.pk for product in response.context['page_obj'].object_list]
+
+    def test_filter_uses_displayed_price(self):
+        # 100 руб. отображаются как $1.23
+        self.assertEqual(self.filtered(min_price='1.23'), [self.product.pk])
+        self.assertEqual(self.filtered(max_price='1.23'), [self.product.pk])
+        self.assertEqual(self.filtered(min_price='1.24'), [])
+        self.assertEqual(self.filtered(max_price='1.22'), [])
+
+
+class ArchiveTests(TestCase):
+
+    def setUp(self):
+        self.product = create_product(name='Старый', price=250, stock=4, is_published=False)
+        Product.objects.filter(pk=self.product.pk).update(created_at=timezone.now() - timedelta(days=400))
+        self.product.refresh_from_db()
+        user = User.objects.create_user(email='buyer@example.com', password='secret-password')
+        order = Order.objects.create(user=user, total=250)
+        self.item = OrderItem.objects.create(
+            order=order, product=self.product, product_name=self.product.name, quantity=1, price=250,
+        )
+
+    def test_archive_and_restore_round_trip(self):
+        self.assertEqual(archive_products(archive_candidates(unpublished_before=timezone.now())), 1)
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+        self.item.refresh_from_db()
+        self.assertIsNone(self.item.product_id)
+
+        self.assertEqual(restore_products(ProductArchive.objects.all()), 1)
+        restored = Product.objects.get(pk=self.product.pk)
+        for field in ('name', 'price', 'stock', 'is_published', 'category_id', 'created_at'):
+            self.assertEqual(getattr(restored, field), getattr(self.product, field), field)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.product_id, self.product.pk)
+        self.assertFalse(ProductArchive.objects.exists())
+
+    def test_published_and_reserved_products_are_not_archived(self):
+        published = create_product(name='На витрине')
+        reserve_stock(self.product.pk, 1, token='cart:a')
+        cutoff = timezone.now() + timedelta(days=1)
+        self.assertEqual(archive_products(archive_candidates(unpublished_before=cutoff)), 0)
+        self.assertEqual(Product.objects.filter(pk__in=[self.product.pk, published.pk]).count(), 2)
+
+    def test_untouched_products_are_archived_in_batches(self):
+        for number in range(4):
+            create_product(name=f'Товар {number}')
+        cutoff = timezone.now() + timedelta(days=1)
+        self.assertEqual(archive_products(archive_candidates(untouched_before=cutoff), batch_size=2), 5)
+        self.assertFalse(Product.objects.exists())
+        self.assertEqual(ProductArchive.objects.count(), 5)
@@ -0,0 +1,107 @@
+"""
+Защита формы обратной связи от флуда.
+
+TokenBucket — ограничитель частоты на основе "корзины токенов", состояние которой
+хранится в кэше: каждый ключ (IP-адрес, телефон) получает capacity токенов,
+которые восстанавливаются со скоростью rate токенов в секунду.
+Обновление состояния не атомарно между процессами: при гонке ограничение может
+быть превышено на несколько запросов, что для защиты от флуда допустимо.
+
+Повторные сообщения распознаются по отпечатку — хэшу нормализованных телефона и текста.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов с состоянием в кэше.
+    """
+
+    def __init__(self, prefix, capacity, rate):
+        self.prefix = prefix
+        self.capacity = capacity
+        self.rate = rate
+
+    def cache_key(self, key):
+        digest = hashlib.sha256(str(key).encode()).hexdigest()[:32]
+        return f'ratelimit:{self.prefix}:{digest}'
+
+    def allow(self, key, cost=1):
+        """
+        Списывает cost токенов для ключа. Возвращает False, если токенов недостаточно.
+        """
+        cache_key = self.cache_key(key)
+        now = time.time()
+        tokens, updated_at = cache.get(cache_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        # Состояние хранится, пока корзина не наполнится заново
+        cache.set(cache_key, (tokens, now), int((self.capacity - tokens) / self.rate) + 1)
+        return allowed
+
+
+FEEDBACK_RATE_LIMIT = getattr(settings, 'FEEDBACK_RATE_LIMIT', {'capacity': 5, 'per_seconds': 600})
+FEEDBACK_DUPLICATE_WINDOW = getattr(settings, 'FEEDBACK_DUPLICATE_WINDOW', 60 * 60 * 24)
+
+feedback_by_ip = TokenBucket(
+    'feedback_ip', FEEDBACK_RATE_LIMIT['capacity'],
+    FEEDBACK_RATE_LIMIT['capacity'] / FEEDBACK_RATE_LIMIT['per_seconds'],
+)
+feedback_by_phone = TokenBucket(
+    'feedback_phone', FEEDBACK_RATE_LIMIT['capacity'],
+    FEEDBACK_RATE_LIMIT['capacity'] / FEEDBACK_RATE_LIMIT['per_seconds'],
+)
+
+
+def normalize_phone(phone):
+    """
+    Оставляет в номере только цифры и приводит российские номера к виду 7XXXXXXXXXX,
+    чтобы "+7 (900) ...", "8 900 ..." и "900 ..." считались одним телефоном.
+    """
+    digits = ''.join(char for char in phone if char.isdigit())
+    if len(digits) == 11 and digits.startswith('8'):
+        return '7' + digits[1:]
+    if len(digits) == 10:
+        return '7' + digits
+    return digits
+
+
+def feedback_fingerprint(phone, message):
+    """
+    Возвращает отпечаток сообщения: хэш телефона и текста без учета регистра и пробелов.
+    """
+    normalized = f'{normalize_phone(phone)}\n{" ".join(message.lower().split())}'
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def is_duplicate_feedback(phone, message):
+    """
+    Возвращает True, если такое же сообщение уже поступало в течение FEEDBACK_DUPLICATE_WINDOW секунд.
+    Первое появление отпечатка запоминается атомарной операцией cache.add().
+    """
+    key = f'feedback:fingerprint:{feedback_fingerprint(phone, message)}'
+    return not cache.add(key, 1, FEEDBACK_DUPLICATE_WINDOW)
+
+
+def get_client_ip(request):
+    """
+    Возвращает IP-адрес клиента. Заголовок X-Forwarded-For учитывается только
+    при включенной настройке USE_X_FORWARDED_FOR (приложение работает за доверенным прокси).
+
+    Клиент может прислать заголовок с произвольными адресами, а каждый прокси дописывает
+    адрес в конец, поэтому берется адрес, записанный самым дальним из TRUSTED_PROXY_COUNT
+    доверенных прокси (N-й с конца). Если адресов меньше, запрос прошел не через все прокси
+    и заголовку нельзя доверять.
+    """
+    if getattr(settings, 'USE_X_FORWARDED_FOR', False):
+        forwarded = [address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        proxy_count = getattr(settings, 'TRUSTED_PROXY_COUNT', 1)
+        if proxy_count > 0 and len(forwarded) >= proxy_count and forwarded[-proxy_count]:
+            return forwarded[-proxy_count]
+    return request.META.get('REMOTE_ADDR', '')
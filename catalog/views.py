@@ -1,44 +1,165 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
+from django.db.models import Case, IntegerField, Value, When
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.urls import reverse_lazy, reverse
+from django.utils import timezone
+from django.views import View
 from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView, FormView
 )
 
-from .models import Product, Contact, Feedback
-from .forms import ProductForm, FeedbackForm
+from analytics.buffer import BufferedWriter
+from analytics.recent import get_recent_ids, push_recent
+from analytics.tracking import get_trending_product_ids, record_product_view
+from pagecache.swr import StaleWhileRevalidateMixin
+from uploads.views import ChunkedUploadViewMixin
+
+from .currency import apply_prices, get_rate_table, to_base_bound
+from .models import Product, Contact, Feedback, Category
+from .forms import PriceFilterForm, ProductForm, FeedbackForm
+from .throttling import (
+    feedback_by_ip, feedback_by_phone, get_client_ip, is_duplicate_feedback, normalize_phone,
+)
+
+# Сообщения обратной связи записываются в базу данных пакетами
+feedback_writer = BufferedWriter(
+    Feedback,
+    batch_size=getattr(settings, 'FEEDBACK_BUFFER_SIZE', 20),
+    flush_interval=getattr(settings, 'FEEDBACK_FLUSH_INTERVAL', 2.0),
+)
+
+
+def get_products_in_order(ids):
+    """
+    Загружает опубликованные продукты одним запросом in_bulk и возвращает их в порядке ids.
+    """
+    if not ids:
+        return []
+    products = Product.objects.published().in_bulk(ids)
+    return [products[pk] for pk in ids if pk in products]
 
 
-class ProductListView(ListView):
+class ProductListView(StaleWhileRevalidateMixin, ListView):
     """
     Представление для отображения списка продуктов с пагинацией.
     """
     model = Product
     template_name = 'catalog/home.html'
     context_object_name = 'page_obj'
+    products_per_page = 5
+    trending_size = 5
 
     def get_queryset(self):
         """
-        Возвращает queryset продуктов, отсортированных по дате создания (сначала новые).
+        Возвращает queryset опубликованных продуктов, отсортированных по дате создания (сначала новые).
+        """
+        return Product.objects.published().order_by('-created_at')
+
+    # Допустимые варианты сортировки: параметр sort -> поля order_by
+    SORT_OPTIONS = {
+        'new': ('-created_at',),
+        'price': ('price', 'pk'),
+        '-price': ('-price', '-pk'),
+    }
+    CURRENCY_COOKIE_NAME = 'currency'
+    # Анонимным посетителям страница отдается из кэша отдельно для каждой выбранной валюты
+    page_cache_vary_cookies = (CURRENCY_COOKIE_NAME,)
+
+    def get(self, request, *args, **kwargs):
+        """
+        Запоминает выбранную валюту в cookie. Cookie устанавливается, только если валюта
+        изменилась: ответ с cookie относится к посетителю и не попадает в кэш страниц.
         """
-        return Product.objects.order_by('-created_at')
+        response = super().get(request, *args, **kwargs)
+        currency_code = request.GET.get('currency', '').upper()
+        current_code = request.COOKIES.get(self.CURRENCY_COOKIE_NAME)
+        if currency_code in get_rate_table().currencies and currency_code != current_code:
+            response.set_cookie(self.CURRENCY_COOKIE_NAME, currency_code, max_age=60 * 60 * 24 * 365, samesite='Lax')
+        return response
+
+    def get_currency(self):
+        """
+        Возвращает валюту из параметра currency, cookie или базовую валюту.
+        """
+        code = self.request.GET.get('currency') or self.request.COOKIES.get(self.CURRENCY_COOKIE_NAME)
+        return get_rate_table().get(code)
+
+    def get_filtered_queryset(self, currency, filter_form):
+        """
+        Применяет фильтр по цене в выбранной валюте и сортировку.
+        Границы цены переводятся в базовую валюту, поэтому фильтр и сортировка
+        выполняются по колонке price без пересчета каждой строки.
+        """
+        queryset = self.get_queryset()
+        if filter_form.is_valid():
+            min_price = filter_form.cleaned_data.get('min_price')
+            max_price = filter_form.cleaned_data.get('max_price')
+            # Границы сравниваются с ценами так, как они отображаются (с округлением валюты)
+            if min_price is not None:
+                lower = to_base_bound(min_price, currency, upper=False)
+                queryset = queryset.filter(price__gte=lower) if lower is not None else queryset.none()
+            if max_price is not None:
+                upper = to_base_bound(max_price, currency, upper=True)
+                queryset = queryset.filter(price__lte=upper) if upper is not None else queryset.none()
+            sort = filter_form.cleaned_data.get('sort')
+            if sort in self.SORT_OPTIONS:
+                queryset = queryset.order_by(*self.SORT_OPTIONS[sort])
+        return queryset
 
     def get_context_data(self, **kwargs):
         """
-        Добавляет в контекст пагинацию и заголовок страницы.
+        Добавляет в контекст пагинацию с ценами в выбранной валюте и заголовок страницы.
         """
         context = super().get_context_data(**kwargs)
-        
+        rate_table = get_rate_table()
+        currency = self.get_currency()
+        filter_form = PriceFilterForm(self.request.GET or None)
+
+        queryset = self.get_filtered_queryset(currency, filter_form)
+        if self.request.user.is_authenticated:
+            recently_viewed = get_products_in_order(get_recent_ids(self.request.user))
+            context['recently_viewed'] = recently_viewed
+            if not filter_form.is_valid() or not filter_form.cleaned_data.get('sort'):
+                queryset = self.boost_recent_categories(queryset, recently_viewed)
+
         # Ручная пагинация
-        paginator = Paginator(self.get_queryset(), 5) # 5 продуктов на страницу
+        paginator = Paginator(queryset, self.products_per_page)
         page_number = self.request.GET.get('page')
         page_obj = paginator.get_page(page_number)
-        
+        # Цены всей страницы пересчитываются одним проходом
+        page_obj.object_list = apply_prices(page_obj.object_list, currency, rate_table.version)
+
         context[self.context_object_name] = page_obj
+        context['currency'] = currency
+        context['currencies'] = rate_table.currencies.values()
+        context['filter_form'] = filter_form
+        context['trending'] = self.get_trending(self.trending_size)
         context['title'] = 'Skystore'
         return context
 
+    @staticmethod
+    def get_trending(limit):
+        """
+        Возвращает популярные продукты: id берутся из кэша, продукты загружаются одним запросом.
+        """
+        return get_products_in_order(get_trending_product_ids(limit))
+
+    @staticmethod
+    def boost_recent_categories(queryset, recently_viewed):
+        """
+        Поднимает в начало списка продукты из категорий, которые пользователь недавно смотрел.
+        Порядок задается в запросе (Case/When по category_id), поэтому пагинация учитывает его
+        на всех страницах; внутри групп сохраняется исходная сортировка.
+        """
+        categories = {product.category_id for product in recently_viewed}
+        if not categories:
+            return queryset
+        boost = Case(When(category_id__in=categories, then=Value(0)), default=Value(1), output_field=IntegerField())
+        return queryset.order_by(boost, *queryset.query.order_by)
+
 
 class ContactFormView(FormView):
     """
@@ -60,32 +181,78 @@ class ContactFormView(FormView):
         }
         return context
 
+    RATE_LIMIT_MESSAGE = 'Слишком много сообщений. Пожалуйста, попробуйте позже.'
+
+    def post(self, request, *args, **kwargs):
+        """
+        Отклоняет запросы с IP-адреса, превысившего лимит, еще до проверки формы.
+        """
+        if not feedback_by_ip.allow(get_client_ip(request)):
+            return self.rate_limited(self.get_form())
+        return super().post(request, *args, **kwargs)
+
     def form_valid(self, form):
         """
-        Сохраняет данные формы обратной связи.
+        Ставит сообщение в очередь на пакетную запись. Повторы одного и того же сообщения
+        не сохраняются, но для отправителя выглядят как успешная отправка.
         """
-        form.save()
+        phone = form.cleaned_data['phone']
+        # Лимит считается по цифрам номера: разные записи одного телефона попадают в одну корзину
+        if not feedback_by_phone.allow(normalize_phone(phone)):
+            return self.rate_limited(form)
+        if not is_duplicate_feedback(phone, form.cleaned_data['message']):
+            feedback = form.save(commit=False)
+            # Запись выполняется пакетами позже; дата получения — момент отправки сообщения
+            feedback.created_at = timezone.now()
+            feedback_writer.add(feedback)
         return super().form_valid(form)
 
+    def rate_limited(self, form):
+        form.add_error(None, self.RATE_LIMIT_MESSAGE)
+        response = self.form_invalid(form)
+        response.status_code = 429
+        return response
+
 
 class ProductDetailView(LoginRequiredMixin, DetailView):
     """
     Представление для детального просмотра продукта.
+    Снятые с публикации продукты недоступны (404), как и на витрине.
     """
-    model = Product
     template_name = 'catalog/product_detail.html'
     context_object_name = 'object'
 
+    def get_queryset(self):
+        """
+        Возвращает queryset опубликованных продуктов.
+        """
+        return Product.objects.published()
+
+    def get_object(self, queryset=None):
+        """
+        Регистрирует просмотр продукта для расчета популярных товаров
+        и добавляет продукт в список недавно просмотренных пользователем.
+        """
+        obj = super().get_object(queryset)
+        record_product_view(obj)
+        self.recent_ids = push_recent(self.request.user, obj.pk)
+        return obj
+
     def get_context_data(self, **kwargs):
         """
         Добавляет в контекст заголовок страницы.
         """
         context = super().get_context_data(**kwargs)
+        rate_table = get_rate_table()
+        currency = rate_table.get(self.request.COOKIES.get(ProductListView.CURRENCY_COOKIE_NAME))
+        apply_prices([self.object], currency, rate_table.version)
+        context['currency'] = currency
+        context['recently_viewed'] = get_products_in_order([pk for pk in self.recent_ids if pk != self.object.pk])
         context['title'] = f'Skystore - {self.object.name}'
         return context
 
 
-class ProductCreateView(LoginRequiredMixin, CreateView):
+class ProductCreateView(LoginRequiredMixin, ChunkedUploadViewMixin, CreateView):
     """
     Представление для создания нового продукта.
     """
@@ -103,7 +270,7 @@ class ProductCreateView(LoginRequiredMixin, CreateView):
         return context
 
 
-class ProductUpdateView(LoginRequiredMixin, UpdateView):
+class ProductUpdateView(LoginRequiredMixin, ChunkedUploadViewMixin, UpdateView):
     """
     Представление для редактирования продукта.
     """
@@ -140,4 +307,23 @@ class ProductDeleteView(LoginRequiredMixin, DeleteView):
         """
         context = super().get_context_data(**kwargs)
         context['title'] = f'Удалить {self.object.name}'
-        return context
\ No newline at end of file
+        return context
+
+
+class CategoryAutocompleteView(LoginRequiredMixin, View):
+    """
+    Поиск категорий по началу наименования для поля выбора категории в форме продукта.
+    Возвращает не более AUTOCOMPLETE_LIMIT результатов в формате {"results": [{"id", "text"}]}.
+    """
+    AUTOCOMPLETE_LIMIT = 20
+
+    def get(self, request):
+        term = request.GET.get('term', '').strip()
+        queryset = Category.objects.order_by('name')
+        if term:
+            queryset = queryset.filter(name__istartswith=term)
+        results = [
+            {'id': pk, 'text': name}
+            for pk, name in queryset.values_list('pk', 'name')[:self.AUTOCOMPLETE_LIMIT]
+        ]
+        return JsonResponse({'results': results})
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import ChangeEvent
+
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    """
+    Административная панель для просмотра журнала изменений (только чтение).
+    """
+    list_display = ('seq', 'action', 'model', 'object_id', 'created_at',)
+    list_filter = ('action', 'model',)
+    search_fields = ('object_id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
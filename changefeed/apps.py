@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class ChangefeedConfig(AppConfig):
+    """
+    Конфигурация приложения "Журнал изменений".
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'changefeed'
+    verbose_name = "Журнал изменений"
+
+    def ready(self):
+        # Подписка на сигналы сохранения и удаления отслеживаемых моделей
+        from .tracking import connect_tracked_models
+        connect_tracked_models()
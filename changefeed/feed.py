@@ -0,0 +1,88 @@
+"""
+Чтение, сжатие и очистка журнала изменений.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef
+from django.utils import timezone
+
+from .models import ChangeEvent, ChangefeedState
+
+# Номера событий выделяются при вставке, а видимыми становятся при фиксации транзакции,
+# поэтому событие с меньшим номером может появиться позже события с большим.
+# Потребителям отдаются только события старше SAFETY_LAG секунд, что должно превышать
+# длительность самой долгой транзакции, изменяющей отслеживаемые модели.
+SAFETY_LAG = getattr(settings, 'CHANGEFEED_SAFETY_LAG', 5)
+
+
+class CursorExpired(Exception):
+    """
+    Запрошенные события удалены по сроку хранения; требуется полная синхронизация.
+    """
+
+
+def get_changes(since=0, limit=None):
+    """
+    Возвращает queryset событий с номером больше since, упорядоченных по номеру.
+    Вызывает CursorExpired, если часть запрошенных событий уже удалена.
+    """
+    pruned_through = ChangefeedState.get().pruned_through
+    if since < pruned_through:
+        raise CursorExpired(f'События до #{pruned_through} включительно удалены.')
+    queryset = ChangeEvent.objects.filter(
+        seq__gt=since, created_at__lte=timezone.now() - timedelta(seconds=SAFETY_LAG)
+    ).order_by('seq')
+    return queryset[:limit] if limit else queryset
+
+
+def compact_changes(older_than_days, batch_size=10000):
+    """
+    Удаляет из событий старше older_than_days дней те, для которых есть более новое событие
+    того же объекта. Потребитель, читающий журнал после сжатия, получает последнее состояние
+    каждого объекта. Работает диапазонами номеров, чтобы не держать длинные блокировки.
+    Возвращает количество удаленных событий.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    bounds = ChangeEvent.objects.filter(created_at__lt=cutoff).aggregate(lower=Min('seq'), upper=Max('seq'))
+    if bounds['upper'] is None:
+        return 0
+    upper = bounds['upper']
+    newer = ChangeEvent.objects.filter(
+        model=OuterRef('model'), object_id=OuterRef('object_id'), seq__gt=OuterRef('seq'),
+    )
+    deleted_total = 0
+    # Обход начинается с наименьшего оставшегося номера, а не с нуля: стоимость не зависит от всей истории
+    start = bounds['lower'] - 1
+    while start < upper:
+        end = min(start + batch_size, upper)
+        with transaction.atomic():
+            deleted, _ = ChangeEvent.objects.filter(seq__gt=start, seq__lte=end).filter(Exists(newer)).delete()
+        deleted_total += deleted
+        start = end
+    return deleted_total
+
+
+def prune_changes(older_than_days, batch_size=10000):
+    """
+    Удаляет все события старше older_than_days дней и запоминает наибольший удаленный номер.
+    Возвращает количество удаленных событий.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted_total = 0
+    while True:
+        seqs = list(
+            ChangeEvent.objects.filter(created_at__lt=cutoff)
+            .order_by('seq').values_list('seq', flat=True)[:batch_size]
+        )
+        if not seqs:
+            return deleted_total
+        upper = seqs[-1]
+        with transaction.atomic():
+            deleted, _ = ChangeEvent.objects.filter(seq__lte=upper, created_at__lt=cutoff).delete()
+            state = ChangefeedState.get()
+            if upper > state.pruned_through:
+                state.pruned_through = upper
+                state.save(update_fields=['pruned_through'])
+        deleted_total += deleted
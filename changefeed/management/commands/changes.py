@@ -0,0 +1,31 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from changefeed.feed import CursorExpired, get_changes
+
+
+class Command(BaseCommand):
+    help = 'Prints change events after the given sequence number as NDJSON, optionally following new events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=int, default=0, help='Last processed sequence number.')
+        parser.add_argument('--limit', type=int, default=None, help='Maximum number of events per poll.')
+        parser.add_argument('--follow', action='store_true', help='Keep polling for new events.')
+        parser.add_argument('--interval', type=float, default=2.0, help='Polling interval in seconds for --follow.')
+
+    def handle(self, *args, **options):
+        since = options['since']
+        while True:
+            try:
+                events = get_changes(since, options['limit'])
+            except CursorExpired as exc:
+                raise CommandError(f'{exc} Full resync required.')
+            for event in events.iterator(chunk_size=1000):
+                self.stdout.write(json.dumps(event.as_dict(), cls=DjangoJSONEncoder, ensure_ascii=False))
+                since = event.seq
+            if not options['follow']:
+                break
+            time.sleep(options['interval'])
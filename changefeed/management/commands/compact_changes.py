@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from changefeed.feed import compact_changes, prune_changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacts the change log (keeps only the latest event per object among old events) '
+        'and deletes events past the retention period.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compact-after', type=int, default=1, help='Compact events older than N days.')
+        parser.add_argument('--retention', type=int, default=30, help='Delete all events older than N days.')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Events processed per transaction.')
+
+    def handle(self, *args, **options):
+        compacted = compact_changes(options['compact_after'], batch_size=options['batch_size'])
+        pruned = prune_changes(options['retention'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Compacted {compacted} event(s), pruned {pruned} event(s).'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:21
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangefeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pruned_through', models.BigIntegerField(default=0, verbose_name='Удалено до номера')),
+            ],
+            options={
+                'verbose_name': 'Состояние журнала изменений',
+                'verbose_name_plural': 'Состояние журнала изменений',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Номер события')),
+                ('model', models.CharField(max_length=100, verbose_name='Модель')),
+                ('object_id', models.CharField(max_length=64, verbose_name='Идентификатор объекта')),
+                ('action', models.CharField(choices=[('create', 'Создание'), ('update', 'Изменение'), ('delete', 'Удаление')], max_length=10, verbose_name='Действие')),
+                ('payload', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='Данные объекта')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата события')),
+            ],
+            options={
+                'verbose_name': 'Событие изменения',
+                'verbose_name_plural': 'Журнал изменений',
+                'indexes': [models.Index(fields=['model', 'object_id', 'seq'], name='changefeed_object_seq_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ChangeEvent(models.Model):
+    """
+    Модель для записи журнала изменений (transactional outbox).
+    Записи только добавляются; seq — монотонно растущий номер, по которому потребители
+    запрашивают изменения начиная с последнего обработанного события.
+    """
+    ACTION_CREATE = 'create'
+    ACTION_UPDATE = 'update'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [
+        (ACTION_CREATE, 'Создание'),
+        (ACTION_UPDATE, 'Изменение'),
+        (ACTION_DELETE, 'Удаление'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True, verbose_name='Номер события')
+    model = models.CharField(max_length=100, verbose_name='Модель')
+    object_id = models.CharField(max_length=64, verbose_name='Идентификатор объекта')
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name='Действие')
+    payload = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True, verbose_name='Данные объекта')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата события')
+
+    def __str__(self):
+        return f'#{self.seq} {self.action} {self.model}:{self.object_id}'
+
+    def as_dict(self):
+        return {
+            'seq': self.seq,
+            'model': self.model,
+            'id': self.object_id,
+            'action': self.action,
+            'payload': self.payload,
+            'created_at': self.created_at,
+        }
+
+    class Meta:
+        verbose_name = 'Событие изменения'
+        verbose_name_plural = 'Журнал изменений'
+        indexes = [
+            # Для сжатия журнала: поиск более нового события того же объекта
+            models.Index(fields=['model', 'object_id', 'seq'], name='changefeed_object_seq_idx'),
+        ]
+
+
+class ChangefeedState(models.Model):
+    """
+    Модель для хранения состояния журнала (единственная запись).
+    pruned_through — наибольший номер события, удаленного по сроку хранения:
+    потребители, отставшие сильнее, должны выполнить полную синхронизацию.
+    """
+    pruned_through = models.BigIntegerField(default=0, verbose_name='Удалено до номера')
+
+    def __str__(self):
+        return f'Удалено до #{self.pruned_through}'
+
+    @classmethod
+    def get(cls):
+        state, _ = cls.objects.get_or_create(pk=1)
+        return state
+
+    class Meta:
+        verbose_name = 'Состояние журнала изменений'
+        verbose_name_plural = 'Состояние журнала изменений'
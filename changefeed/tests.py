@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import TestCase
+
+from blog.models import Blog
+from catalog.archive import archive_products, restore_products
+from catalog.inventory import adjust_stock, decrement_stock, increment_stock, reserve_stock
+from catalog.models import Category, Product, ProductArchive
+
+from .models import ChangeEvent
+
+
+def last_event(instance):
+    return ChangeEvent.objects.filter(
+        model=instance._meta.label_lower, object_id=str(instance.pk),
+    ).order_by('seq').last()
+
+
+def event_count(instance):
+    return ChangeEvent.objects.filter(model=instance._meta.label_lower, object_id=str(instance.pk)).count()
+
+
+class StockChangeEventTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='Категория', description='')
+        self.product = Product.objects.create(name='Товар', description='', category=category, price=100, stock=5)
+
+    def assertLastStock(self, stock):
+        event = last_event(self.product)
+        self.assertEqual(event.action, ChangeEvent.ACTION_UPDATE)
+        self.assertEqual(event.payload['stock'], stock)
+
+    def test_decrement_and_increment_record_events(self):
+        decrement_stock(self.product.pk, 2)
+        self.assertLastStock(3)
+        increment_stock(self.product.pk, 1)
+        self.assertLastStock(4)
+
+    def test_reservation_records_event(self):
+        reserve_stock(self.product.pk, 2, token='cart:a')
+        self.assertLastStock(3)
+
+    def test_adjust_stock_records_only_changed_products(self):
+        before = event_count(self.product)
+        self.assertEqual(adjust_stock([self.product.pk], -6), 0)
+        self.assertEqual(event_count(self.product), before)
+        self.assertEqual(adjust_stock([self.product.pk], 2), 1)
+        self.assertLastStock(7)
+
+    def test_save_records_current_stock(self):
+        product = Product.objects.get(pk=self.product.pk)
+        reserve_stock(product.pk, 2, token='other')
+        product.name = 'Новое название'
+        product.save()
+        self.assertLastStock(3)
+
+
+class BulkChangeEventTests(TestCase):
+
+    def test_restore_records_original_created_at(self):
+        category = Category.objects.create(name='Категория', description='')
+        product = Product.objects.create(name='Товар', description='', category=category, price=100)
+        created_at = Product.objects.values_list('created_at', flat=True).get(pk=product.pk)
+        archive_products(Product.objects.filter(pk=product.pk))
+        restore_products(ProductArchive.objects.all())
+        event = last_event(product)
+        self.assertEqual(event.action, ChangeEvent.ACTION_UPDATE)
+        self.assertEqual(Product.objects.get(pk=product.pk).created_at, created_at)
+        self.assertEqual(event.payload['created_at'], DjangoJSONEncoder().default(created_at))
+
+    def test_rerender_blog_records_events(self):
+        post = Blog.objects.create(title='Статья', content='Текст')
+        before = event_count(post)
+        call_command('rerender_blog', '--all', stdout=StringIO())
+        self.assertEqual(event_count(post), before + 1)
+        self.assertEqual(last_event(post).action, ChangeEvent.ACTION_UPDATE)
@@ -0,0 +1,85 @@
+"""
+Запись изменений отслеживаемых моделей в журнал ChangeEvent.
+
+События записываются обработчиками сигналов post_save/post_delete. Чтобы событие
+попадало в ту же транзакцию, что и само изменение, отслеживаемые модели наследуют
+ChangeTrackedMixin (сохранение в transaction.atomic); удаление Django и так выполняет
+в транзакции, а команда fill загружает фикстуры внутри transaction.atomic.
+
+Массовые операции QuerySet.update() и bulk_update() сигналов не отправляют: код, который
+изменяет ими отслеживаемые модели (остатки в catalog.inventory, rerender_blog, восстановление
+продуктов из архива), записывает события явно через record_updates() в той же транзакции.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import ChangeEvent
+
+TRACKED_MODELS = getattr(settings, 'CHANGEFEED_MODELS', [])
+
+
+class ChangeTrackedMixin:
+    """
+    Примесь для моделей, изменения которых записываются в журнал.
+    Сохранение объекта и запись события выполняются в одной транзакции.
+    """
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
+
+def serialize_instance(instance):
+    """
+    Возвращает значения полей объекта в виде словаря, пригодного для JSON.
+    """
+    return serializers.serialize('python', [instance])[0]['fields']
+
+
+def record_change(sender, instance, action, using):
+    ChangeEvent.objects.using(using).create(
+        model=sender._meta.label_lower,
+        object_id=str(instance.pk),
+        action=action,
+        payload=None if action == ChangeEvent.ACTION_DELETE else serialize_instance(instance),
+    )
+
+
+def record_updates(model, pks, using=None):
+    """
+    Записывает события изменения объектов model с id из pks, обновленных массовой операцией.
+    Вызывается в транзакции обновления; в событие попадает текущее состояние строки.
+    """
+    if model._meta.label not in TRACKED_MODELS or not pks:
+        return
+    using = using or router.db_for_write(model)
+    label = model._meta.label_lower
+    ChangeEvent.objects.using(using).bulk_create([
+        ChangeEvent(
+            model=label, object_id=str(instance.pk), action=ChangeEvent.ACTION_UPDATE,
+            payload=serialize_instance(instance),
+        )
+        for instance in model._base_manager.using(using).filter(pk__in=pks).order_by('pk')
+    ])
+
+
+def on_save(sender, instance, created, using, **kwargs):
+    action = ChangeEvent.ACTION_CREATE if created else ChangeEvent.ACTION_UPDATE
+    record_change(sender, instance, action, using)
+
+
+def on_delete(sender, instance, using, **kwargs):
+    record_change(sender, instance, ChangeEvent.ACTION_DELETE, using)
+
+
+def connect_tracked_models():
+    """
+    Подключает обработчики сигналов к моделям из настройки CHANGEFEED_MODELS.
+    """
+    for label in TRACKED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(on_save, sender=model, dispatch_uid=f'changefeed_save_{label}')
+        post_delete.connect(on_delete, sender=model, dispatch_uid=f'changefeed_delete_{label}')
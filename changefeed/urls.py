@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import ChangesView
+
+app_name = 'changefeed'
+
+urlpatterns = [
+    path('', ChangesView.as_view(), name='changes'),
+]
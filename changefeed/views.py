@@ -0,0 +1,51 @@
+import hmac
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from .feed import CursorExpired, get_changes
+
+CHANGEFEED_TOKEN = getattr(settings, 'CHANGEFEED_TOKEN', '')
+MAX_LIMIT = 10000
+
+
+def has_feed_access(request):
+    """
+    Доступ к журналу есть у сотрудников и у сервисов, передающих токен CHANGEFEED_TOKEN
+    в заголовке "Authorization: Bearer <токен>".
+    """
+    header = request.headers.get('Authorization', '')
+    if CHANGEFEED_TOKEN and header.startswith('Bearer '):
+        return hmac.compare_digest(header[len('Bearer '):], CHANGEFEED_TOKEN)
+    return request.user.is_authenticated and request.user.is_staff
+
+
+class ChangesView(View):
+    """
+    Потоковая выдача журнала изменений в формате NDJSON (одно событие на строку).
+    Параметры: since — номер последнего обработанного события, limit — максимум событий.
+    """
+
+    def get(self, request):
+        if not has_feed_access(request):
+            return HttpResponseForbidden()
+        try:
+            since = int(request.GET.get('since', 0))
+            limit = min(int(request.GET.get('limit', MAX_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            return JsonResponse({'error': 'since и limit должны быть целыми числами.'}, status=400)
+
+        try:
+            events = get_changes(since, limit)
+        except CursorExpired as exc:
+            # 410 Gone: потребитель должен выполнить полную синхронизацию
+            return JsonResponse({'error': str(exc)}, status=410)
+
+        lines = (
+            json.dumps(event.as_dict(), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for event in events.iterator(chunk_size=1000)
+        )
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson; charset=utf-8')
@@ -9,9 +9,12 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-g&7jt_m8&@w^!x(+cd^r12whi1#h3vh&(4l1&43mz7&2y^exz!')
 
-DEBUG = True
+# Режим отладки управляется переменной окружения и по умолчанию выключен.
+# Для разработки задайте DEBUG=True (см. .env.template).
+DEBUG = os.getenv('DEBUG', 'False').lower() in ('true', '1', 'yes')
 
-ALLOWED_HOSTS = []
+# Список допустимых хостов через запятую, например: ALLOWED_HOSTS=skystore.ru,www.skystore.ru
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('ALLOWED_HOSTS', '').split(',') if host.strip()]
 
 
 # Список установленных приложений Django.
@@ -26,9 +29,18 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'catalog.apps.CatalogConfig', # Приложение каталога товаров
     'blog.apps.BlogConfig',       # Приложение блога
+    'cart.apps.CartConfig',       # Приложение корзины
+    'changefeed.apps.ChangefeedConfig',  # Журнал изменений каталога и блога
+    'analytics.apps.AnalyticsConfig',    # Статистика просмотров продуктов
+    'uploads.apps.UploadsConfig',        # Поблочная загрузка изображений
+    'metrics.apps.MetricsConfig',        # Метрики в формате Prometheus
+    'pagecache.apps.PagecacheConfig',    # Кэш публичных страниц для анонимных посетителей
+    'pagecompress.apps.PagecompressConfig',  # Минификация HTML и сжатие ответов
 ]
 
 MIDDLEWARE = [
+    'metrics.middleware.MetricsMiddleware',  # первым: учитывает время всех остальных слоев
+    'pagecompress.middleware.CompressionMiddleware',  # до слоев, которые читают содержимое ответа
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -36,6 +48,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'cart.middleware.CartCookieMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -46,10 +59,14 @@ TEMPLATES = [
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
+            # Загрузчики не задаются: Django по умолчанию использует кэширующий загрузчик
+            # (каждый шаблон компилируется один раз на процесс; при DEBUG=True кэш сбрасывается
+            # при изменении файлов шаблонов)
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'cart.context_processors.cart',
             ],
         },
     },
@@ -57,6 +74,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Предварительная компиляция всех шаблонов при старте WSGI/ASGI-процесса (см. catalog.template_cache).
+TEMPLATE_WARMUP = os.getenv('TEMPLATE_WARMUP', str(not DEBUG)).lower() in ('true', '1', 'yes')
+
 # Настройки базы данных. Проект настроен на использование PostgreSQL.
 DATABASES = {
     'default': {
@@ -69,6 +89,105 @@ DATABASES = {
     }
 }
 
+# Таймаут ожидания соединения с PostgreSQL. Превышение таймаута вызывает OperationalError,
+# и кэш страниц (pagecache) отдает сохраненные копии.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['OPTIONS'] = {'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))}
+# Ограничение времени выполнения запроса (в миллисекундах) при отрисовке страниц для кэша (pagecache).
+# Задается только для этих отрисовок: миграции и команды управления выполняются без ограничения.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS')) if os.getenv('DB_STATEMENT_TIMEOUT_MS') else None
+
+# Настройки кэша. Корзины и другие горячие данные хранятся в кэше, поэтому в продакшене
+# следует использовать общий для всех процессов бэкенд, например:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        # Обертка считает попадания и промахи для метрик; настоящий бэкенд — OPTIONS['BACKEND']
+        'BACKEND': 'metrics.cache.InstrumentedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'skystore'),
+        'OPTIONS': {
+            'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        },
+    }
+}
+
+# Метрики (/metrics): каталог файлов значений рабочих процессов (пусто — только текущий процесс;
+# очищать при перезапуске) и адреса/подсети, которым доступен /metrics без входа сотрудника.
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1').split(',') if ip.strip()]
+
+# Время жизни корзины в кэше (в секундах) и ограничения на ее размер.
+CART_TIMEOUT = 60 * 60 * 24 * 14
+CART_MAX_LINES = 100
+CART_MAX_QUANTITY = 99
+
+# Журнал изменений: отслеживаемые модели, токен доступа для внешних сервисов
+# и задержка (в секундах), после которой событие отдается потребителям.
+CHANGEFEED_MODELS = ['catalog.Product', 'catalog.Category', 'blog.Blog']
+CHANGEFEED_TOKEN = os.getenv('CHANGEFEED_TOKEN', '')
+CHANGEFEED_SAFETY_LAG = 5
+
+# Количество строк, начиная с которого списки админ-панели используют оценку планировщика вместо COUNT(*).
+ESTIMATED_COUNT_THRESHOLD = 10000
+# Максимальное число категорий, при котором форма продукта показывает полный список из кэша.
+CATEGORY_CHOICES_LIMIT = 500
+
+# Время (в секундах), через которое резерв товаров незавершенного заказа возвращается на склад
+STOCK_RESERVATION_TTL = 15 * 60
+
+# Статистика просмотров: размер буфера событий в процессе, максимальная задержка записи (в секундах),
+# размер списка популярных товаров и окно его расчета (в часах).
+ANALYTICS_BUFFER_SIZE = 100
+ANALYTICS_FLUSH_INTERVAL = 5.0
+ANALYTICS_TRENDING_SIZE = 10
+ANALYTICS_TRENDING_WINDOW_HOURS = 24
+# Интервал запуска rollup_views по расписанию (в секундах): список популярных товаров хранится в кэше
+# два интервала. Кэш должен быть общим для команды и веб-процессов (см. CACHE_BACKEND).
+ANALYTICS_ROLLUP_INTERVAL = 10 * 60
+# Длина списка недавно просмотренных продуктов пользователя
+ANALYTICS_RECENT_SIZE = 8
+
+# Кэш страниц для анонимных посетителей (pagecache): копия страницы свежая PAGE_CACHE_FRESH_SECONDS
+# секунд, после чего обновляется в фоне, а устаревшая копия отдается до PAGE_CACHE_STALE_SECONDS.
+# После failure_threshold ошибок базы данных подряд обновления приостанавливаются на reset_timeout секунд.
+PAGE_CACHE_FRESH_SECONDS = 30
+PAGE_CACHE_STALE_SECONDS = 60 * 60 * 24
+PAGE_CACHE_BREAKER = {'failure_threshold': 3, 'reset_timeout': 30}
+# Параметры запроса, от которых зависит содержимое кэшируемых страниц; остальные отбрасываются
+PAGE_CACHE_QUERY_PARAMS = ('page', 'sort', 'min_price', 'max_price', 'currency')
+# Максимальная задержка записи накопленных просмотров статей (в секундах)
+BLOG_VIEWS_FLUSH_INTERVAL = 5.0
+
+# Ответы (pagecompress): удаление лишних пробелов из HTML и сжатие по Accept-Encoding.
+# Brotli используется, если установлен пакет brotli (pip install brotli), иначе gzip.
+HTML_MINIFY = True
+RESPONSE_COMPRESSION = {'gzip_level': 6, 'brotli_quality': 5, 'max_random_bytes': 100}
+
+# Форма обратной связи: не более capacity сообщений за per_seconds секунд с одного IP-адреса
+# и с одного телефона, окно распознавания повторных сообщений (в секундах) и пакетная запись.
+FEEDBACK_RATE_LIMIT = {'capacity': 5, 'per_seconds': 600}
+FEEDBACK_DUPLICATE_WINDOW = 60 * 60 * 24
+FEEDBACK_BUFFER_SIZE = 20
+FEEDBACK_FLUSH_INTERVAL = 2.0
+# Учитывать заголовок X-Forwarded-For при определении IP-адреса клиента (только за доверенным прокси)
+# и число доверенных прокси перед приложением: адрес клиента берется N-м с конца заголовка.
+USE_X_FORWARDED_FOR = os.getenv('USE_X_FORWARDED_FOR', 'False').lower() in ('true', '1', 'yes')
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '1'))
+
+# Хеширование паролей: PBKDF2 с настраиваемым числом итераций (подбирается командой bench_login,
+# не меньше users.hashers.MIN_PASSWORD_HASH_ITERATIONS).
+# Остальные хешеры Django оставлены для проверки паролей, сохраненных ранее.
+PASSWORD_HASH_ITERATIONS = (
+    int(os.getenv('PASSWORD_HASH_ITERATIONS')) if os.getenv('PASSWORD_HASH_ITERATIONS') else None
+)
+PASSWORD_HASHERS = [
+    'users.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -100,11 +219,37 @@ STATIC_URL = 'static/'
 # Абсолютный путь к каталогу, где collectstatic будет собирать статические файлы для развертывания.
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Файл с курсами валют для отображения цен (перечитывается при изменении).
+CURRENCY_RATES_FILE = os.getenv(
+    'CURRENCY_RATES_FILE', os.path.join(BASE_DIR, 'catalog', 'data', 'currency_rates.json'),
+)
+
+# Каталог статических копий публичных страниц (команда render_static_site).
+STATIC_SITE_ROOT = os.getenv('STATIC_SITE_ROOT', os.path.join(BASE_DIR, 'static_site'))
+
 # URL, по которому обслуживаются медиа-файлы (загруженные пользователем).
 MEDIA_URL = '/media/'
 # Абсолютный путь к каталогу, где будут храниться загруженные медиа-файлы.
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Поблочная загрузка изображений: каталог незавершенных загрузок (желательно на той же файловой
+# системе, что и MEDIA_ROOT, чтобы готовый файл перемещался без копирования), размер блока
+# и ограничение числа новых загрузок с одного IP-адреса.
+UPLOAD_TEMP_DIR = os.getenv('UPLOAD_TEMP_DIR', os.path.join(BASE_DIR, 'upload_tmp'))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_RATE_LIMIT = {'capacity': 20, 'per_seconds': 3600}
+
+# Отдача медиа-файлов (uploads.views.MediaView). MEDIA_SENDFILE: пусто — FileResponse,
+# 'x-accel-redirect' — nginx (internal-location MEDIA_ACCEL_PREFIX с alias на MEDIA_ROOT),
+# 'x-sendfile' — Apache/lighttpd. MEDIA_ACCESS_HOOKS — проверки доступа по префиксу пути.
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+MEDIA_ACCESS_HOOKS = {
+    'products/': 'catalog.media_access.product_image_access',
+    'blog/': 'blog.media_access.blog_preview_access',
+}
+
 AUTH_USER_MODEL = 'users.User'
 
 # Настройки для отправки писем
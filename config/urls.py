@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from uploads.views import MediaView
 
 
 urlpatterns = [
@@ -25,8 +25,10 @@ urlpatterns = [
     path('', include('catalog.urls')), # Включение URL-маршрутов приложения каталога
     path('blogs/', include('blog.urls')), # Включение URL-маршрутов приложения блога
     path('users/', include('users.urls', namespace='users')), # Включение URL-маршрутов приложения пользователей
+    path('cart/', include('cart.urls')), # Включение URL-маршрутов приложения корзины
+    path('changes/', include('changefeed.urls')), # Потоковая выдача журнала изменений
+    path('uploads/', include('uploads.urls')), # Поблочная загрузка изображений
+    path('metrics', include('metrics.urls')), # Метрики в формате Prometheus
+    # Медиа-файлы: проверка доступа и условные запросы в Django, отдача файла — через sendfile
+    path(f'{settings.MEDIA_URL.strip("/")}/<path:path>', MediaView.as_view(), name='media'),
 ]
-
-# Добавление маршрутов для медиа-файлов в режиме отладки
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Компиляция шаблонов при старте процесса, чтобы первые запросы не платили за разбор файлов.
+if settings.TEMPLATE_WARMUP:
+    from catalog.template_cache import warm_templates
+
+    warm_templates()
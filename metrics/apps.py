@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class MetricsConfig(AppConfig):
+    """
+    Конфигурация приложения "Метрики".
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'metrics'
+    verbose_name = "Метрики"
+
+    def ready(self):
+        # Подсчет запросов к базе данных на каждом новом соединении
+        from .collectors import connect_database_metrics
+        connect_database_metrics()
@@ -0,0 +1,42 @@
+from django.utils.module_loading import import_string
+
+from .collectors import cache_requests
+
+_missing = object()
+
+
+class InstrumentedCache:
+    """
+    Обертка над бэкендом кэша, считающая попадания и промахи get() и get_many().
+    Настоящий бэкенд задается в OPTIONS['BACKEND'], остальные OPTIONS передаются ему.
+    Остальные методы вызываются у настоящего бэкенда без изменений.
+    """
+
+    def __init__(self, location, params):
+        options = dict(params.get('OPTIONS') or {})
+        backend_class = import_string(options.pop('BACKEND'))
+        self._cache = backend_class(location, {**params, 'OPTIONS': options})
+        self._name = backend_class.__name__
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def get(self, key, default=None, version=None):
+        value = self._cache.get(key, _missing, version=version)
+        if value is _missing:
+            cache_requests.inc(cache=self._name, result='miss')
+            return default
+        cache_requests.inc(cache=self._name, result='hit')
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self._cache.get_many(keys, version=version)
+        if found:
+            cache_requests.inc(len(found), cache=self._name, result='hit')
+        if len(keys) > len(found):
+            cache_requests.inc(len(keys) - len(found), cache=self._name, result='miss')
+        return found
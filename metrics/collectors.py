@@ -0,0 +1,48 @@
+"""
+Метрики приложения и их сбор.
+"""
+import time
+
+from django.db.backends.signals import connection_created
+
+from .registry import Counter, Histogram
+
+http_requests = Counter(
+    'http_requests', 'HTTP requests by URL name, method and status code.', ('view', 'method', 'status'),
+)
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'HTTP request processing time by URL name.', ('view',),
+)
+db_queries = Counter('db_queries', 'Database queries executed.', ('alias',))
+db_query_duration = Histogram(
+    'db_query_duration_seconds', 'Database query execution time.', ('alias',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+cache_requests = Counter('cache_requests', 'Cache lookups by backend and result (hit or miss).', ('cache', 'result'))
+email_send_duration = Histogram('email_send_duration_seconds', 'Time spent in send_mail.', ('result',))
+
+
+class QueryMetrics:
+    """
+    Обертка выполнения запросов (connection.execute_wrapper): количество и время запросов.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            db_queries.inc(alias=self.alias)
+            db_query_duration.observe(time.perf_counter() - started, alias=self.alias)
+
+
+def on_connection_created(sender, connection, **kwargs):
+    if not any(isinstance(wrapper, QueryMetrics) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryMetrics(connection.alias))
+
+
+def connect_database_metrics():
+    connection_created.connect(on_connection_created, dispatch_uid='metrics_connection_created')
@@ -0,0 +1,27 @@
+import time
+
+from .collectors import http_request_duration, http_requests
+
+# Метод запроса задает клиент; произвольные методы учитываются под одной меткой, чтобы
+# не создавать новый временной ряд на каждое значение
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'})
+
+
+class MetricsMiddleware:
+    """
+    Считает запросы и время их обработки по имени URL (например, catalog:home).
+    Должен стоять первым в MIDDLEWARE, чтобы учитывать время всех остальных промежуточных слоев.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        http_request_duration.observe(time.perf_counter() - started, view=view)
+        method = request.method if request.method in HTTP_METHODS else 'other'
+        http_requests.inc(view=view, method=method, status=str(response.status_code))
+        return response
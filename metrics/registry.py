@@ -0,0 +1,149 @@
+"""
+Счетчики и гистограммы в текстовом формате Prometheus.
+
+Значение метрики хранится под ключом — JSON-списком [имя образца, [[метка, значение], ...]],
+поэтому значения разных процессов складываются простым суммированием по ключу.
+Гистограмма хранит количество наблюдений в каждом интервале (не накопительно),
+сумму и количество; накопительные значения *_bucket вычисляются при выводе.
+"""
+import bisect
+import json
+import math
+import time
+from contextlib import contextmanager
+
+from .store import collect_values, get_values
+
+REGISTRY = {}
+
+
+def make_key(sample, labels):
+    return json.dumps([sample, sorted(labels.items())], ensure_ascii=False)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    @property
+    def family(self):
+        """
+        Имя метрики в строках HELP и TYPE.
+        """
+        return self.name
+
+    def check_labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'Метрика {self.name} ожидает метки {self.labelnames}, получены {tuple(labels)}.')
+
+
+class Counter(Metric):
+    """
+    Монотонно растущий счетчик.
+    """
+    kind = 'counter'
+
+    @property
+    def family(self):
+        return f'{self.name}_total'
+
+    def inc(self, amount=1, **labels):
+        self.check_labels(labels)
+        get_values().add(make_key(f'{self.name}_total', labels), amount)
+
+    def render(self, samples):
+        for (sample, labels), value in sorted(samples.items()):
+            yield f'{sample}{format_labels(labels)} {format_value(value)}'
+
+
+class Histogram(Metric):
+    """
+    Распределение наблюдений по интервалам (например, длительности в секундах).
+    """
+    kind = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        self.check_labels(labels)
+        values = get_values()
+        upper = self.buckets[bisect.bisect_left(self.buckets, value)]
+        values.add(make_key(f'{self.name}_bucket', {**labels, 'le': format_value(upper)}), 1)
+        values.add(make_key(f'{self.name}_sum', labels), value)
+        values.add(make_key(f'{self.name}_count', labels), 1)
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Измеряет длительность блока with в секундах.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self, samples):
+        groups = {}
+        for (sample, labels), value in samples.items():
+            base = tuple(item for item in labels if item[0] != 'le')
+            group = groups.setdefault(base, {'buckets': {}, 'sum': 0.0, 'count': 0.0})
+            if sample.endswith('_bucket'):
+                group['buckets'][dict(labels)['le']] = value
+            elif sample.endswith('_sum'):
+                group['sum'] = value
+            else:
+                group['count'] = value
+        for base, group in sorted(groups.items()):
+            cumulative = 0.0
+            for upper in self.buckets:
+                cumulative += group['buckets'].get(format_value(upper), 0.0)
+                labels = (*base, ('le', format_value(upper)))
+                yield f'{self.name}_bucket{format_labels(labels)} {format_value(cumulative)}'
+            yield f'{self.name}_sum{format_labels(base)} {format_value(group["sum"])}'
+            yield f'{self.name}_count{format_labels(base)} {format_value(group["count"])}'
+
+
+def generate_text():
+    """
+    Возвращает значения всех зарегистрированных метрик в текстовом формате Prometheus.
+    """
+    by_metric = {}
+    for key, value in collect_values().items():
+        sample, labels = json.loads(key)
+        labels = tuple(tuple(item) for item in labels)
+        for suffix in ('_total', '_bucket', '_sum', '_count'):
+            if sample.endswith(suffix) and sample[:-len(suffix)] in REGISTRY:
+                by_metric.setdefault(sample[:-len(suffix)], {})[(sample, labels)] = value
+                break
+
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f'# HELP {metric.family} {metric.documentation}')
+        lines.append(f'# TYPE {metric.family} {metric.kind}')
+        lines.extend(metric.render(by_metric.get(name, {})))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,166 @@
+"""
+Хранилище значений метрик процесса.
+
+Без настройки METRICS_DIR значения хранятся в словаре процесса. Если METRICS_DIR задан
+(несколько рабочих процессов gunicorn/uwsgi), каждый процесс пишет значения в свой файл
+<pid>.db в этом каталоге через mmap, а /metrics суммирует файлы всех процессов.
+Файлы завершившихся процессов сохраняются, чтобы счетчики не уменьшались;
+каталог нужно очищать при перезапуске приложения.
+
+Формат файла: 8 байт — занятый размер, затем записи
+[длина ключа: int32][ключ UTF-8, дополненный до кратного 8][значение: double].
+
+Значения изменяются без блокировок: файл процесса пишет только сам процесс, а при
+одновременном изменении одного значения из нескольких потоков возможна потеря
+отдельного приращения, что для метрик допустимо. Блокировка нужна только при
+добавлении нового ключа (изменение размера файла). При увеличении файла создается новое
+отображение, а старое не закрывается: потоки, которые пишут через него в этот момент,
+изменяют те же страницы файла, а память освобождается, когда на него не останется ссылок.
+"""
+import glob
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+METRICS_DIR = getattr(settings, 'METRICS_DIR', '')
+INITIAL_SIZE = 64 * 1024
+
+_header = struct.Struct('i')
+_value = struct.Struct('d')
+
+
+def _padded(encoded):
+    return encoded + b' ' * (8 - (len(encoded) + _header.size) % 8)
+
+
+def read_entries(data):
+    """
+    Разбирает содержимое файла значений. Возвращает список (ключ, значение).
+    """
+    used = _header.unpack_from(data, 0)[0] if len(data) >= 8 else 0
+    position = 8
+    entries = []
+    while position < used:
+        length = _header.unpack_from(data, position)[0]
+        position += _header.size
+        key = data[position:position + length].decode()
+        position += len(_padded(b'x' * length))
+        value = _value.unpack_from(data, position)[0]
+        position += _value.size
+        entries.append((key, value))
+    return entries
+
+
+class MemoryValues:
+    """
+    Значения метрик в памяти процесса.
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    def add(self, key, amount):
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def items(self):
+        return list(self._values.items())
+
+
+class MmapValues:
+    """
+    Значения метрик процесса в файле, отображенном в память.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(INITIAL_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._positions = {}
+        used = _header.unpack_from(self._map, 0)[0]
+        self._used = used or 8
+        if not used:
+            _header.pack_into(self._map, 0, self._used)
+        position = 8
+        for key, _value_ in read_entries(self._map[:used] if used else b''):
+            encoded = key.encode()
+            position += _header.size + len(_padded(encoded))
+            self._positions[key] = position
+            position += _value.size
+
+    def _create(self, key):
+        with self._lock:
+            if key in self._positions:
+                return self._positions[key]
+            encoded = key.encode()
+            entry = _header.pack(len(encoded)) + _padded(encoded) + _value.pack(0.0)
+            while self._used + len(entry) > self._capacity:
+                self._capacity *= 2
+                self._file.truncate(self._capacity)
+                self._map = mmap.mmap(self._file.fileno(), self._capacity)
+            self._map[self._used:self._used + len(entry)] = entry
+            position = self._used + len(entry) - _value.size
+            self._used += len(entry)
+            # Размер обновляется после записи, чтобы читатель не увидел неполную запись
+            _header.pack_into(self._map, 0, self._used)
+            self._positions[key] = position
+            return position
+
+    def add(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._create(key)
+        # Отображение берется один раз и после получения позиции: оно только растет
+        values = self._map
+        current = _value.unpack_from(values, position)[0]
+        _value.pack_into(values, position, current + amount)
+
+    def items(self):
+        return read_entries(self._map[:self._used])
+
+
+_store = {'pid': None, 'values': None}
+_store_lock = threading.Lock()
+
+
+def get_values():
+    """
+    Возвращает хранилище значений текущего процесса. После fork (например, gunicorn --preload)
+    дочерний процесс создает собственное хранилище. Создание выполняется под блокировкой:
+    иначе потоки, одновременно начавшие первый запрос, получили бы разные хранилища,
+    и значения, записанные в лишнее, пропали бы.
+    """
+    pid = os.getpid()
+    if _store['pid'] != pid:
+        with _store_lock:
+            if _store['pid'] != pid:
+                if METRICS_DIR:
+                    os.makedirs(METRICS_DIR, exist_ok=True)
+                    _store['values'] = MmapValues(os.path.join(METRICS_DIR, f'{pid}.db'))
+                else:
+                    _store['values'] = MemoryValues()
+                _store['pid'] = pid
+    return _store['values']
+
+
+def collect_values():
+    """
+    Возвращает сумму значений всех процессов (или значения текущего процесса без METRICS_DIR).
+    """
+    if not METRICS_DIR:
+        return dict(get_values().items())
+    totals = {}
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.db')):
+        try:
+            with open(path, 'rb') as values_file:
+                entries = read_entries(values_file.read())
+        except OSError:
+            continue
+        for key, value in entries:
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
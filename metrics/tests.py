@@ -0,0 +1,143 @@
+import ipaddress
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from users.models import User
+
+from . import store
+from .registry import REGISTRY, Counter, Histogram, generate_text
+from .store import MemoryValues, MmapValues, get_values, read_entries
+
+
+class FreshStoreMixin:
+
+    def setUp(self):
+        super().setUp()
+        store_patch = mock.patch.dict(store._store, {'pid': None, 'values': None})
+        store_patch.start()
+        self.addCleanup(store_patch.stop)
+
+
+class ExpositionTests(FreshStoreMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.counter = Counter('test_events', 'Test events.', ('kind',))
+        self.histogram = Histogram('test_duration_seconds', 'Test duration.', buckets=(0.1, 1.0))
+        self.addCleanup(REGISTRY.pop, 'test_events')
+        self.addCleanup(REGISTRY.pop, 'test_duration_seconds')
+
+    def test_counter_and_histogram_text(self):
+        self.counter.inc(kind='a "quoted"')
+        self.counter.inc(2, kind='a "quoted"')
+        for value in (0.05, 0.5, 5):
+            self.histogram.observe(value)
+        text = generate_text()
+        self.assertIn('# TYPE test_events_total counter\n', text)
+        self.assertIn('test_events_total{kind="a \\"quoted\\""} 3.0\n', text)
+        self.assertIn('# TYPE test_duration_seconds histogram\n', text)
+        self.assertIn('test_duration_seconds_bucket{le="0.1"} 1.0\n', text)
+        self.assertIn('test_duration_seconds_bucket{le="1.0"} 2.0\n', text)
+        self.assertIn('test_duration_seconds_bucket{le="+Inf"} 3.0\n', text)
+        self.assertIn('test_duration_seconds_count 3.0\n', text)
+
+    def test_wrong_labels_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.counter.inc(other='x')
+
+
+class StoreTests(FreshStoreMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_mmap_values_grow_and_survive_reopen(self):
+        path = os.path.join(self.directory, 'values.db')
+        values = MmapValues(path)
+        keys = [f'key-{number}-' + 'x' * 100 for number in range(1000)]
+        for key in keys:
+            values.add(key, 1)
+        values.add(keys[0], 2.5)
+        reopened = MmapValues(path)
+        reopened.add(keys[1], 1)
+        with open(path, 'rb') as values_file:
+            entries = dict(read_entries(values_file.read()))
+        self.assertEqual(len(entries), len(keys))
+        self.assertEqual(entries[keys[0]], 3.5)
+        self.assertEqual(entries[keys[1]], 2.0)
+
+    def test_values_of_processes_are_summed(self):
+        MmapValues(os.path.join(self.directory, '1.db')).add('key', 2)
+        MmapValues(os.path.join(self.directory, '2.db')).add('key', 3)
+        with mock.patch('metrics.store.METRICS_DIR', self.directory):
+            self.assertEqual(store.collect_values(), {'key': 5.0})
+
+    def test_concurrent_first_calls_share_one_store(self):
+        created = []
+
+        def slow_memory_values():
+            time.sleep(0.01)
+            created.append(MemoryValues())
+            return created[-1]
+
+        results = []
+        barrier = threading.Barrier(8)
+
+        def first_call():
+            barrier.wait()
+            results.append(get_values())
+
+        with mock.patch('metrics.store.MemoryValues', side_effect=slow_memory_values):
+            threads = [threading.Thread(target=first_call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(created), 1)
+        self.assertTrue(all(values is created[0] for values in results))
+
+
+class MetricsViewTests(FreshStoreMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        allowed_patch = mock.patch('metrics.views.METRICS_ALLOWED_IPS', [ipaddress.ip_network('10.0.0.0/8')])
+        allowed_patch.start()
+        self.addCleanup(allowed_patch.stop)
+        self.url = reverse('metrics:metrics')
+
+    def test_allowed_address(self):
+        response = self.client.get(self.url, REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE http_requests_total counter', response.content.decode())
+
+    def test_other_address_is_forbidden(self):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='192.0.2.1').status_code, 403)
+
+    @override_settings(USE_X_FORWARDED_FOR=True, TRUSTED_PROXY_COUNT=1)
+    def test_spoofed_forwarded_address_is_forbidden(self):
+        response = self.client.get(self.url, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='10.1.2.3, 192.0.2.1')
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff_has_access(self):
+        staff = User.objects.create_user(email='staff@example.com', password='secret-password', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='192.0.2.1').status_code, 200)
+
+    def test_requests_are_counted_with_known_methods(self):
+        self.client.get(self.url, REMOTE_ADDR='10.1.2.3')
+        self.client.generic('BREW', self.url, REMOTE_ADDR='10.1.2.3')
+        text = self.client.get(self.url, REMOTE_ADDR='10.1.2.3').content.decode()
+        self.assertIn('http_requests_total{method="GET",status="200",view="metrics:metrics"} 1.0', text)
+        self.assertIn('method="other"', text)
+        self.assertNotIn('BREW', text)
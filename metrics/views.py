@@ -0,0 +1,39 @@
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views import View
+
+from catalog.throttling import get_client_ip
+
+from .registry import generate_text
+
+METRICS_ALLOWED_IPS = [
+    ipaddress.ip_network(network, strict=False) for network in getattr(settings, 'METRICS_ALLOWED_IPS', [])
+]
+
+
+def has_metrics_access(request):
+    """
+    Доступ к метрикам есть у сотрудников и у адресов из METRICS_ALLOWED_IPS (адреса и подсети).
+    Адрес берется из get_client_ip: из X-Forwarded-For — только адрес, добавленный доверенным
+    прокси, а не присланный клиентом.
+    """
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    try:
+        address = ipaddress.ip_address(get_client_ip(request))
+    except ValueError:
+        return False
+    return any(address in network for network in METRICS_ALLOWED_IPS)
+
+
+class MetricsView(View):
+    """
+    Значения метрик всех рабочих процессов в текстовом формате Prometheus.
+    """
+
+    def get(self, request):
+        if not has_metrics_access(request):
+            return HttpResponseForbidden()
+        return HttpResponse(generate_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PagecacheConfig(AppConfig):
+    """
+    Конфигурация приложения "Кэш страниц".
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pagecache'
+    verbose_name = "Кэш страниц"
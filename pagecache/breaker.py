@@ -0,0 +1,62 @@
+"""
+Автоматический выключатель (circuit breaker) обращений к базе данных.
+
+После failure_threshold ошибок подряд выключатель размыкается, и на reset_timeout секунд
+страницы перестают обновляться из базы данных — посетители получают сохраненные копии.
+По истечении этого времени пропускается одна пробная попытка: при успехе выключатель
+замыкается, при ошибке снова размыкается. Состояние хранится в памяти процесса.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """
+    Выключатель с состояниями "замкнут", "разомкнут" и "пробная попытка".
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Возвращает True, если обращение к базе данных разрешено.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_timeout:
+                # Одна пробная попытка за reset_timeout секунд; остальные запросы ждут ее результата
+                self.state = HALF_OPEN
+                self.opened_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+PAGE_CACHE_BREAKER = getattr(settings, 'PAGE_CACHE_BREAKER', {'failure_threshold': 3, 'reset_timeout': 30})
+
+database_breaker = CircuitBreaker(**PAGE_CACHE_BREAKER)
@@ -0,0 +1,268 @@
+"""
+Отдача анонимных GET-страниц из кэша по схеме stale-while-revalidate.
+
+Для каждого URL (и выбранной валюты) в кэше хранится последняя успешная отрисовка страницы.
+Если она свежее PAGE_CACHE_FRESH_SECONDS, она отдается без обращения к базе данных.
+Устаревшая копия тоже отдается сразу, а обновление выполняется одно на ключ во всех
+процессах (блокировка через cache.add) в фоновом потоке. Для ключа без копии страницу
+рисует один запрос, остальные ждут его результата до PAGE_CACHE_COALESCE_WAIT секунд.
+
+Ошибки базы данных (в том числе таймауты) размыкают выключатель database_breaker:
+пока он разомкнут, копии не обновляются, а страница без копии отдается с кодом 503
+вместо ошибки 500.
+
+Кэшируются только запросы без cookie сессии и сообщений: такие посетители анонимны,
+и проверка пользователя не обращается к базе данных. Страницы рисуются так же,
+как статические копии (атрибут запроса static_render): без количества товаров в корзине,
+которое заполняется скриптом. Ответы, устанавливающие cookie, не кэшируются.
+Из параметров запроса учитываются только PAGE_CACHE_QUERY_PARAMS: остальные (например, метки
+рекламных кампаний) отбрасываются и не порождают отдельных копий страницы.
+Отрисовка для кэша выполняется в транзакции с ограничением DB_STATEMENT_TIMEOUT_MS на время запроса
+(только PostgreSQL), поэтому медленная база данных размыкает выключатель, а не задерживает посетителей.
+"""
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIRequest
+from django.contrib.auth.models import AnonymousUser
+from django.db import InterfaceError, OperationalError, connection
+from django.db import transaction
+from django.http import HttpResponse, QueryDict
+
+from .breaker import database_breaker
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_FRESH_SECONDS = getattr(settings, 'PAGE_CACHE_FRESH_SECONDS', 30)
+PAGE_CACHE_STALE_SECONDS = getattr(settings, 'PAGE_CACHE_STALE_SECONDS', 60 * 60 * 24)
+PAGE_CACHE_COALESCE_WAIT = getattr(settings, 'PAGE_CACHE_COALESCE_WAIT', 5.0)
+PAGE_CACHE_REFRESH_WORKERS = getattr(settings, 'PAGE_CACHE_REFRESH_WORKERS', 2)
+# Параметры запроса, от которых зависит содержимое кэшируемых страниц
+PAGE_CACHE_QUERY_PARAMS = getattr(
+    settings, 'PAGE_CACHE_QUERY_PARAMS', ('page', 'sort', 'min_price', 'max_price', 'currency'),
+)
+# Ограничение времени выполнения запроса при отрисовке для кэша (в миллисекундах)
+DB_STATEMENT_TIMEOUT_MS = getattr(settings, 'DB_STATEMENT_TIMEOUT_MS', None)
+# Cookie, при наличии которых страница может зависеть от посетителя
+PRIVATE_COOKIES = (settings.SESSION_COOKIE_NAME, 'messages')
+# Ошибки, означающие недоступность или перегрузку базы данных
+DATABASE_ERRORS = (OperationalError, InterfaceError)
+LOCK_TIMEOUT = 30
+POLL_INTERVAL = 0.05
+
+_executor = ThreadPoolExecutor(max_workers=PAGE_CACHE_REFRESH_WORKERS, thread_name_prefix='pagecache')
+
+
+def is_cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not getattr(request, 'static_render', False)
+        and not any(name in request.COOKIES for name in PRIVATE_COOKIES)
+    )
+
+
+def shared_query(request):
+    """
+    Параметры запроса из PAGE_CACHE_QUERY_PARAMS в постоянном порядке.
+    """
+    query = QueryDict(mutable=True)
+    for name in PAGE_CACHE_QUERY_PARAMS:
+        values = request.GET.getlist(name)
+        if values:
+            query.setlist(name, values)
+    query._mutable = False
+    return query
+
+
+def page_key(request, vary_cookies):
+    parts = [
+        request.path, shared_query(request).urlencode(),
+        *(request.COOKIES.get(name, '') for name in vary_cookies),
+    ]
+    digest = hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:32]
+    return f'pagecache:{digest}'
+
+
+def entry_response(entry, stale):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['Age'] = str(int(time.time() - entry['rendered_at']))
+    response['X-Page-Cache'] = 'stale' if stale else 'hit'
+    return response
+
+
+def wait_for_entry(key):
+    """
+    Ждет, пока другой запрос нарисует страницу для ключа без копии.
+    """
+    deadline = time.monotonic() + PAGE_CACHE_COALESCE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(f'{key}:lock') is None:
+            return None
+    return None
+
+
+def unavailable_response():
+    response = HttpResponse(
+        'Сервис временно недоступен. Попробуйте обновить страницу через минуту.',
+        status=503, content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(int(database_breaker.reset_timeout))
+    return response
+
+
+def set_statement_timeout():
+    """
+    Ограничивает время выполнения запросов текущей транзакции (только PostgreSQL).
+    Команды управления и миграции выполняются без ограничения.
+    """
+    if DB_STATEMENT_TIMEOUT_MS and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('statement_timeout', %s, true)", [str(DB_STATEMENT_TIMEOUT_MS)])
+
+
+def shared_request(request):
+    """
+    Копия запроса для фонового обновления: исходный запрос к этому моменту уже обработан.
+    """
+    environ = {
+        name: value for name, value in request.META.items()
+        if isinstance(value, str)
+    }
+    environ.update({
+        'wsgi.input': BytesIO(),
+        'wsgi.url_scheme': request.scheme,
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': request.path_info,
+        'SCRIPT_NAME': request.META.get('SCRIPT_NAME', ''),
+        'QUERY_STRING': shared_query(request).urlencode(),
+    })
+    copy = WSGIRequest(environ)
+    copy.user = AnonymousUser()
+    copy.static_render = True
+    copy.resolver_match = request.resolver_match
+    return copy
+
+
+class StaleWhileRevalidateMixin:
+    """
+    Примесь для публичных представлений: анонимные GET-запросы обслуживаются
+    из кэша последней успешной отрисовки (см. описание модуля).
+    page_cache_vary_cookies — cookie, от которых зависит содержимое страницы.
+    """
+    page_cache_vary_cookies = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        # Страница рисуется только по учитываемым параметрам, как и ключ ее копии
+        request.GET = shared_query(request)
+        key = page_key(request, self.page_cache_vary_cookies)
+        entry = cache.get(key)
+        if entry is not None:
+            stale = time.time() - entry['rendered_at'] > PAGE_CACHE_FRESH_SECONDS
+            if stale:
+                self.schedule_refresh(key, request, args, kwargs)
+            self.page_cache_hit(request, entry['object_pk'])
+            return entry_response(entry, stale)
+
+        if cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+            try:
+                return self.render_page(key, request, args, kwargs)
+            finally:
+                cache.delete(f'{key}:lock')
+
+        # Страницу уже рисует другой запрос: ждем его результата
+        entry = wait_for_entry(key)
+        if entry is not None:
+            self.page_cache_hit(request, entry['object_pk'])
+            return entry_response(entry, False)
+        # Страница не попала в кэш (например, ответ не 200): рисуем ее сами
+        return self.render_page(key, request, args, kwargs)
+
+    def page_cache_hit(self, request, object_pk):
+        """
+        Вызывается для каждого запроса, обслуженного через кэш страниц
+        (например, для учета просмотра без обращения к базе данных).
+        object_pk — id объекта страницы детального просмотра или None.
+        """
+
+    def get_page_object_pk(self):
+        page_object = getattr(self, 'object', None)
+        return getattr(page_object, 'pk', None)
+
+    def render_page(self, key, request, args, kwargs):
+        """
+        Рисует страницу для ключа без копии, если выключатель разрешает обращение к базе данных.
+        """
+        if not database_breaker.allow():
+            return unavailable_response()
+        response = self.render_to_cache(key, request, args, kwargs)
+        if response is None:
+            return unavailable_response()
+        self.page_cache_hit(request, self.get_page_object_pk())
+        return response
+
+    def render_to_cache(self, key, request, args, kwargs):
+        """
+        Рисует страницу и сохраняет ее в кэш. Возвращает ответ или None при ошибке базы данных.
+        """
+        request.static_render = True
+        try:
+            with transaction.atomic():
+                set_statement_timeout()
+                response = super().dispatch(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+        except DATABASE_ERRORS:
+            database_breaker.record_failure()
+            logger.warning('Страница %s не обновлена: ошибка базы данных', request.path, exc_info=True)
+            return None
+        except Exception:
+            # Прочие ошибки (например, Http404) означают, что база данных ответила
+            database_breaker.record_success()
+            raise
+        finally:
+            request.static_render = False
+        database_breaker.record_success()
+        # Страница с CSRF-токеном или устанавливающая cookie относится к конкретному посетителю
+        personal = response.cookies or request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        if response.status_code == 200 and not personal and not response.streaming:
+            cache.set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'rendered_at': time.time(),
+                'object_pk': self.get_page_object_pk(),
+            }, PAGE_CACHE_STALE_SECONDS)
+        return response
+
+    def schedule_refresh(self, key, request, args, kwargs):
+        """
+        Запускает фоновое обновление копии, если оно еще не выполняется и база данных доступна.
+        """
+        if not cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+            return
+        if not database_breaker.allow():
+            cache.delete(f'{key}:lock')
+            return
+        _executor.submit(type(self)().refresh, key, shared_request(request), args, kwargs)
+
+    def refresh(self, key, request, args, kwargs):
+        try:
+            self.setup(request, *args, **kwargs)
+            self.render_to_cache(key, request, args, kwargs)
+        except Exception:
+            logger.exception('Ошибка фонового обновления страницы %s', request.path)
+        finally:
+            cache.delete(f'{key}:lock')
+            # Соединение с базой данных открыто в потоке пула и должно быть закрыто в нем же
+            connection.close()
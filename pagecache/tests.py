@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from catalog.models import Category, Product
+from catalog.views import ProductListView
+
+from .breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, database_breaker
+from .swr import PAGE_CACHE_FRESH_SECONDS, page_key
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    def test_opens_after_threshold_failures(self):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_single_trial_after_reset_timeout(self):
+        with mock.patch('pagecache.breaker.time.monotonic', return_value=100.0):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+        with mock.patch('pagecache.breaker.time.monotonic', return_value=110.0):
+            self.assertTrue(self.breaker.allow())
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+            self.assertFalse(self.breaker.allow())
+            self.breaker.record_failure()
+            self.assertEqual(self.breaker.state, OPEN)
+        with mock.patch('pagecache.breaker.time.monotonic', return_value=120.0):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_success()
+            self.assertEqual(self.breaker.state, CLOSED)
+
+
+class StaleWhileRevalidateTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        database_breaker.record_success()
+        self.addCleanup(database_breaker.record_success)
+        category = Category.objects.create(name='Категория', description='')
+        Product.objects.create(name='Товар', description='', category=category, price=100)
+        self.url = reverse('catalog:home')
+        self.key = page_key(RequestFactory().get(self.url), ProductListView.page_cache_vary_cookies)
+
+    def age_cached_page(self, seconds):
+        entry = cache.get(self.key)
+        entry['rendered_at'] -= seconds
+        cache.set(self.key, entry)
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('X-Page-Cache', first)
+        second = self.client.get(self.url, {'utm_source': 'mail'})
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(second.content, first.content)
+
+    def test_stale_copy_is_served_and_refreshed_in_background(self):
+        self.client.get(self.url)
+        self.age_cached_page(PAGE_CACHE_FRESH_SECONDS + 1)
+        with mock.patch.object(ProductListView, 'schedule_refresh') as schedule_refresh:
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        schedule_refresh.assert_called_once()
+
+    def test_database_errors_open_breaker(self):
+        with mock.patch.object(ProductListView, 'get_context_data', side_effect=OperationalError) as render, \
+                self.assertLogs('pagecache.swr', 'WARNING'):
+            for _ in range(database_breaker.failure_threshold):
+                self.assertEqual(self.client.get(self.url).status_code, 503)
+            calls = render.call_count
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(render.call_count, calls)
+
+    def test_stale_copy_is_served_while_breaker_is_open(self):
+        self.client.get(self.url)
+        self.age_cached_page(PAGE_CACHE_FRESH_SECONDS + 1)
+        for _ in range(database_breaker.failure_threshold):
+            database_breaker.record_failure()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        self.assertIsNone(cache.get(f'{self.key}:lock'))
+
+    def test_currency_cookie_is_set_only_when_changed(self):
+        response = self.client.get(self.url, {'currency': 'USD'})
+        self.assertEqual(response.cookies['currency'].value, 'USD')
+        response = self.client.get(self.url, {'currency': 'USD'})
+        self.assertNotIn('currency', response.cookies)
+        self.assertNotIn('X-Page-Cache', response)
+        response = self.client.get(self.url, {'currency': 'USD'})
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    def test_session_visitors_bypass_cache(self):
+        self.client.get(self.url)
+        self.client.cookies['sessionid'] = 'x'
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
+
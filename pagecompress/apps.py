@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PagecompressConfig(AppConfig):
+    """
+    Конфигурация приложения "Сжатие ответов".
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pagecompress'
+    verbose_name = "Сжатие ответов"
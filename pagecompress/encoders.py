@@ -0,0 +1,117 @@
+"""
+Потоковые кодировщики gzip и brotli и выбор кодировки по заголовку Accept-Encoding.
+
+Каждый кодировщик сжимает данные частями: compress(часть) возвращает готовые байты
+(с промежуточным сбросом, чтобы клиент получал часть потокового ответа сразу),
+finish() — завершение потока. Для gzip, как и в django.middleware.gzip, в заголовок
+добавляется имя файла случайной длины (защита от атак BREACH).
+Brotli доступен, если установлен пакет brotli (pip install brotli).
+"""
+import gzip
+import secrets
+from io import BytesIO
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_COMPRESSION = {
+    'gzip_level': 6,
+    'brotli_quality': 5,
+    'max_random_bytes': 100,
+    **getattr(settings, 'RESPONSE_COMPRESSION', {}),
+}
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level=None):
+        self._buffer = BytesIO()
+        max_random_bytes = RESPONSE_COMPRESSION['max_random_bytes']
+        self._file = gzip.GzipFile(
+            filename='a' * secrets.randbelow(max_random_bytes + 1) if max_random_bytes else '',
+            mode='wb', fileobj=self._buffer, mtime=0,
+            compresslevel=level or RESPONSE_COMPRESSION['gzip_level'],
+        )
+
+    def _take(self):
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def compress(self, data, flush=True):
+        self._file.write(data)
+        if flush:
+            self._file.flush()
+        return self._take()
+
+    def finish(self):
+        self._file.close()
+        return self._take()
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality=None):
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=quality or RESPONSE_COMPRESSION['brotli_quality'],
+        )
+
+    def compress(self, data, flush=True):
+        output = self._compressor.process(data)
+        if flush:
+            output += self._compressor.flush()
+        return output
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+# Кодировщики в порядке предпочтения сервера
+ENCODERS = {'br': BrotliEncoder, 'gzip': GzipEncoder} if brotli is not None else {'gzip': GzipEncoder}
+
+
+def parse_accept_encoding(header):
+    """
+    Возвращает словарь {кодировка: q} из заголовка Accept-Encoding.
+    """
+    weights = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name] = quality
+    return weights
+
+
+def choose_encoding(header):
+    """
+    Выбирает кодировку с наибольшим весом q; при равных весах — в порядке ENCODERS.
+    Возвращает None, если клиент не принимает ни одну из поддерживаемых кодировок.
+    """
+    weights = parse_accept_encoding(header or '')
+    best, best_quality = None, 0.0
+    for name in ENCODERS:
+        quality = weights.get(name, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def get_encoder(name):
+    return ENCODERS[name]()
@@ -0,0 +1,102 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.models import Blog
+from pagecompress.encoders import ENCODERS, get_encoder
+from pagecompress.minify import HtmlMinifier, minify_html
+
+
+def default_urls():
+    urls = [reverse('catalog:home'), reverse('blog:list')]
+    slug = Blog.objects.filter(is_published=True).exclude(slug='').values_list('slug', flat=True).first()
+    if slug:
+        urls.append(reverse('blog:detail', kwargs={'slug': slug}))
+    return urls
+
+
+def encode(name, content, chunk_size=None):
+    """
+    Сжимает содержимое целиком или частями по chunk_size байт (как потоковый ответ).
+    """
+    encoder = get_encoder(name)
+    if chunk_size is None:
+        return encoder.compress(content, flush=False) + encoder.finish()
+    parts = [encoder.compress(content[start:start + chunk_size]) for start in range(0, len(content), chunk_size)]
+    return b''.join(parts) + encoder.finish()
+
+
+def minify_stream(content, chunk_size):
+    minifier = HtmlMinifier()
+    parts = [minifier.feed(content[start:start + chunk_size]) for start in range(0, len(content), chunk_size)]
+    return b''.join(parts) + minifier.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures bytes saved and CPU cost per page of HTML whitespace minification and gzip/brotli compression, '
+        'for whole responses and for streaming responses compressed chunk by chunk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', help='Pages to measure (default: catalog home, blog list and a post).')
+        parser.add_argument('--iterations', type=int, default=50, help='Number of runs per measurement.')
+        parser.add_argument('--chunk-size', type=int, default=4096, help='Chunk size for the streaming measurement.')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        chunk_size = options['chunk_size']
+        host = settings.ALLOWED_HOSTS[0].lstrip('.') if settings.ALLOWED_HOSTS else 'localhost'
+        if host == '*':
+            host = 'localhost'
+
+        self.stdout.write(
+            f'{"page":32} {"step":14} {"bytes":>8} {"saved":>7} {"ms/page":>8} {"stream bytes":>13} {"stream ms":>10}'
+        )
+        for url in options['urls'] or default_urls():
+            # Исходная страница: без минификации и сжатия
+            with override_settings(HTML_MINIFY=False):
+                response = Client(HTTP_HOST=host).get(url)
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'Skipped {url}: HTTP {response.status_code}'))
+                continue
+            raw = response.content
+            self.report(url, 'raw', raw, raw, 0.0, None, None)
+
+            minified, minify_ms = self.measure(minify_html, raw, iterations)
+            streamed, stream_ms = self.measure(lambda data: minify_stream(data, chunk_size), raw, iterations)
+            self.report(url, 'minify', minified, raw, minify_ms, len(streamed), stream_ms)
+
+            for name in ENCODERS:
+                for label, content in ((name, raw), (f'minify+{name}', minified)):
+                    compressed, ms = self.measure(lambda data: encode(name, data), content, iterations)
+                    streamed, stream_ms = self.measure(
+                        lambda data: encode(name, data, chunk_size), content, iterations,
+                    )
+                    if label.startswith('minify'):
+                        ms += minify_ms
+                        stream_ms += minify_ms
+                    self.report(url, label, compressed, raw, ms, len(streamed), stream_ms)
+
+    def report(self, url, step, content, raw, ms, stream_bytes, stream_ms):
+        saved = 1 - len(content) / len(raw) if raw else 0.0
+        stream_bytes = '' if stream_bytes is None else stream_bytes
+        stream_ms = '' if stream_ms is None else f'{stream_ms:.3f}'
+        self.stdout.write(
+            f'{url[:32]:32} {step:14} {len(content):8} {saved:7.1%} {ms:8.3f} {stream_bytes:>13} {stream_ms:>10}'
+        )
+
+    @staticmethod
+    def measure(function, content, iterations):
+        """
+        Возвращает результат функции и среднее время ее выполнения в миллисекундах.
+        """
+        result = function(content)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function(content)
+        elapsed = (time.perf_counter() - started) / iterations
+        return result, elapsed * 1000
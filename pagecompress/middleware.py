@@ -0,0 +1,130 @@
+"""
+Минификация HTML и сжатие ответов.
+
+HTML-ответы (text/html) минифицируются (pagecompress.minify), затем ответы текстовых типов
+сжимаются кодировкой, выбранной по Accept-Encoding (br или gzip). Потоковые ответы
+(StreamingHttpResponse, в том числе асинхронные) обрабатываются по частям: каждая часть
+минифицируется и сжимается с промежуточным сбросом, поэтому клиент получает ее без задержки.
+"""
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .encoders import choose_encoding, get_encoder
+from .minify import HtmlMinifier, minify_html
+
+# Сжимаемые типы содержимого (изображения, архивы и видео уже сжаты)
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|x-ndjson|manifest\+json)|image/svg\+xml)',
+)
+# Минимальный размер обычного ответа, при котором сжатие имеет смысл
+MIN_COMPRESS_LENGTH = 200
+
+
+class CompressionMiddleware:
+    """
+    Минифицирует HTML и сжимает ответы по Accept-Encoding. Должен стоять в MIDDLEWARE
+    выше промежуточных слоев, которые читают или изменяют содержимое ответа.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.minify = getattr(settings, 'HTML_MINIFY', True)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.status_code != 200 or response.has_header('Content-Encoding'):
+            return response
+        # Тело ответа передает веб-сервер (X-Accel-Redirect, X-Sendfile)
+        if response.has_header('X-Accel-Redirect') or response.has_header('X-Sendfile'):
+            return response
+        content_type = response.get('Content-Type', '').lower()
+        if not COMPRESSIBLE_TYPES.match(content_type):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+
+        minify = self.minify and content_type.startswith('text/html') and 'utf-8' in content_type
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if not minify and encoding is None:
+            return response
+
+        if response.streaming:
+            self.transform_stream(response, minify, encoding)
+        else:
+            self.transform_content(response, minify, encoding)
+
+        # Содержимое изменилось: сильный ETag ослабляется, как в django.middleware.gzip
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
+
+    @staticmethod
+    def transform_content(response, minify, encoding):
+        content = response.content
+        if minify:
+            content = minify_html(content)
+        if encoding is not None and len(content) >= MIN_COMPRESS_LENGTH:
+            encoder = get_encoder(encoding)
+            compressed = encoder.compress(content, flush=False) + encoder.finish()
+            # Сжатие, не уменьшившее ответ, не применяется
+            if len(compressed) < len(content):
+                content = compressed
+                response.headers['Content-Encoding'] = encoding
+        response.content = content
+        response.headers['Content-Length'] = str(len(content))
+
+    @staticmethod
+    def transform_stream(response, minify, encoding):
+        minifier = HtmlMinifier() if minify else None
+        encoder = get_encoder(encoding) if encoding is not None else None
+
+        def process(chunk):
+            if minifier is not None:
+                chunk = minifier.feed(chunk)
+            if encoder is not None and chunk:
+                chunk = encoder.compress(chunk)
+            return chunk
+
+        def finish():
+            tail = minifier.close() if minifier is not None else b''
+            if encoder is not None:
+                tail = (encoder.compress(tail, flush=False) if tail else b'') + encoder.finish()
+            return tail
+
+        if response.is_async:
+            original = response.streaming_content
+
+            async def async_content():
+                async for chunk in original:
+                    data = process(chunk)
+                    if data:
+                        yield data
+                tail = finish()
+                if tail:
+                    yield tail
+
+            response.streaming_content = async_content()
+        else:
+            original = response.streaming_content
+
+            def content():
+                for chunk in original:
+                    data = process(chunk)
+                    if data:
+                        yield data
+                tail = finish()
+                if tail:
+                    yield tail
+
+            response.streaming_content = content()
+        if encoder is not None:
+            response.headers['Content-Encoding'] = encoding
+        # Длина ответа после обработки заранее неизвестна
+        response.headers.pop('Content-Length', None)
@@ -0,0 +1,138 @@
+"""
+Потоковое удаление лишних пробелов из HTML.
+
+В текстовом содержимом между тегами серия пробельных символов заменяется одним символом:
+переводом строки, если серия его содержит, иначе пробелом. Браузер отображает такую серию
+так же, поэтому вид страницы не меняется, а отступы шаблонов (в том числе повторяющиеся
+в цикле карточек) не передаются. Теги, комментарии и значения атрибутов не изменяются,
+содержимое <pre>, <textarea>, <script> и <style> передается без изменений.
+
+Минификатор работает с байтами в UTF-8: байты многобайтовых символов не совпадают
+с ASCII-символами разметки, а неразрывный пробел (U+00A0) пробельным символом не считается.
+Конец тега ищется с учетом кавычек: символ > внутри значения атрибута тег не завершает.
+Данные обрабатываются частями по мере поступления; неполный тег, незакрытая серия
+пробелов и возможное начало закрывающего тега сохраняются до следующей части.
+"""
+import re
+
+# Пробельные символы HTML (ASCII), серия которых заменяется одним символом
+WHITESPACE_RE = re.compile(rb'[ \t\n\r\f]+')
+TRAILING_WHITESPACE_RE = re.compile(rb'[ \t\n\r\f]+$')
+# Элементы, содержимое которых передается без изменений
+RAW_TEXT_ELEMENTS = (b'pre', b'textarea', b'script', b'style')
+RAW_OPEN_TAG_RE = re.compile(rb'<(' + b'|'.join(RAW_TEXT_ELEMENTS) + rb')[\s>/]', re.IGNORECASE)
+# Символы, от которых зависит поиск конца тега
+TAG_TOKEN_RE = re.compile(rb'[>"\']')
+WHITESPACE_BYTES = b' \t\n\r\f'
+
+
+def _collapse(match):
+    return b'\n' if b'\n' in match.group() else b' '
+
+
+def collapse_whitespace(text):
+    return WHITESPACE_RE.sub(_collapse, text)
+
+
+def find_tag_end(buffer, tag_start):
+    """
+    Возвращает позицию после символа >, завершающего тег, или -1, если тег в буфере не закончен.
+    Кавычка открывает значение атрибута только после знака = (как и в браузере);
+    символы > внутри значения пропускаются.
+    """
+    pos = tag_start + 1
+    while True:
+        match = TAG_TOKEN_RE.search(buffer, pos)
+        if match is None:
+            return -1
+        if match.group() == b'>':
+            return match.end()
+        before = match.start() - 1
+        while before > tag_start and buffer[before] in WHITESPACE_BYTES:
+            before -= 1
+        if buffer[before] != ord('='):
+            pos = match.end()
+            continue
+        closing = buffer.find(match.group(), match.end())
+        if closing == -1:
+            return -1
+        pos = closing + 1
+
+
+class HtmlMinifier:
+    """
+    Потоковый минификатор: feed(часть) возвращает обработанные байты, close() — остаток.
+    """
+
+    def __init__(self):
+        self._pending = b''
+        # Имя элемента (pre, textarea, ...), внутри которого находится текущая позиция
+        self._raw_element = None
+
+    def feed(self, data):
+        buffer = self._pending + data
+        output = []
+        pos = 0
+        length = len(buffer)
+        lowered = None
+        while pos < length:
+            if self._raw_element is not None:
+                closing = b'</' + self._raw_element
+                if lowered is None:
+                    lowered = buffer.lower()
+                end = lowered.find(closing, pos)
+                if end == -1:
+                    # Конец части может оказаться началом закрывающего тега
+                    keep = max(pos, length - len(closing) + 1)
+                    output.append(buffer[pos:keep])
+                    pos = keep
+                    break
+                output.append(buffer[pos:end])
+                self._raw_element = None
+                pos = end
+                continue
+
+            tag_start = buffer.find(b'<', pos)
+            if tag_start == -1:
+                text = buffer[pos:]
+                # Серия пробелов в конце части может продолжиться в следующей
+                trailing = TRAILING_WHITESPACE_RE.search(text)
+                cut = trailing.start() if trailing else len(text)
+                output.append(collapse_whitespace(text[:cut]))
+                pos += cut
+                break
+            if tag_start > pos:
+                output.append(collapse_whitespace(buffer[pos:tag_start]))
+
+            if buffer.startswith(b'<!--', tag_start):
+                tag_end = buffer.find(b'-->', tag_start + 4)
+                tag_end = tag_end + 3 if tag_end != -1 else -1
+            elif length - tag_start < 4 and b'<!--'.startswith(buffer[tag_start:]):
+                # Возможно, начало комментария, разрезанное между частями
+                tag_end = -1
+            else:
+                tag_end = find_tag_end(buffer, tag_start)
+            if tag_end == -1:
+                pos = tag_start
+                break
+            output.append(buffer[tag_start:tag_end])
+            raw_match = RAW_OPEN_TAG_RE.match(buffer, tag_start, tag_end)
+            if raw_match and not buffer[tag_start:tag_end].endswith(b'/>'):
+                self._raw_element = raw_match.group(1).lower()
+            pos = tag_end
+        self._pending = buffer[pos:]
+        return b''.join(output)
+
+    def close(self):
+        rest, self._pending = self._pending, b''
+        if self._raw_element is not None:
+            return rest
+        return collapse_whitespace(rest)
+
+
+def minify_html(content):
+    """
+    Минифицирует HTML целиком.
+    """
+    minifier = HtmlMinifier()
+    return minifier.feed(content) + minifier.close()
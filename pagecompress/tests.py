@@ -0,0 +1,81 @@
+import random
+
+from django.test import SimpleTestCase
+
+from .minify import HtmlMinifier, minify_html
+
+SAMPLE_HTML = '''<!DOCTYPE html>
+<html>
+<head>
+    <title>  Каталог  </title>
+    <style>
+        body  {  margin: 0;  }
+    </style>
+</head>
+<body>
+    <!--  комментарий   с > внутри  -->
+    <a href="/?a=1&amp;b=2"   title="a > b   c" data-x='x > y   z'>  Ссылка  </a>
+    <input value = "1 >   2" disabled>
+    <p>
+        Цена:   100&nbsp;руб.
+    </p>
+    <pre>
+  отступы   сохраняются
+    </pre>
+    <textarea name="text">  как   есть  </textarea>
+    <script>
+        if (a  >  b) {  document.title = '<p>   </p>';  }
+    </script>
+    <img src="x.png" alt="1 < 2 >   3"/>
+</body>
+</html>
+'''
+
+
+def minify_in_chunks(data, split_points):
+    minifier = HtmlMinifier()
+    output = []
+    start = 0
+    for point in sorted(split_points) + [len(data)]:
+        output.append(minifier.feed(data[start:point]))
+        start = point
+    output.append(minifier.close())
+    return b''.join(output)
+
+
+class MinifyHtmlTests(SimpleTestCase):
+
+    def test_collapses_whitespace_between_tags(self):
+        self.assertEqual(minify_html(b'<p>\n    a    b\n</p>  <p> c </p>'), b'<p>\na b\n</p> <p> c </p>')
+
+    def test_keeps_whitespace_in_attribute_values_with_gt(self):
+        html = b'<a title="a > b   c" data-x=\'x > y   z\'>  text  </a>'
+        self.assertEqual(minify_html(html), b'<a title="a > b   c" data-x=\'x > y   z\'> text </a>')
+
+    def test_quote_outside_attribute_value_does_not_hide_tag_end(self):
+        self.assertEqual(minify_html(b'<p class=x">  a  </p>'), b'<p class=x"> a </p>')
+
+    def test_keeps_raw_text_elements(self):
+        html = b'<pre>  a   b  </pre><script>  if (a  >  b) {}  </script>'
+        self.assertEqual(minify_html(html), html)
+
+    def test_random_split_points_give_same_result(self):
+        data = SAMPLE_HTML.encode()
+        expected = minify_html(data)
+        self.assertIn(b'title="a > b   c"', expected)
+        self.assertIn(b'value = "1 >   2"', expected)
+        self.assertIn('отступы   сохраняются'.encode(), expected)
+        generator = random.Random(43)
+        for _ in range(500):
+            points = generator.sample(range(1, len(data)), generator.randint(1, 20))
+            self.assertEqual(minify_in_chunks(data, points), expected, points)
+
+    def test_every_single_split_point_gives_same_result(self):
+        data = SAMPLE_HTML.encode()
+        expected = minify_html(data)
+        for point in range(1, len(data)):
+            self.assertEqual(minify_in_chunks(data, [point]), expected, point)
+
+    def test_byte_by_byte_feed_gives_same_result(self):
+        data = SAMPLE_HTML.encode()
+        self.assertEqual(minify_in_chunks(data, range(1, len(data))), minify_html(data))
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import UploadSession
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    """
+    Административная панель для просмотра сессий загрузки (только чтение).
+    """
+    list_display = ('filename', 'target', 'status', 'offset', 'size', 'user', 'created_at',)
+    list_filter = ('status', 'target',)
+    search_fields = ('filename', 'stored_name',)
+    list_select_related = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class UploadsConfig(AppConfig):
+    """
+    Конфигурация приложения "Загрузка файлов".
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'uploads'
+    verbose_name = "Загрузка файлов"
@@ -0,0 +1,246 @@
+"""
+Поблочная загрузка файлов с возобновлением.
+
+Клиент создает сессию (назначение, имя и размер файла) и отправляет файл блоками
+PUT-запросами с заголовком Upload-Offset — смещением блока в файле. Тело запроса читается
+во временный файл в UPLOAD_TEMP_DIR без буферизации в памяти и без блокировки сессии;
+сессия блокируется только на проверку смещения и дописывание блока с локального диска.
+После обрыва соединения клиент запрашивает принятое смещение и продолжает с него.
+Сессия принадлежит пользователю, а у анонимного посетителя — его сессии Django.
+
+Как только принято достаточно байт, формат и размеры изображения проверяются по заголовку,
+и неподходящий файл отклоняется, не дожидаясь конца загрузки. Готовый файл передается
+в хранилище поля модели как временный файл: FileSystemStorage перемещает его в MEDIA_ROOT
+без копирования, другие хранилища читают его блоками.
+"""
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from PIL import Image
+
+from .models import UploadSession
+from .targets import get_target
+from .validators import (
+    HEADER_MAX_BYTES, SIGNATURE_BYTES, check_dimensions, check_extension, check_format, check_size,
+    read_image_header, sniff_format,
+)
+
+UPLOAD_TEMP_DIR = getattr(settings, 'UPLOAD_TEMP_DIR', os.path.join(settings.BASE_DIR, 'upload_tmp'))
+UPLOAD_CHUNK_SIZE = getattr(settings, 'UPLOAD_CHUNK_SIZE', 1024 * 1024)
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """
+    Ошибка загрузки с HTTP-кодом ответа и текущим смещением сессии (для возобновления).
+    """
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class PartFile(File):
+    """
+    Временный файл загрузки. Наличие temporary_file_path() позволяет FileSystemStorage
+    переместить файл вместо копирования.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def part_path(session):
+    return os.path.join(UPLOAD_TEMP_DIR, f'{session.pk}.part')
+
+
+def remove_part(session):
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def owned_uploads(request):
+    """
+    Сессии загрузки, принадлежащие автору запроса: пользователю или, если он не вошел
+    в систему, его сессии Django.
+    """
+    if request.user.is_authenticated:
+        return UploadSession.objects.filter(user=request.user)
+    if not request.session.session_key:
+        return UploadSession.objects.none()
+    return UploadSession.objects.filter(user=None, session_key=request.session.session_key)
+
+
+def start_upload(target, filename, size, request):
+    """
+    Создает сессию загрузки от имени автора запроса.
+    Размер и расширение проверяются до приема первого байта.
+    """
+    try:
+        filename = get_valid_filename(os.path.basename(filename))
+    except SuspiciousFileOperation:
+        raise UploadError('Недопустимое имя файла.')
+    if size <= 0:
+        raise UploadError('Пустой файл.')
+    try:
+        check_size(size, target)
+    except ValidationError as exc:
+        raise UploadError(exc.messages[0], status=413)
+    try:
+        check_extension(filename, target)
+    except ValidationError as exc:
+        raise UploadError(exc.messages[0], status=415)
+
+    if request.user.is_authenticated:
+        owner = {'user': request.user}
+    else:
+        # Анонимная загрузка привязывается к сессии посетителя, которая создается при необходимости
+        if not request.session.session_key:
+            request.session.save()
+        owner = {'session_key': request.session.session_key}
+    session = UploadSession.objects.create(target=target.name, filename=filename, size=size, **owner)
+    os.makedirs(UPLOAD_TEMP_DIR, exist_ok=True)
+    open(part_path(session), 'wb').close()
+    return session
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Дописывает блок длиной length из потока stream (тела запроса) со смещения offset.
+    Блок сначала читается во временный файл, затем сессия блокируется на проверку смещения
+    и дописывание, поэтому одновременные запросы с одним смещением не перепутают данные,
+    а медленный клиент не держит блокировку. Если поток оборвался раньше, принимается
+    прочитанная часть. Блок, завершающий файл, может принять только один запрос:
+    проверка изображения и сохранение в хранилище выполняются уже без блокировки.
+    """
+    if length <= 0:
+        raise UploadError('Пустой блок.', offset=offset)
+    if length > UPLOAD_CHUNK_SIZE:
+        raise UploadError(f'Блок не должен превышать {UPLOAD_CHUNK_SIZE} байт.', status=413, offset=offset)
+    if offset + length > session.size:
+        raise UploadError('Блок выходит за пределы файла.', offset=offset)
+
+    rejection = None
+    with tempfile.TemporaryFile(dir=UPLOAD_TEMP_DIR) as chunk:
+        written = 0
+        while written < length:
+            block = stream.read(min(COPY_BUFFER_SIZE, length - written))
+            if not block:
+                break
+            chunk.write(block)
+            written += len(block)
+        chunk.seek(0)
+
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+            if session.status != UploadSession.STATUS_PENDING:
+                raise UploadError('Загрузка уже завершена.', status=409, offset=session.offset)
+            if offset != session.offset:
+                raise UploadError('Неверное смещение блока.', status=409, offset=session.offset)
+            with open(part_path(session), 'r+b') as part:
+                part.seek(offset)
+                shutil.copyfileobj(chunk, part, COPY_BUFFER_SIZE)
+                part.truncate()
+            session.offset = offset + written
+            target = get_target(session.target)
+            try:
+                inspect_header(session, target)
+            except ValidationError as exc:
+                rejection = exc.messages[0]
+                session.status = UploadSession.STATUS_REJECTED
+                remove_part(session)
+            session.save()
+
+    if rejection is None and session.offset == session.size:
+        try:
+            finish_upload(session, target)
+        except ValidationError as exc:
+            rejection = exc.messages[0]
+            session.status = UploadSession.STATUS_REJECTED
+            remove_part(session)
+        session.save(update_fields=['status', 'stored_name', 'updated_at'])
+
+    if rejection:
+        raise UploadError(rejection, status=415, offset=session.offset)
+    return session
+
+
+def inspect_header(session, target):
+    """
+    Проверяет формат и размеры изображения по уже принятым байтам (один раз за сессию).
+    Если заголовок еще не принят целиком, проверка откладывается до следующего блока.
+    """
+    if session.header_checked or session.offset < min(SIGNATURE_BYTES, session.size):
+        return
+    with open(part_path(session), 'rb') as part:
+        check_format(sniff_format(part.read(SIGNATURE_BYTES)), target)
+        header = read_image_header(part)
+    if header is None:
+        if session.offset < min(HEADER_MAX_BYTES, session.size):
+            return
+        raise ValidationError('Файл поврежден или не является изображением.')
+    image_format, width, height = header
+    check_format(image_format, target)
+    check_dimensions(width, height, target)
+    session.image_format, session.width, session.height = header
+
+
+def finish_upload(session, target):
+    """
+    Проверяет целостность принятого файла и передает его в хранилище поля модели.
+    """
+    path = part_path(session)
+    with open(path, 'rb') as part:
+        try:
+            with Image.open(part) as image:
+                image.verify()
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            raise ValidationError('Файл поврежден или не является изображением.')
+
+    field = target.model_field
+    with open(path, 'rb') as part:
+        session.stored_name = field.storage.save(
+            target.generate_filename(session.filename), PartFile(part, name=session.filename),
+        )
+    remove_part(session)
+    session.status = UploadSession.STATUS_COMPLETE
+
+
+def get_completed_upload(request, upload_id, target_name):
+    """
+    Возвращает завершенную и еще не прикрепленную к объекту загрузку автора запроса или None.
+    """
+    return owned_uploads(request).filter(
+        pk=upload_id, target=target_name, status=UploadSession.STATUS_COMPLETE,
+    ).first()
+
+
+def mark_attached(upload_ids):
+    UploadSession.objects.filter(pk__in=upload_ids).update(status=UploadSession.STATUS_ATTACHED)
+
+
+def cleanup_uploads(max_age_hours=24):
+    """
+    Удаляет сессии, не обновлявшиеся max_age_hours часов, вместе с временными файлами
+    и файлами завершенных загрузок, которые так и не были прикреплены к объекту.
+    Возвращает число удаленных сессий.
+    """
+    stale = UploadSession.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=max_age_hours))
+    for session in stale.exclude(status=UploadSession.STATUS_ATTACHED).only('pk', 'target', 'status', 'stored_name'):
+        remove_part(session)
+        target = get_target(session.target)
+        if session.status == UploadSession.STATUS_COMPLETE and session.stored_name and target:
+            target.model_field.storage.delete(session.stored_name)
+    deleted, _ = stale.delete()
+    return deleted
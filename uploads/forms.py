@@ -0,0 +1,81 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.urls import reverse_lazy
+
+from .chunked import get_completed_upload, mark_attached
+from .targets import get_target
+from .validators import validate_image_file
+
+
+class ChunkedFileInput(forms.ClearableFileInput):
+    """
+    Поле выбора файла, который при наличии JavaScript загружается поблочно
+    через uploads:start, а в форму передается только идентификатор загрузки.
+    """
+
+    class Media:
+        js = ('uploads/js/chunked_upload.js',)
+
+    def __init__(self, target_name, upload_field_name, attrs=None):
+        super().__init__(attrs)
+        self.target_name = target_name
+        self.upload_field_name = upload_field_name
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs'].update({
+            'data-chunked-upload': self.target_name,
+            'data-upload-url': str(reverse_lazy('uploads:start')),
+            'data-upload-field': self.upload_field_name,
+        })
+        return context
+
+
+class ChunkedUploadFormMixin:
+    """
+    Подключает поблочную загрузку к полям-изображениям модельной формы.
+
+    chunked_upload_fields — словарь "имя поля формы -> назначение загрузки" (uploads.targets).
+    Для каждого поля добавляется скрытое поле <имя>_upload с идентификатором завершенной загрузки.
+    Прикрепить можно только загрузку автора запроса request (см. uploads.views.ChunkedUploadViewMixin).
+    Файлы, отправленные обычным способом, проверяются по тем же ограничениям назначения.
+    """
+    chunked_upload_fields = {}
+
+    def __init__(self, *args, request=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request = request
+        for field_name, target_name in self.chunked_upload_fields.items():
+            upload_field_name = f'{field_name}_upload'
+            self.fields[upload_field_name] = forms.UUIDField(required=False, widget=forms.HiddenInput)
+            field = self.fields[field_name]
+            field.widget = ChunkedFileInput(
+                target_name, self.add_prefix(upload_field_name), attrs=field.widget.attrs,
+            )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        self.attached_uploads = []
+        for field_name, target_name in self.chunked_upload_fields.items():
+            upload_id = cleaned_data.get(f'{field_name}_upload')
+            if upload_id:
+                session = get_completed_upload(self.request, upload_id, target_name) if self.request else None
+                if session is None:
+                    self.add_error(field_name, 'Загрузка файла не найдена или не завершена.')
+                    continue
+                # Файл уже лежит в хранилище: полю модели достаточно его имени
+                cleaned_data[field_name] = session.stored_name
+                self.attached_uploads.append(session.pk)
+            elif isinstance(cleaned_data.get(field_name), UploadedFile):
+                try:
+                    validate_image_file(cleaned_data[field_name], get_target(target_name))
+                except ValidationError as exc:
+                    self.add_error(field_name, exc)
+        return cleaned_data
+
+    def save(self, commit=True):
+        instance = super().save(commit)
+        if self.attached_uploads:
+            mark_attached(self.attached_uploads)
+        return instance
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from uploads.chunked import cleanup_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes abandoned upload sessions with their temporary files, '
+        'and completed uploads that were never attached to an object.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=24, help='Delete sessions idle for N hours.')
+
+    def handle(self, *args, **options):
+        deleted = cleanup_uploads(max_age_hours=options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} upload session(s).'))
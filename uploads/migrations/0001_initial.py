@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:32
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(max_length=50, verbose_name='Назначение')),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Принято байт')),
+                ('image_format', models.CharField(blank=True, max_length=10, verbose_name='Формат')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота')),
+                ('status', models.CharField(choices=[('pending', 'Загружается'), ('complete', 'Загружен'), ('attached', 'Прикреплен к объекту'), ('rejected', 'Отклонен')], default='pending', max_length=10, verbose_name='Статус')),
+                ('stored_name', models.CharField(blank=True, max_length=255, verbose_name='Сохраненный файл')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Сессия загрузки',
+                'verbose_name_plural': 'Сессии загрузки',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.9 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='session_key',
+            field=models.CharField(blank=True, max_length=40, verbose_name='Ключ сессии'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class UploadSession(models.Model):
+    """
+    Сессия поблочной загрузки файла. offset — число уже принятых байт,
+    с этого места клиент продолжает загрузку после обрыва соединения.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETE = 'complete'
+    STATUS_ATTACHED = 'attached'
+    STATUS_REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Загружается'),
+        (STATUS_COMPLETE, 'Загружен'),
+        (STATUS_ATTACHED, 'Прикреплен к объекту'),
+        (STATUS_REJECTED, 'Отклонен'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target = models.CharField(max_length=50, verbose_name='Назначение')
+    filename = models.CharField(max_length=255, verbose_name='Имя файла')
+    size = models.PositiveBigIntegerField(verbose_name='Размер')
+    offset = models.PositiveBigIntegerField(default=0, verbose_name='Принято байт')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, verbose_name='Пользователь'
+    )
+    # Сессия Django анонимного посетителя, начавшего загрузку
+    session_key = models.CharField(max_length=40, blank=True, verbose_name='Ключ сессии')
+    image_format = models.CharField(max_length=10, blank=True, verbose_name='Формат')
+    width = models.PositiveIntegerField(null=True, blank=True, verbose_name='Ширина')
+    height = models.PositiveIntegerField(null=True, blank=True, verbose_name='Высота')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Статус')
+    stored_name = models.CharField(max_length=255, blank=True, verbose_name='Сохраненный файл')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def header_checked(self):
+        return bool(self.image_format)
+
+    class Meta:
+        verbose_name = 'Сессия загрузки'
+        verbose_name_plural = 'Сессии загрузки'
+        ordering = ['-created_at']
@@ -0,0 +1,170 @@
+"""
+Отдача загруженных файлов (MEDIA_ROOT) без отдельной настройки веб-сервера.
+
+Перед отдачей выполняются проверки доступа MEDIA_ACCESS_HOOKS: словарь
+"префикс пути -> путь к функции(request, name)". Функция возвращает PUBLIC (файл
+доступен всем), PRIVATE (доступен этому посетителю, но не всем — например, изображение
+неопубликованного продукта для сотрудника) или DENIED. Публичные файлы кэшируются
+надолго, файлы с ограниченным доступом не кэшируются общими кэшами.
+
+Условные запросы (If-None-Match, If-Modified-Since) обрабатываются по ETag и дате
+изменения файла. Сам файл отдает веб-сервер, если настроен MEDIA_SENDFILE
+('x-accel-redirect' для nginx, 'x-sendfile' для Apache/lighttpd); иначе — FileResponse,
+который WSGI-сервер передает через wsgi.file_wrapper (sendfile без копирования в Python).
+Поддерживается один диапазон Range; диапазон до конца файла отдается тем же FileResponse.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.module_loading import import_string
+
+MEDIA_SENDFILE = getattr(settings, 'MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_CACHE_MAX_AGE = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60 * 24 * 30)
+MEDIA_ACCESS_HOOKS = getattr(settings, 'MEDIA_ACCESS_HOOKS', {})
+RANGE_BLOCK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+PUBLIC = 'public'
+PRIVATE = 'private'
+DENIED = 'denied'
+
+_hooks = None
+
+
+def get_access_hooks():
+    global _hooks
+    if _hooks is None:
+        _hooks = [(prefix, import_string(path)) for prefix, path in MEDIA_ACCESS_HOOKS.items()]
+    return _hooks
+
+
+def check_access(request, name):
+    """
+    Возвращает самый строгий из результатов проверок, относящихся к файлу name.
+    """
+    access = PUBLIC
+    for prefix, hook in get_access_hooks():
+        if name.startswith(prefix):
+            result = hook(request, name)
+            if result == DENIED:
+                return DENIED
+            if result == PRIVATE:
+                access = PRIVATE
+    return access
+
+
+def make_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном. Возвращает (начало, конец включительно),
+    None — если заголовок не поддерживается (отдается весь файл), или False — если диапазон
+    за пределами файла.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Суффикс: последние end байт
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    """
+    Проверка If-Range: диапазон отдается, только если файл не изменился.
+    """
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    last_modified = parse_http_date_safe(value)
+    return last_modified is not None and int(mtime) <= last_modified
+
+
+def iter_range(path, start, length):
+    with open(path, 'rb') as media_file:
+        media_file.seek(start)
+        while length > 0:
+            block = media_file.read(min(RANGE_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve_media(request, name, path, stat, public=True):
+    """
+    Формирует ответ с файлом path (stat — результат os.stat) с учетом условных
+    заголовков и Range.
+    """
+    etag = make_etag(stat)
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = build_response(request, name, path, stat, etag)
+    response.headers.setdefault('ETag', etag)
+    response.headers.setdefault('Last-Modified', http_date(stat.st_mtime))
+    if public:
+        patch_cache_control(response, public=True, max_age=MEDIA_CACHE_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def build_response(request, name, path, stat, etag):
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    if MEDIA_SENDFILE == 'x-accel-redirect':
+        # nginx сам обработает Range и отдаст файл из internal-location
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX + quote(name)
+        return response
+    if MEDIA_SENDFILE == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+
+    size = stat.st_size
+    byte_range = None
+    if 'Range' in request.headers and if_range_matches(request, etag, stat.st_mtime):
+        byte_range = parse_range(request.headers['Range'], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        if end == size - 1:
+            # Диапазон до конца файла: FileResponse с позиции start сохраняет отдачу через sendfile
+            media_file = open(path, 'rb')
+            media_file.seek(start)
+            response = FileResponse(media_file, content_type=content_type, status=206)
+        else:
+            response = StreamingHttpResponse(
+                iter_range(path, start, end - start + 1), content_type=content_type, status=206,
+            )
+            response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
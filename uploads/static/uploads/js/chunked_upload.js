@@ -0,0 +1,120 @@
+// Поблочная загрузка файлов для полей с атрибутом data-chunked-upload.
+// Файл отправляется блоками на data-upload-url, после завершения идентификатор загрузки
+// записывается в скрытое поле data-upload-field, а само поле файла очищается, чтобы
+// форма не отправляла файл повторно. Идентификатор незавершенной загрузки хранится
+// в localStorage: при повторном выборе того же файла загрузка продолжается с принятого места.
+document.addEventListener('DOMContentLoaded', function () {
+    var csrfInput = document.querySelector('input[name="csrfmiddlewaretoken"]');
+    var csrfToken = csrfInput ? csrfInput.value : '';
+    var maxRetries = 5;
+
+    function request(method, url, body, headers) {
+        headers = Object.assign({'X-CSRFToken': csrfToken}, headers || {});
+        return fetch(url, {method: method, body: body, headers: headers, credentials: 'same-origin'})
+            .then(function (response) {
+                return response.json().then(function (data) {
+                    data.httpStatus = response.status;
+                    return data;
+                });
+            });
+    }
+
+    function rejected(state) {
+        var error = new Error(state.error || 'Ошибка загрузки');
+        error.rejected = true;
+        return error;
+    }
+
+    function resumeKey(target, file) {
+        return 'chunked-upload:' + target + ':' + file.name + ':' + file.size + ':' + file.lastModified;
+    }
+
+    function startSession(input, file) {
+        var key = resumeKey(input.dataset.chunkedUpload, file);
+        var saved = localStorage.getItem(key);
+        var create = function () {
+            return request('POST', input.dataset.uploadUrl, JSON.stringify({
+                target: input.dataset.chunkedUpload, filename: file.name, size: file.size
+            }), {'Content-Type': 'application/json'}).then(function (state) {
+                if (state.httpStatus === 201) {
+                    localStorage.setItem(key, state.url);
+                }
+                return state;
+            });
+        };
+        if (!saved) {
+            return create();
+        }
+        return request('GET', saved).then(function (state) {
+            return state.httpStatus === 200 && state.status === 'pending' ? state : create();
+        }, create);
+    }
+
+    function sendChunks(state, file, onProgress, retries) {
+        if (state.status !== 'pending' || state.offset >= file.size) {
+            return Promise.resolve(state);
+        }
+        var chunk = file.slice(state.offset, state.offset + state.chunk_size);
+        return request('PUT', state.url, chunk, {'Upload-Offset': String(state.offset)}).then(function (next) {
+            if (next.httpStatus === 409 && next.offset !== null) {
+                // Сервер принял другое количество байт: продолжаем с его смещения
+                return sendChunks(Object.assign({}, state, {offset: next.offset}), file, onProgress, retries);
+            }
+            if (next.httpStatus !== 200) {
+                throw rejected(next);
+            }
+            onProgress(next.offset / file.size);
+            return sendChunks(next, file, onProgress, maxRetries);
+        }, function () {
+            // Обрыв соединения: узнаем принятое смещение и повторяем
+            if (retries <= 0) {
+                throw new Error('Нет соединения с сервером');
+            }
+            return new Promise(function (resolve) { setTimeout(resolve, 1000); })
+                .then(function () { return request('GET', state.url); })
+                .then(function (current) { return sendChunks(current, file, onProgress, retries - 1); },
+                      function () { return sendChunks(state, file, onProgress, retries - 1); });
+        });
+    }
+
+    document.querySelectorAll('input[type="file"][data-chunked-upload]').forEach(function (input) {
+        var hidden = input.form.querySelector('input[name="' + input.dataset.uploadField + '"]');
+        var submit = input.form.querySelector('[type="submit"]');
+        var status = document.createElement('div');
+        status.className = 'form-text';
+        input.parentNode.insertBefore(status, input.nextSibling);
+
+        input.addEventListener('change', function () {
+            var file = input.files[0];
+            hidden.value = '';
+            if (!file) {
+                return;
+            }
+            submit.disabled = true;
+            status.textContent = 'Загрузка…';
+            startSession(input, file).then(function (state) {
+                if (state.httpStatus >= 400) {
+                    throw rejected(state);
+                }
+                return sendChunks(state, file, function (progress) {
+                    status.textContent = 'Загрузка: ' + Math.round(progress * 100) + '%';
+                }, maxRetries);
+            }).then(function (state) {
+                localStorage.removeItem(resumeKey(input.dataset.chunkedUpload, file));
+                hidden.value = state.id;
+                input.value = '';
+                status.textContent = 'Файл загружен: ' + file.name;
+            }).catch(function (error) {
+                // Отклоненную загрузку не продолжаем; после обрыва связи ее можно возобновить,
+                // выбрав тот же файл еще раз
+                if (error.rejected) {
+                    localStorage.removeItem(resumeKey(input.dataset.chunkedUpload, file));
+                }
+                input.value = '';
+                status.textContent = error.message;
+            }).finally(function () {
+                submit.disabled = false;
+            });
+        });
+    });
+});
@@ -0,0 +1,56 @@
+"""
+Назначения загрузок: в какое поле какой модели попадает файл и какие к нему требования.
+"""
+from dataclasses import dataclass
+
+from django.apps import apps
+
+MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class UploadTarget:
+    """
+    Назначение загрузки: поле модели в формате "app_label.Model.field" и ограничения файла.
+    """
+    name: str
+    field: str
+    formats: tuple
+    max_size: int
+    max_width: int
+    max_height: int
+    login_required: bool = False
+
+    @property
+    def model_field(self):
+        model_label, field_name = self.field.rsplit('.', 1)
+        return apps.get_model(model_label)._meta.get_field(field_name)
+
+    def generate_filename(self, filename):
+        """
+        Возвращает имя файла в хранилище с учетом upload_to поля модели.
+        """
+        return self.model_field.generate_filename(None, filename)
+
+
+TARGETS = {
+    target.name: target
+    for target in [
+        UploadTarget(
+            name='product_image', field='catalog.Product.image', formats=('JPEG', 'PNG'),
+            max_size=5 * MB, max_width=8000, max_height=8000, login_required=True,
+        ),
+        UploadTarget(
+            name='blog_preview', field='blog.Blog.preview', formats=('JPEG', 'PNG', 'WEBP'),
+            max_size=5 * MB, max_width=8000, max_height=8000,
+        ),
+        UploadTarget(
+            name='avatar', field='users.User.avatar', formats=('JPEG', 'PNG', 'WEBP'),
+            max_size=2 * MB, max_width=4096, max_height=4096,
+        ),
+    ]
+}
+
+
+def get_target(name):
+    return TARGETS.get(name)
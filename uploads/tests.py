@@ -0,0 +1,208 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from catalog.models import Category, Product
+from users.models import User
+
+from .models import UploadSession
+
+
+def png_bytes(size=(64, 48)):
+    output = io.BytesIO()
+    Image.new('RGB', size, 'red').save(output, 'PNG')
+    return output.getvalue()
+
+
+class TempMediaMixin:
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.media_root = media_root
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        temp_dir_patch = mock.patch('uploads.chunked.UPLOAD_TEMP_DIR', os.path.join(media_root, 'tmp'))
+        temp_dir_patch.start()
+        self.addCleanup(temp_dir_patch.stop)
+
+
+class ChunkedUploadTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = png_bytes()
+
+    def start(self, client=None, target='avatar'):
+        client = client or self.client
+        response = client.post(
+            reverse('uploads:start'),
+            json.dumps({'target': target, 'filename': 'photo.png', 'size': len(self.data)}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put(self, url, offset, chunk, client=None):
+        client = client or self.client
+        return client.put(url, chunk, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_upload_resumes_from_accepted_offset(self):
+        state = self.start()
+        middle = len(self.data) // 2
+        self.assertEqual(self.put(state['url'], 0, self.data[:middle]).json()['offset'], middle)
+
+        self.assertEqual(self.client.get(state['url']).json()['offset'], middle)
+        response = self.put(state['url'], middle, self.data[middle:])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], UploadSession.STATUS_COMPLETE)
+        with open(os.path.join(self.media_root, response.json()['name']), 'rb') as stored:
+            self.assertEqual(stored.read(), self.data)
+
+    def test_wrong_offset_is_rejected_with_current_offset(self):
+        state = self.start()
+        self.put(state['url'], 0, self.data[:10])
+        response = self.put(state['url'], 0, self.data[:10])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 10)
+        response = self.put(state['url'], 20, self.data[20:30])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 10)
+
+    def test_chunk_beyond_file_is_rejected(self):
+        state = self.start()
+        response = self.put(state['url'], 1, self.data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get().offset, 0)
+
+    def test_not_an_image_is_rejected(self):
+        self.data = b'not an image' * 10
+        state = self.start()
+        response = self.put(state['url'], 0, self.data)
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(UploadSession.objects.get().status, UploadSession.STATUS_REJECTED)
+
+    def test_other_visitor_cannot_see_or_continue_upload(self):
+        state = self.start()
+        other = Client()
+        self.assertEqual(other.get(state['url']).status_code, 404)
+        self.assertEqual(self.put(state['url'], 0, self.data, client=other).status_code, 404)
+        self.assertEqual(UploadSession.objects.get().offset, 0)
+
+    def test_other_user_cannot_continue_upload(self):
+        owner = User.objects.create_user(email='owner@example.com', password='secret-password')
+        intruder = User.objects.create_user(email='intruder@example.com', password='secret-password')
+        self.client.force_login(owner)
+        state = self.start(target='product_image')
+        other = Client()
+        other.force_login(intruder)
+        self.assertEqual(self.put(state['url'], 0, self.data, client=other).status_code, 404)
+        self.assertEqual(self.put(state['url'], 0, self.data).status_code, 200)
+
+    def test_login_required_target_rejects_anonymous(self):
+        response = self.client.post(
+            reverse('uploads:start'),
+            json.dumps({'target': 'product_image', 'filename': 'photo.png', 'size': len(self.data)}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class MediaViewTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = bytes(range(256)) * 4
+        self.write('products/item.png', self.content)
+        self.url = reverse('media', kwargs={'path': 'products/item.png'})
+
+    def write(self, name, content):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as media_file:
+            media_file.write(content)
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_full_file_with_validators(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_conditional_requests(self):
+        response = self.get()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_ranges(self):
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(self.body(response), self.content[10:20])
+
+        response = self.get(HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.content[1000:])
+
+        response = self.get(HTTP_RANGE='bytes=-24')
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1023/{len(self.content)}')
+        self.assertEqual(self.body(response), self.content[-24:])
+
+    def test_unsatisfiable_and_unsupported_ranges(self):
+        response = self.get(HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+        response = self.get(HTTP_RANGE='bytes=0-1,5-6')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+    def test_if_range_with_stale_etag_returns_full_file(self):
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        etag = response['ETag']
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+
+    def test_sendfile_delegates_to_web_server(self):
+        with mock.patch('uploads.serving.MEDIA_SENDFILE', 'x-accel-redirect'):
+            response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/products/item.png')
+        self.assertEqual(response.content, b'')
+
+    def test_unpublished_product_image_is_hidden(self):
+        category = Category.objects.create(name='Категория', description='')
+        Product.objects.create(
+            name='Черновик', description='', category=category, price=1, image='products/item.png', is_published=False,
+        )
+        self.assertEqual(self.get().status_code, 404)
+        staff = User.objects.create_user(email='staff@example.com', password='secret-password', is_superuser=True)
+        self.client.force_login(staff)
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_missing_files_and_paths_outside_media_root(self):
+        self.assertEqual(self.get(reverse('media', kwargs={'path': 'products/missing.png'})).status_code, 404)
+        self.assertEqual(self.get(reverse('media', kwargs={'path': 'products'})).status_code, 404)
+        self.assertEqual(self.get(reverse('media', kwargs={'path': '../settings.py'})).status_code, 404)
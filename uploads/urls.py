@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import UploadChunkView, UploadStartView
+
+app_name = 'uploads'
+
+urlpatterns = [
+    path('', UploadStartView.as_view(), name='start'),
+    path('<uuid:pk>/', UploadChunkView.as_view(), name='chunk'),
+]
@@ -0,0 +1,90 @@
+"""
+Проверка изображений по первым байтам файла.
+
+Формат определяется по сигнатуре, а размеры в пикселях — ленивым Image.open из Pillow,
+который читает только заголовок и не декодирует изображение. Поэтому проверку можно
+выполнить по началу файла, пока остальная часть еще загружается.
+"""
+import os
+
+from django.core.exceptions import ValidationError
+from PIL import Image
+
+# Расширения имен файлов для форматов Pillow
+FORMAT_EXTENSIONS = {
+    'JPEG': ('.jpg', '.jpeg'),
+    'PNG': ('.png',),
+    'WEBP': ('.webp',),
+}
+# Сколько байт достаточно для сигнатуры формата
+SIGNATURE_BYTES = 12
+# Если заголовок не разобран и по стольким байтам, файл отклоняется
+HEADER_MAX_BYTES = 256 * 1024
+
+
+def sniff_format(prefix):
+    """
+    Определяет формат изображения по сигнатуре в начале файла.
+    """
+    if prefix.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if prefix.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'PNG'
+    if prefix[:4] == b'RIFF' and prefix[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def read_image_header(file):
+    """
+    Возвращает (формат, ширина, высота) по заголовку изображения или None,
+    если заголовок не удалось разобрать (файл поврежден или прочитан не полностью).
+    """
+    file.seek(0)
+    try:
+        image = Image.open(file)
+        return image.format, image.width, image.height
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        file.seek(0)
+
+
+def check_extension(filename, target):
+    extension = os.path.splitext(filename)[1].lower()
+    allowed = [ext for image_format in target.formats for ext in FORMAT_EXTENSIONS[image_format]]
+    if extension not in allowed:
+        raise ValidationError(f'Неверный формат файла. Допустимы только {", ".join(target.formats)}.')
+
+
+def check_size(size, target):
+    if size > target.max_size:
+        raise ValidationError(f'Размер файла не должен превышать {target.max_size // (1024 * 1024)} МБ.')
+
+
+def check_format(image_format, target):
+    if image_format not in target.formats:
+        raise ValidationError(f'Неверный формат файла. Допустимы только {", ".join(target.formats)}.')
+
+
+def check_dimensions(width, height, target):
+    if width > target.max_width or height > target.max_height:
+        raise ValidationError(
+            f'Изображение {width}×{height} больше допустимого {target.max_width}×{target.max_height}.'
+        )
+
+
+def validate_image_file(file, target):
+    """
+    Проверяет файл, загруженный обычной формой: размер, расширение, сигнатуру и размеры в пикселях.
+    """
+    check_size(file.size, target)
+    check_extension(file.name, target)
+    file.seek(0)
+    check_format(sniff_format(file.read(SIGNATURE_BYTES)), target)
+    header = read_image_header(file)
+    if header is None:
+        raise ValidationError('Файл поврежден или не является изображением.')
+    image_format, width, height = header
+    check_format(image_format, target)
+    check_dimensions(width, height, target)
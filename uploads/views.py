@@ -0,0 +1,135 @@
+import json
+import os
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.views import View
+
+from catalog.throttling import TokenBucket, get_client_ip
+
+from .chunked import UPLOAD_CHUNK_SIZE, UploadError, owned_uploads, start_upload, write_chunk
+from .serving import DENIED, PUBLIC, check_access, serve_media
+from .targets import get_target
+
+UPLOAD_RATE_LIMIT = getattr(settings, 'UPLOAD_RATE_LIMIT', {'capacity': 20, 'per_seconds': 3600})
+
+uploads_by_ip = TokenBucket(
+    'upload_ip', UPLOAD_RATE_LIMIT['capacity'], UPLOAD_RATE_LIMIT['capacity'] / UPLOAD_RATE_LIMIT['per_seconds'],
+)
+
+
+def session_state(session):
+    """
+    Состояние сессии загрузки для клиента.
+    """
+    return {
+        'id': str(session.pk),
+        'url': reverse('uploads:chunk', args=[session.pk]),
+        'offset': session.offset,
+        'size': session.size,
+        'chunk_size': UPLOAD_CHUNK_SIZE,
+        'status': session.status,
+        'name': session.stored_name,
+    }
+
+
+def error_response(exc):
+    return JsonResponse({'error': str(exc), 'offset': exc.offset}, status=exc.status)
+
+
+class ChunkedUploadViewMixin:
+    """
+    Передает запрос формам с ChunkedUploadFormMixin: прикрепить можно только свою загрузку.
+    """
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['request'] = self.request
+        return kwargs
+
+
+class UploadStartView(View):
+    """
+    Создание сессии загрузки. Тело запроса — JSON с полями target, filename и size.
+    """
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            target = get_target(data['target'])
+            filename = str(data['filename'])
+            size = int(data['size'])
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': 'Ожидаются поля target, filename и size.'}, status=400)
+        if target is None:
+            return JsonResponse({'error': 'Неизвестное назначение загрузки.'}, status=400)
+        if target.login_required and not request.user.is_authenticated:
+            return JsonResponse({'error': 'Требуется вход в систему.'}, status=403)
+        if not uploads_by_ip.allow(get_client_ip(request)):
+            return JsonResponse({'error': 'Слишком много загрузок. Попробуйте позже.'}, status=429)
+
+        try:
+            session = start_upload(target, filename, size, request)
+        except UploadError as exc:
+            return error_response(exc)
+        return JsonResponse(session_state(session), status=201)
+
+
+class UploadChunkView(View):
+    """
+    GET — текущее состояние сессии (для возобновления после обрыва),
+    PUT — очередной блок файла со смещением в заголовке Upload-Offset.
+    """
+
+    def get_session(self, request, pk):
+        session = owned_uploads(request).filter(pk=pk).first()
+        if session is None:
+            raise Http404
+        return session
+
+    def get(self, request, pk):
+        return JsonResponse(session_state(self.get_session(request, pk)))
+
+    def put(self, request, pk):
+        session = self.get_session(request, pk)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META['CONTENT_LENGTH'])
+        except (KeyError, ValueError):
+            return JsonResponse({'error': 'Ожидаются заголовки Upload-Offset и Content-Length.'}, status=400)
+
+        try:
+            # Тело запроса читается потоком прямо в файл, request.body не используется
+            session = write_chunk(session, offset, request, length)
+        except UploadError as exc:
+            return error_response(exc)
+        return JsonResponse(session_state(session))
+
+
+class MediaView(View):
+    """
+    Отдача загруженных файлов из MEDIA_ROOT с проверкой доступа, условными запросами
+    и Range (см. uploads.serving). Файлы, недоступные посетителю, отдаются как несуществующие.
+    """
+
+    def get(self, request, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404
+        try:
+            file_stat = os.stat(full_path)
+        except OSError:
+            raise Http404
+        if not stat.S_ISREG(file_stat.st_mode):
+            raise Http404
+
+        name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        access = check_access(request, name)
+        if access == DENIED:
+            raise Http404
+        return serve_media(request, name, full_path, file_stat, public=access == PUBLIC)
@@ -1,8 +1,14 @@
 from django.contrib.auth.forms import UserCreationForm
+from uploads.forms import ChunkedUploadFormMixin
 from users.models import User
 
 
-class UserRegisterForm(UserCreationForm):
+class UserRegisterForm(ChunkedUploadFormMixin, UserCreationForm):
+    """
+    Форма регистрации. Аватар загружается поблочно и проверяется по ограничениям назначения avatar.
+    """
     class Meta:
         model = User
         fields = ('email', 'country', 'phone_number', 'avatar',)
+
+    chunked_upload_fields = {'avatar': 'avatar'}
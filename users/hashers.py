@@ -0,0 +1,42 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+logger = logging.getLogger(__name__)
+
+# Наименьшее допустимое число итераций PBKDF2-SHA256 (рекомендация OWASP); меньшие значения
+# настройки PASSWORD_HASH_ITERATIONS не применяются
+MIN_PASSWORD_HASH_ITERATIONS = 600_000
+
+
+def configured_iterations():
+    """
+    Возвращает число итераций из настройки PASSWORD_HASH_ITERATIONS, но не меньше
+    MIN_PASSWORD_HASH_ITERATIONS. Значение ниже принятого в Django допускается с предупреждением.
+    """
+    iterations = getattr(settings, 'PASSWORD_HASH_ITERATIONS', None)
+    if not iterations:
+        return PBKDF2PasswordHasher.iterations
+    if iterations < MIN_PASSWORD_HASH_ITERATIONS:
+        logger.warning(
+            'PASSWORD_HASH_ITERATIONS=%d меньше допустимого минимума, используется %d',
+            iterations, MIN_PASSWORD_HASH_ITERATIONS,
+        )
+        return MIN_PASSWORD_HASH_ITERATIONS
+    if iterations < PBKDF2PasswordHasher.iterations:
+        logger.warning(
+            'PASSWORD_HASH_ITERATIONS=%d меньше значения Django по умолчанию (%d)',
+            iterations, PBKDF2PasswordHasher.iterations,
+        )
+    return iterations
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 с числом итераций из настройки PASSWORD_HASH_ITERATIONS (по умолчанию — значение Django,
+    не меньше MIN_PASSWORD_HASH_ITERATIONS). Число итераций подбирается командой bench_login
+    под допустимое время входа. Пароли с другим числом итераций проверяются как обычно
+    и перехешируются при входе.
+    """
+    iterations = configured_iterations()
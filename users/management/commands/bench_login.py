@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from users.hashers import MIN_PASSWORD_HASH_ITERATIONS
+from users.models import User
+
+BENCH_EMAIL = 'bench-login@example.invalid'
+BENCH_PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the cost of a LoginView POST with the current password hasher and suggests '
+        'PASSWORD_HASH_ITERATIONS for a latency budget.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10, help='Number of login requests.')
+        parser.add_argument('--budget-ms', type=float, default=250.0, help='Target time of password check, ms.')
+
+    def handle(self, *args, **options):
+        hasher = get_hasher()
+        iterations = getattr(hasher, 'iterations', None)
+        self.stdout.write(f'Hasher: {hasher.algorithm}, iterations: {iterations}')
+
+        # Стоимость одного хеширования без накладных расходов запроса
+        samples = []
+        for _ in range(max(3, options['requests'] // 2)):
+            started = time.perf_counter()
+            hasher.encode(BENCH_PASSWORD, hasher.salt())
+            samples.append((time.perf_counter() - started) * 1000)
+        hash_ms = statistics.median(samples)
+
+        login_ms = self.measure_login(options['requests'])
+        self.stdout.write(f'Password hash: {hash_ms:.1f} ms (median)')
+        self.stdout.write(
+            f'LoginView POST: {statistics.median(login_ms):.1f} ms median, {max(login_ms):.1f} ms max '
+            f'over {len(login_ms)} request(s)'
+        )
+
+        if iterations:
+            suggested = int(iterations * options['budget_ms'] / hash_ms)
+            if suggested < MIN_PASSWORD_HASH_ITERATIONS:
+                self.stdout.write(self.style.WARNING(
+                    f'{suggested} iterations fit the budget, but the minimum is {MIN_PASSWORD_HASH_ITERATIONS}: '
+                    f'raise the budget or use faster hardware'
+                ))
+                suggested = MIN_PASSWORD_HASH_ITERATIONS
+            self.stdout.write(self.style.SUCCESS(
+                f'For a {options["budget_ms"]:.0f} ms password check set PASSWORD_HASH_ITERATIONS ≈ {suggested}'
+            ))
+
+    @staticmethod
+    def measure_login(count):
+        """
+        Выполняет count входов через LoginView от имени временного пользователя,
+        который удаляется откатом транзакции. Тестовый клиент отправляет запросы на хост
+        testserver, который на время замера добавляется в ALLOWED_HOSTS.
+        """
+        url = reverse('users:login')
+        durations = []
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), transaction.atomic():
+            User.objects.create_user(email=BENCH_EMAIL, password=BENCH_PASSWORD)
+            for _ in range(count):
+                client = Client()
+                started = time.perf_counter()
+                response = client.post(url, {'username': BENCH_EMAIL, 'password': BENCH_PASSWORD})
+                durations.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 302:
+                    raise RuntimeError(f'Вход не выполнен: HTTP {response.status_code}')
+            transaction.set_rollback(True)
+        return durations
@@ -0,0 +1,49 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from users.bulk_import import ImportStats, import_batch, init_worker, iter_batches, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports users from a CSV file with an "email" column and optional "password", "country" and '
+        '"phone_number" columns. Passwords are hashed in a process pool, users are inserted in batches, '
+        'existing emails are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row.')
+        parser.add_argument('--encoding', default='utf-8', help='CSV file encoding.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users inserted per query.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Password hashing processes.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stats = ImportStats()
+        seen = set()
+        rows = read_rows(options['path'], options['encoding'])
+        # Соединения с базой данных не должны наследоваться процессами пула
+        connections.close_all()
+        try:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as executor:
+                # Строка 1 — заголовок
+                line = 2
+                for batch in iter_batches(rows, options['batch_size']):
+                    import_batch(batch, executor, stats, seen, line_offset=line)
+                    line += len(batch)
+                    self.stdout.write(f'Processed {line - 2} row(s), created {stats.created}...')
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        elapsed = time.perf_counter() - started
+        if stats.invalid:
+            shown = ', '.join(str(line) for line in stats.invalid[:20])
+            self.stdout.write(self.style.WARNING(f'Invalid email on line(s): {shown}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {stats.created} user(s), skipped {stats.existing} existing, {stats.duplicates} duplicate(s), '
+            f'{len(stats.invalid)} invalid in {elapsed:.1f} s.'
+        ))
@@ -1,3 +1,38 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .hashers import MIN_PASSWORD_HASH_ITERATIONS, configured_iterations
+from .models import User
+
+
+class HashIterationsTests(SimpleTestCase):
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=None)
+    def test_default_is_django_value(self):
+        self.assertEqual(configured_iterations(), PBKDF2PasswordHasher.iterations)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_value_below_minimum_is_raised(self):
+        with self.assertLogs('users.hashers', 'WARNING'):
+            self.assertEqual(configured_iterations(), MIN_PASSWORD_HASH_ITERATIONS)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=MIN_PASSWORD_HASH_ITERATIONS)
+    def test_value_below_django_default_warns(self):
+        with self.assertLogs('users.hashers', 'WARNING'):
+            self.assertEqual(configured_iterations(), MIN_PASSWORD_HASH_ITERATIONS)
+
+
+@override_settings(
+    ALLOWED_HOSTS=['shop.example.com'],
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class BenchLoginTests(TestCase):
+
+    def test_runs_with_production_allowed_hosts(self):
+        output = StringIO()
+        call_command('bench_login', '--requests', '2', stdout=output)
+        self.assertIn('LoginView POST', output.getvalue())
+        self.assertFalse(User.objects.filter(email='bench-login@example.invalid').exists())
@@ -1,11 +1,14 @@
+import time
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 from users.forms import UserRegisterForm
 from users.models import User
 from django.core.mail import send_mail
+from metrics.collectors import email_send_duration
+from uploads.views import ChunkedUploadViewMixin
 
 
-class UserRegisterView(CreateView):
+class UserRegisterView(ChunkedUploadViewMixin, CreateView):
     model = User
     form_class = UserRegisterForm
     template_name = 'users/register.html'
@@ -13,10 +16,16 @@ class UserRegisterView(CreateView):
 
     def form_valid(self, form):
         user = form.save()
-        send_mail(
-            subject='Поздравляем с регистрацией!',
-            message='Вы успешно зарегистрировались на нашем сайте!',
-            from_email=None,  # будет использован DEFAULT_FROM_EMAIL
-            recipient_list=[user.email]
-        )
+        started = time.perf_counter()
+        result = 'error'
+        try:
+            send_mail(
+                subject='Поздравляем с регистрацией!',
+                message='Вы успешно зарегистрировались на нашем сайте!',
+                from_email=None,  # будет использован DEFAULT_FROM_EMAIL
+                recipient_list=[user.email]
+            )
+            result = 'sent'
+        finally:
+            email_send_duration.observe(time.perf_counter() - started, result=result)
         return super().form_valid(form)
\ No newline at end of file